@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""
+async_connection: Provides an asyncio HTTP client to make requests to calm
+
+Requires aiohttp (pip install -r async-requirements.txt)
+
+Example:
+
+async def main():
+    client = await get_async_client_handle_obj(pc_ip, pc_port,
+                                               auth=("<pc_username>", "<pc_passwd>"))
+    async with client:
+        res, err = await client.application.read(app_uuid)
+        apps = await client.application.list_all()
+
+"""
+
+import json
+import time
+import random
+import asyncio
+import traceback
+import email.utils
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from calm.dsl.log import get_logging_handle
+from calm.dsl.config import get_context
+from calm.dsl.tools import DependencyTracker
+from .connection import REQUEST, build_url
+
+LOG = get_logging_handle(__name__)
+
+# Status codes retried, if retries are enabled in connection config
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+MAX_RETRIES = 3
+# Retries back off exponentially, by RETRY_BACKOFF_FACTOR * 2^(retry - 1)
+# seconds with jitter, atmost RETRY_BACKOFF_MAX seconds
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_BACKOFF_MAX = 120
+# Status codes for which 'Retry-After' header of response is honoured
+RETRY_AFTER_STATUS_CODES = [413, 429, 503]
+
+
+def get_retry_delay(retry_count, headers=None):
+    """returns seconds to wait before retry number 'retry_count' (starting
+    at 1), as given by 'Retry-After' header, else exponential backoff"""
+
+    retry_after = (headers or {}).get("Retry-After")
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            retry_date = email.utils.parsedate_tz(retry_after)
+            delay = (
+                email.utils.mktime_tz(retry_date) - time.time() if retry_date else None
+            )
+
+        if delay is not None:
+            return min(max(delay, 0), RETRY_BACKOFF_MAX)
+
+    # Jitter spreads out retries of concurrent requests failing together
+    backoff = min(RETRY_BACKOFF_FACTOR * (2 ** (retry_count - 1)), RETRY_BACKOFF_MAX)
+    return random.uniform(backoff / 2, backoff)
+
+
+class AsyncResponse:
+    """Response of AsyncConnection with completely read body. Provides the
+    part of requests.Response api used by resource apis and their callers"""
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise Exception("{} Error for url: {}".format(self.status_code, self.url))
+
+
+class AsyncConnection:
+    """Asyncio counterpart of Connection.
+
+    Requests share a pool of keep-alive connections, with atmost
+    `limit_per_host` connections opened to the server. Requests over the
+    limit wait for a connection to be free, instead of a thread each.
+    Connection failures are returned as errors, instead of exiting.
+    """
+
+    # Resource apis return coroutines for async connections
+    is_async = True
+
+    def __init__(
+        self,
+        host,
+        port,
+        auth_type=REQUEST.AUTH_TYPE.BASIC,
+        scheme=REQUEST.SCHEME.HTTPS,
+        auth=None,
+        limit=100,
+        limit_per_host=None,
+        keepalive_timeout=30,
+        session_headers=None,
+        **kwargs,
+    ):
+        """Generic asyncio client to connect to server.
+
+        Args:
+            host (str): Hostname/IP address
+            port (int): Port to connect to
+            auth_type (str): auth type that needs to be used by the client
+            scheme (str): http scheme (http or https)
+            auth (tuple): authentication
+            limit (int): The maximum number of connections in the pool
+            limit_per_host (int): The maximum number of connections to server,
+                defaults to 'concurrency' in connection config
+            keepalive_timeout (float): seconds for which idle connection is kept
+            session_headers (dict): session headers dict
+        """
+
+        if aiohttp is None:
+            raise Exception(
+                "aiohttp is required for asyncio client. Install it using "
+                "'pip install -r async-requirements.txt'"
+            )
+
+        self.host = host
+        self.port = port
+        self.auth = auth
+        self.scheme = scheme
+        self.auth_type = auth_type
+        self.session_headers = session_headers or {}
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self.base_url = ""
+        self.session = None
+        self.retries_enabled = False
+
+    async def connect(self):
+        """Creates the http session with connection pool"""
+
+        context = get_context()
+        connection_config = context.get_connection_config()
+        self.retries_enabled = bool(connection_config["retries_enabled"])
+        limit_per_host = self._limit_per_host or connection_config["concurrency"]
+
+        connector = aiohttp.TCPConnector(
+            limit=int(self._limit),
+            limit_per_host=int(limit_per_host),
+            keepalive_timeout=self._keepalive_timeout,
+        )
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=connection_config["connection_timeout"],
+            sock_read=connection_config["read_timeout"],
+        )
+
+        auth = None
+        if self.auth and self.auth_type == REQUEST.AUTH_TYPE.BASIC:
+            auth = aiohttp.BasicAuth(*self.auth)
+
+        # Content-Type is set per request, as it differs for multipart requests
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            auth=auth,
+            headers=self.session_headers,
+        )
+        self.base_url = build_url(self.host, self.port, scheme=self.scheme)
+        LOG.debug("{} session created".format(self.__class__.__name__))
+        return self.session
+
+    async def close(self):
+        """Closes the session and its connections"""
+
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    def _get_request_kwargs(
+        self, method, request_json, request_params, verify, headers, files, cookies
+    ):
+        """returns the keyword arguments of session.request"""
+
+        kwargs = {"ssl": None if verify else False, "cookies": cookies}
+        kwargs["headers"] = {"Content-Type": "application/json"}
+        kwargs["headers"].update(headers or {})
+
+        if method == REQUEST.METHOD.GET:
+            kwargs["params"] = request_params or request_json
+            return kwargs
+
+        if request_params:
+            kwargs["params"] = request_params
+
+        if method == REQUEST.METHOD.POST and files is not None:
+            request_json.update(files)
+            form_data = aiohttp.FormData()
+            for name, value in request_json.items():
+                # Files are given as (filename, file object, content type)
+                if isinstance(value, tuple):
+                    form_data.add_field(
+                        name,
+                        value[1],
+                        filename=value[0],
+                        content_type=value[2] if len(value) > 2 else None,
+                    )
+                else:
+                    form_data.add_field(name, value)
+            kwargs["data"] = form_data
+            kwargs["headers"].pop("Content-Type")
+        else:
+            kwargs["data"] = json.dumps(request_json)
+
+        return kwargs
+
+    async def _request(self, method, url, **kwargs):
+        """makes the request, retrying it if enabled, and returns the response"""
+
+        retries = MAX_RETRIES if self.retries_enabled else 0
+        retry_count = 0
+        while True:
+            headers = None
+            try:
+                async with self.session.request(method, url, **kwargs) as res:
+                    content = await res.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if retry_count >= retries:
+                    raise
+            else:
+                if res.status not in RETRY_STATUS_CODES or retry_count >= retries:
+                    return AsyncResponse(url, res.status, res.headers, content)
+                if res.status in RETRY_AFTER_STATUS_CODES:
+                    headers = res.headers
+
+            retry_count += 1
+            delay = get_retry_delay(retry_count, headers)
+            LOG.debug(
+                "Retrying '{}' at '{}' in {:.2f} seconds".format(method, url, delay)
+            )
+            await asyncio.sleep(delay)
+
+    async def _call(
+        self,
+        endpoint,
+        method=REQUEST.METHOD.POST,
+        cookies=None,
+        request_json=None,
+        request_params=None,
+        verify=True,
+        headers=None,
+        files=None,
+        ignore_error=False,
+        warning_msg="",
+        **kwargs,
+    ):
+        """Private coroutine for making http request to calm
+
+        Args:
+            endpoint (str): calm server endpoint
+            method (str): calm server http method
+            cookies (dict): cookies that need to be forwarded.
+            request_json (dict): request data
+            request_params (dict): request params
+            timeout (touple): (connection timeout, read timeout)
+        Returns:
+            (tuple (AsyncResponse, dict)): Response
+        """
+
+        # Values fetched from server are not tracked by compile cache
+        DependencyTracker.record_api_call()
+
+        request_json = request_json or {}
+        LOG.debug(
+            """Server Request- '{method}' at '{endpoint}' with body:
+            '{body}'""".format(
+                method=method, endpoint=endpoint, body=request_json
+            )
+        )
+        res = None
+        err = None
+        try:
+            url = build_url(self.host, self.port, endpoint=endpoint, scheme=self.scheme)
+            LOG.debug("URL is: {}".format(url))
+            request_kwargs = self._get_request_kwargs(
+                method, request_json, request_params, verify, headers, files, cookies
+            )
+            timeout = kwargs.get("timeout", None)
+            if timeout:
+                request_kwargs["timeout"] = aiohttp.ClientTimeout(
+                    sock_connect=timeout[0], sock_read=timeout[1]
+                )
+            res = await self._request(method.upper(), url, **request_kwargs)
+            res.raise_for_status()
+
+        except Exception as ex:
+            LOG.debug("Got traceback\n{}".format(traceback.format_exc()))
+            if res is not None:
+                try:
+                    err_msg = res.json()
+                except Exception:
+                    err_msg = res.text or "{}".format(ex)
+            else:
+                err_msg = "{}".format(ex)
+            status_code = res.status_code if res is not None else 500
+            err = {"error": err_msg, "code": status_code}
+
+            if ignore_error:
+                if warning_msg:
+                    LOG.warning(warning_msg)
+                return None, err
+
+            LOG.error(
+                "Oops! Something went wrong.\n{}".format(
+                    json.dumps(err, indent=4, separators=(",", ": "))
+                )
+            )
+
+        return res, err
+
+
+def get_async_connection_obj(
+    host,
+    port,
+    auth_type=REQUEST.AUTH_TYPE.BASIC,
+    scheme=REQUEST.SCHEME.HTTPS,
+    auth=None,
+    **kwargs,
+):
+    """Returns object of AsyncConnection class"""
+
+    return AsyncConnection(host, port, auth_type, scheme, auth, **kwargs)
@@ -1,7 +1,7 @@
 import os
 import json
 
-from .resource import ResourceAPI
+from .resource import ResourceAPI, sync_only
 from .connection import REQUEST
 from . import util
 from .util import (
@@ -144,6 +144,7 @@ class BlueprintAPI(ResourceAPI):
 
         return bp_payload
 
+    @sync_only
     def check_if_bp_already_exists(self, bp_name, force_create):
         # check if bp with the given name already exists
         params = {"filter": "name=={};state!=DELETED".format(bp_name)}
@@ -170,6 +171,7 @@ class BlueprintAPI(ResourceAPI):
                     return None, err
         return None, None
 
+    @sync_only
     def upload_with_secrets(
         self, bp_name, bp_desc, bp_resources, bp_metadata=None, force_create=False
     ):
@@ -225,6 +227,7 @@ class BlueprintAPI(ResourceAPI):
 
         return self.update(uuid, update_payload)
 
+    @sync_only
     def upload_with_decompiled_secrets(
         self,
         bp_payload,
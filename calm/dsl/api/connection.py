@@ -13,6 +13,7 @@ client = get_connection(pc_ip, pc_port,
 
 import traceback
 import json
+import time
 import urllib3
 import sys
 
@@ -24,6 +25,8 @@ from requests.packages.urllib3.util.retry import Retry
 
 from calm.dsl.log import get_logging_handle
 from calm.dsl.config import get_context
+from calm.dsl.tools import DependencyTracker
+from .instrumentation import RequestHooks, get_body_size
 
 urllib3.disable_warnings()
 LOG = get_logging_handle(__name__)
@@ -210,6 +213,9 @@ class Connection:
         Returns:
             (tuple (requests.Response, dict)): Response
         """
+        # Values fetched from server are not tracked by compile cache
+        DependencyTracker.record_api_call()
+
         timeout = kwargs.get("timeout", None)
         if not timeout:
             context = get_context()
@@ -231,6 +237,7 @@ class Connection:
         )
         res = None
         err = None
+        start_time, start_counter = time.time(), time.perf_counter()
         try:
             res = None
             url = build_url(self.host, self.port, endpoint=endpoint, scheme=self.scheme)
@@ -327,8 +334,40 @@ class Connection:
                 )
             )
 
+        finally:
+            if RequestHooks.enabled():
+                self._record_request(
+                    endpoint,
+                    method,
+                    res,
+                    start_time,
+                    time.perf_counter() - start_counter,
+                )
+
         return res, err
 
+    def _record_request(self, endpoint, method, res, start_time, latency):
+        """passes the record of request to instrumentation hooks"""
+
+        request_bytes = response_bytes = retries = status = 0
+        if res is not None:
+            status = res.status_code
+            request_bytes = get_body_size(getattr(res.request, "body", None))
+            response_bytes = len(res.content or b"")
+            retry_state = getattr(res.raw, "retries", None)
+            retries = len(getattr(retry_state, "history", None) or ())
+
+        RequestHooks.record(
+            endpoint=endpoint,
+            method=method,
+            status=status,
+            start=start_time,
+            latency=latency,
+            request_bytes=request_bytes,
+            response_bytes=response_bytes,
+            retries=retries,
+        )
+
 
 _CONNECTION = None
 
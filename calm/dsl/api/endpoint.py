@@ -1,6 +1,6 @@
 import os
 
-from .resource import ResourceAPI
+from .resource import ResourceAPI, sync_only
 from .connection import REQUEST
 from .util import strip_secrets, patch_secrets
 from calm.dsl.config import get_context
@@ -42,6 +42,7 @@ class EndpointAPI(ResourceAPI):
 
         return endpoint_payload
 
+    @sync_only
     def upload_with_secrets(
         self,
         endpoint_name,
@@ -47,6 +47,9 @@ class ClientHandle:
     def _connect(self):
 
         self.connection.connect()
+        self._init_resource_apis()
+
+    def _init_resource_apis(self):
 
         # Note - add entity api classes here
         self.project = ProjectAPI(self.connection)
@@ -84,6 +87,27 @@ class ClientHandle:
         self.quotas = QuotasAPI(self.connection)
 
 
+class AsyncClientHandle(ClientHandle):
+    """ClientHandle over AsyncConnection. Resource api methods returning the
+    response of a single request (list, read, create, update, delete etc.)
+    and list_all are awaitable. Methods making more than one request raise
+    TypeError"""
+
+    async def _connect(self):
+
+        await self.connection.connect()
+        self._init_resource_apis()
+
+    async def close(self):
+        await self.connection.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+
 def get_client_handle_obj(
     host,
     port,
@@ -99,6 +123,44 @@ def get_client_handle_obj(
     return handle
 
 
+async def get_async_client_handle_obj(
+    host,
+    port,
+    auth_type=REQUEST.AUTH_TYPE.BASIC,
+    scheme=REQUEST.SCHEME.HTTPS,
+    auth=None,
+    **kwargs,
+):
+    """returns connected object of AsyncClientHandle class
+
+    Args:
+        kwargs: limit, limit_per_host, keepalive_timeout of AsyncConnection
+    """
+
+    from .async_connection import get_async_connection_obj
+
+    connection = get_async_connection_obj(host, port, auth_type, scheme, auth, **kwargs)
+    handle = AsyncClientHandle(connection)
+    await handle._connect()
+    return handle
+
+
+async def get_async_api_client(**kwargs):
+    """returns connected asyncio api client for server in config. Unlike
+    get_api_client, a new client is returned on each call, as its session is
+    bound to the running event loop"""
+
+    context = get_context()
+    server_config = context.get_server_config()
+
+    return await get_async_client_handle_obj(
+        host=server_config.get("pc_ip"),
+        port=server_config.get("pc_port"),
+        auth=(server_config.get("pc_username"), server_config.get("pc_password")),
+        **kwargs,
+    )
+
+
 _API_CLIENT_HANDLE = None
 
 
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+instrumentation: Hooks called with a record of each request made by Connection
+
+Example:
+
+timings = RequestTimings()
+RequestHooks.add(timings)
+...
+timings.show()
+
+"""
+
+import re
+import json
+import math
+import os
+import threading
+
+from calm.dsl.log import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+UUID_REGEX = re.compile(
+    r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+)
+
+
+def get_endpoint_template(endpoint):
+    """returns endpoint with uuids/ids replaced by placeholders, so that
+    requests to the same api are grouped together"""
+
+    path = endpoint.split("?", 1)[0]
+    parts = []
+    for part in path.strip("/").split("/"):
+        if UUID_REGEX.match(part):
+            part = "{uuid}"
+        elif part.isdigit():
+            part = "{id}"
+        parts.append(part)
+
+    return "/".join(parts)
+
+
+def get_body_size(body):
+    """returns size in bytes of a prepared request body"""
+
+    if body is None:
+        return 0
+    if isinstance(body, (str, bytes)):
+        return len(body)
+
+    # Multipart encoders expose their size as `len`
+    return getattr(body, "len", 0)
+
+
+class RequestHooks:
+    """Registry of callables invoked with a record (dict) of each request.
+
+    Record keys: endpoint, template, method, status, start (epoch seconds),
+    latency (seconds), request_bytes, response_bytes, retries, thread_id
+    """
+
+    _hooks = []
+
+    @classmethod
+    def add(cls, hook):
+        if hook not in cls._hooks:
+            cls._hooks.append(hook)
+
+    @classmethod
+    def remove(cls, hook):
+        if hook in cls._hooks:
+            cls._hooks.remove(hook)
+
+    @classmethod
+    def enabled(cls):
+        return bool(cls._hooks)
+
+    @classmethod
+    def record(cls, **record):
+        record.setdefault("template", get_endpoint_template(record["endpoint"]))
+        record.setdefault("thread_id", threading.get_ident())
+        for hook in list(cls._hooks):
+            try:
+                hook(record)
+            except Exception as exc:
+                LOG.debug("Request hook {} failed: {}".format(hook, exc))
+
+
+def percentile(values, pct):
+    """returns the nearest-rank percentile of sorted values"""
+
+    if not values:
+        return 0
+    index = max(int(math.ceil(pct / 100.0 * len(values))) - 1, 0)
+    return values[index]
+
+
+class RequestTimings:
+    """Hook aggregating request latencies per endpoint template"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # {(method, template): [latency, ...]}
+        self.latencies = {}
+        self.retries = {}
+
+    def __call__(self, record):
+        key = (record["method"].upper(), record["template"])
+        with self.lock:
+            self.latencies.setdefault(key, []).append(record["latency"])
+            self.retries[key] = self.retries.get(key, 0) + record["retries"]
+
+    def summary(self):
+        """returns rows (method, template, count, p50, p95, total, retries)
+        sorted by total time"""
+
+        rows = []
+        with self.lock:
+            for key, latencies in self.latencies.items():
+                latencies = sorted(latencies)
+                rows.append(
+                    (
+                        key[0],
+                        key[1],
+                        len(latencies),
+                        percentile(latencies, 50),
+                        percentile(latencies, 95),
+                        sum(latencies),
+                        self.retries[key],
+                    )
+                )
+
+        return sorted(rows, key=lambda row: row[5], reverse=True)
+
+    def show(self):
+        """displays the per endpoint summary"""
+
+        import click
+        from prettytable import PrettyTable
+
+        rows = self.summary()
+        if not rows:
+            return
+
+        table = PrettyTable()
+        table.field_names = [
+            "METHOD",
+            "ENDPOINT",
+            "COUNT",
+            "P50 (ms)",
+            "P95 (ms)",
+            "TOTAL (ms)",
+            "RETRIES",
+        ]
+        table.align["ENDPOINT"] = "l"
+        for method, template, count, p50, p95, total, retries in rows:
+            table.add_row(
+                [
+                    method,
+                    template,
+                    count,
+                    "{:.1f}".format(p50 * 1000),
+                    "{:.1f}".format(p95 * 1000),
+                    "{:.1f}".format(total * 1000),
+                    retries,
+                ]
+            )
+
+        click.echo(table, err=True)
+        click.echo(
+            "{} requests. Total request time: {:.1f} ms".format(
+                sum(row[2] for row in rows), sum(row[5] for row in rows) * 1000
+            ),
+            err=True,
+        )
+
+
+class RequestTrace:
+    """Hook recording requests as Chrome trace events (chrome://tracing)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = []
+
+    def __call__(self, record):
+        event = {
+            "name": "{} {}".format(record["method"].upper(), record["template"]),
+            "cat": "request",
+            "ph": "X",
+            "ts": int(record["start"] * 1e6),
+            "dur": int(record["latency"] * 1e6),
+            "pid": os.getpid(),
+            "tid": record["thread_id"],
+            "args": {
+                "endpoint": record["endpoint"],
+                "status": record["status"],
+                "request_bytes": record["request_bytes"],
+                "response_bytes": record["response_bytes"],
+                "retries": record["retries"],
+            },
+        }
+        with self.lock:
+            self.events.append(event)
+
+    def write(self, trace_file):
+        """writes the trace events to trace_file"""
+
+        with self.lock:
+            events = list(self.events)
+
+        with open(trace_file, "w") as fd:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fd)
+
+        LOG.info("Request trace written to {}".format(trace_file))
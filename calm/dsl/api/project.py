@@ -1,6 +1,6 @@
 from distutils.version import LooseVersion as LV
 
-from .resource import ResourceAPI
+from .resource import ResourceAPI, sync_only
 from .connection import REQUEST
 
 
@@ -8,6 +8,7 @@ class ProjectAPI(ResourceAPI):
     def __init__(self, connection):
         super().__init__(connection, resource_type="projects")
 
+    @sync_only
     def create(self, payload):
 
         project_name = payload["spec"].get("name") or payload["metadata"].get("name")
@@ -1,5 +1,30 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from calm.dsl.config import get_context
+from calm.dsl.log import get_logging_handle
 from .connection import REQUEST
 
+LOG = get_logging_handle(__name__)
+
+
+def sync_only(method):
+    """marks resource api method making more than one request, as not
+    supported over async connection"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if getattr(self.connection, "is_async", False):
+            raise TypeError(
+                "{}.{} is not supported over async connection".format(
+                    type(self).__name__, method.__name__
+                )
+            )
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
 
 class ResourceAPI:
 
@@ -43,20 +68,11 @@ class ResourceAPI:
             ignore_error=ignore_error,
         )
 
+    @sync_only
     def get_name_uuid_map(self, params={}):
-        res_entities, err = self.list_all(base_params=params, ignore_error=True)
-
-        if not err:
-            response = res_entities
-        else:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        total_matches = len(response)
-        if total_matches == 0:
-            return {}
         name_uuid_map = {}
 
-        for entity in response:
+        for entity in self.iter_all(base_params=params):
             entity_name = entity["status"]["name"]
             entity_uuid = entity["metadata"]["uuid"]
 
@@ -77,19 +93,10 @@ class ResourceAPI:
 
         return name_uuid_map
 
+    @sync_only
     def get_uuid_name_map(self, params={}):
-        res_entities, err = self.list_all(base_params=params, ignore_error=True)
-        if not err:
-            response = res_entities
-        else:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        total_matches = len(response)
-        if total_matches == 0:
-            return {}
-
         uuid_name_map = {}
-        for entity in response:
+        for entity in self.iter_all(base_params=params):
             entity_name = entity["status"]["name"]
             entity_uuid = entity["metadata"]["uuid"]
 
@@ -97,46 +104,240 @@ class ResourceAPI:
 
         return uuid_name_map
 
-    # TODO: Fix return type of list_all helper
-    def list_all(self, api_limit=250, base_params=None, ignore_error=False):
-        """returns the list of entities"""
+    def _get_list_all_params(self, api_limit=250, base_params=None):
+        """returns list payload used for paginated listing of entities"""
 
-        final_list = []
-        offset = 0
         if base_params is None:
             base_params = {}
         params = base_params.copy()
-        length = params.get("length", api_limit)
-        params["length"] = length
-        params["offset"] = offset
+        params["length"] = params.get("length", api_limit)
         if params.get("sort_attribute", None) is None:
             params["sort_attribute"] = "_created_timestamp_usecs_"
         if params.get("sort_order", None) is None:
             params["sort_order"] = "ASCENDING"
-        while True:
-            params["offset"] = offset
-            response, err = self.list(params, ignore_error=ignore_error)
-            if not err:
-                response = response.json()
-            else:
-                if ignore_error:
-                    return [], err
-                else:
-                    raise Exception("[{}] - {}".format(err["code"], err["error"]))
 
-            final_list.extend(response["entities"])
+        return params
+
+    @sync_only
+    def _list_page(self, params, offset, ignore_error=False):
+        """returns (response_json, err) for page starting at given offset"""
+
+        page_params = params.copy()
+        page_params["offset"] = offset
+        response, err = self.list(page_params, ignore_error=ignore_error)
+        if err:
+            return None, err
+
+        return response.json(), None
 
-            total_matches = response["metadata"]["total_matches"]
-            if int(total_matches) <= (api_limit + offset):
-                break
+    async def _list_page_async(self, params, offset, ignore_error=False):
+        """returns (response_json, err) for page starting at given offset"""
 
-            offset += length
+        page_params = params.copy()
+        page_params["offset"] = offset
+        response, err = await self.list(page_params, ignore_error=ignore_error)
+        if err:
+            return None, err
+
+        return response.json(), None
+
+    # TODO: Fix return type of list_all helper
+    def list_all(
+        self, api_limit=250, base_params=None, ignore_error=False, concurrency=None
+    ):
+        """returns the list of entities
+
+        First page is fetched to get the total_matches, rest of the pages are
+        fetched concurrently by atmost `concurrency` workers sharing the session
+        pool of connection. Entities are returned in the order of pages.
+
+        Args:
+            api_limit (int): page size, if length is not given in base_params
+            base_params (dict): list api payload
+            ignore_error (bool): returns ([], err) instead of raising exception
+            concurrency (int): max number of pages fetched in parallel,
+                defaults to 'concurrency' in connection config
+
+        For async connections, returns a coroutine fetching the pages
+        concurrently on the event loop.
+        """
+
+        if getattr(self.connection, "is_async", False):
+            return self._list_all_async(
+                api_limit, base_params, ignore_error, concurrency
+            )
+
+        params = self._get_list_all_params(api_limit, base_params)
+        response, err = self._list_page(params, 0, ignore_error=ignore_error)
+        if err:
+            return self._get_list_all_error(err, ignore_error)
+
+        offsets = self._get_page_offsets(response, params["length"])
+        page_results = []
+        if offsets:
+            concurrency = self._get_page_concurrency(concurrency, len(offsets))
+            LOG.debug(
+                "Fetching {} more pages of {} using {} workers".format(
+                    len(offsets), self.LIST, concurrency
+                )
+            )
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                page_results = list(
+                    executor.map(
+                        lambda offset: self._list_page(
+                            params, offset, ignore_error=ignore_error
+                        ),
+                        offsets,
+                    )
+                )
+
+        return self._merge_pages(response, offsets, page_results, ignore_error)
+
+    async def _list_all_async(
+        self, api_limit=250, base_params=None, ignore_error=False, concurrency=None
+    ):
+        """asyncio counterpart of list_all"""
+
+        params = self._get_list_all_params(api_limit, base_params)
+        response, err = await self._list_page_async(
+            params, 0, ignore_error=ignore_error
+        )
+        if err:
+            return self._get_list_all_error(err, ignore_error)
+
+        offsets = self._get_page_offsets(response, params["length"])
+        page_results = []
+        if offsets:
+            semaphore = asyncio.Semaphore(
+                self._get_page_concurrency(concurrency, len(offsets))
+            )
+
+            async def list_page(offset):
+                async with semaphore:
+                    return await self._list_page_async(
+                        params, offset, ignore_error=ignore_error
+                    )
+
+            page_results = await asyncio.gather(
+                *[list_page(offset) for offset in offsets]
+            )
+
+        return self._merge_pages(response, offsets, page_results, ignore_error)
+
+    @staticmethod
+    def _get_page_offsets(first_page, length):
+        """returns offsets of the pages after first page"""
+
+        total_matches = int(first_page["metadata"]["total_matches"])
+        return list(range(length, total_matches, length))
+
+    @staticmethod
+    def _get_page_concurrency(concurrency, page_count):
+        """returns number of pages fetched in parallel, defaults to
+        'concurrency' in connection config"""
+
+        if concurrency is None:
+            context = get_context()
+            concurrency = context.get_connection_config()["concurrency"]
+        return max(1, min(int(concurrency), page_count))
+
+    @staticmethod
+    def _get_list_all_error(err, ignore_error):
+        if ignore_error:
+            return [], err
+        raise Exception("[{}] - {}".format(err["code"], err["error"]))
+
+    def _merge_pages(self, first_page, offsets, page_results, ignore_error):
+        """returns entities of all the pages, in page order. Errors of failed
+        pages are aggregated in a single error"""
+
+        final_list = list(first_page["entities"])
+        page_errors = []
+        for offset, (response, err) in zip(offsets, page_results):
+            if err:
+                LOG.debug(
+                    "Failed to fetch page at offset {} of {}: [{}] - {}".format(
+                        offset, self.LIST, err["code"], err["error"]
+                    )
+                )
+                page_errors.append(err)
+                continue
+
+            final_list.extend(response["entities"])
+
+        if page_errors:
+            LOG.warning(
+                "Failed to fetch {} out of {} pages of {}".format(
+                    len(page_errors), len(offsets) + 1, self.LIST
+                )
+            )
+            err = {
+                "code": page_errors[0]["code"],
+                "error": "{} pages failed, first error: {}".format(
+                    len(page_errors), page_errors[0]["error"]
+                ),
+            }
+            return self._get_list_all_error(err, ignore_error)
 
         if ignore_error:
             return final_list, None
 
         return final_list
 
+    @sync_only
+    def iter_all(self, api_limit=250, base_params=None, prefetch=True):
+        """yields the entities page by page
+
+        Only the current page (and the next one, if prefetch is enabled) is
+        kept in memory. Next page is fetched in background while entities of
+        the current page are consumed.
+
+        Args:
+            api_limit (int): page size, if length is not given in base_params
+            base_params (dict): list api payload
+            prefetch (bool): fetch next page while current page is consumed
+        Raises:
+            Exception: If any of the page fails to get fetched
+        """
+
+        params = self._get_list_all_params(api_limit, base_params)
+        length = params["length"]
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+
+        try:
+            offset = 0
+            response, err = self._list_page(params, offset, ignore_error=True)
+            while True:
+                if err:
+                    raise Exception("[{}] - {}".format(err["code"], err["error"]))
+
+                entities = response["entities"]
+                total_matches = int(response["metadata"]["total_matches"])
+                response = None
+
+                offset += length
+                has_next_page = bool(entities) and offset < total_matches
+                next_page = None
+                if has_next_page and executor:
+                    next_page = executor.submit(
+                        self._list_page, params, offset, ignore_error=True
+                    )
+
+                for entity in entities:
+                    yield entity
+
+                if not has_next_page:
+                    break
+
+                if next_page:
+                    response, err = next_page.result()
+                else:
+                    response, err = self._list_page(params, offset, ignore_error=True)
+
+        finally:
+            if executor:
+                executor.shutdown(wait=True)
+
 
 def get_resource_api(resource_type, connection, calm_api=False):
     return ResourceAPI(connection, resource_type, calm_api=calm_api)
@@ -2,7 +2,7 @@ import os
 from distutils.version import LooseVersion as LV
 
 
-from .resource import ResourceAPI
+from .resource import ResourceAPI, sync_only
 from .connection import REQUEST
 from .util import strip_secrets, patch_secrets
 from calm.dsl.config import get_context
@@ -116,6 +116,7 @@ class RunbookAPI(ResourceAPI):
 
         return runbook_payload
 
+    @sync_only
     def upload_with_secrets(
         self,
         runbook_name,
@@ -299,6 +300,7 @@ class RunbookAPI(ResourceAPI):
                 self.POLL_RUN.format(uuid), verify=False, method=REQUEST.METHOD.GET
             )
 
+    @sync_only
     def update_with_secrets(
         self,
         uuid,
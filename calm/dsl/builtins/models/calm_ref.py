@@ -2,7 +2,6 @@ import sys
 import uuid
 import json
 
-from calm.dsl.db.table_config import AhvSubnetsCache
 from calm.dsl.builtins.models.constants import NutanixDB as NutanixDBConst
 
 from .entity import Entity, EntityType, EntityDict
@@ -126,8 +125,12 @@ class Ref:
 
             LOG.debug("Searching for subnet with name: {}".format(name))
             subnet_cache_data = None
-            subnet_cache_data = AhvSubnetsCache.get_entity_data(
-                name, cluster=cluster, vpc=vpc, account_uuid=account_uuid
+            subnet_cache_data = Cache.get_entity_data(
+                entity_type=CACHE.ENTITY.AHV_SUBNET,
+                name=name,
+                cluster=cluster,
+                vpc=vpc,
+                account_uuid=account_uuid,
             )
 
             if not subnet_cache_data:
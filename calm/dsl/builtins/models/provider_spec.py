@@ -8,6 +8,7 @@ from calm.dsl.builtins import file_exists
 from .entity import EntityType
 from .validator import PropertyValidator
 from calm.dsl.log import get_logging_handle
+from calm.dsl.tools import DependencyTracker
 
 LOG = get_logging_handle(__name__)
 
@@ -52,6 +53,7 @@ def read_spec(filename, depth=1):
         LOG.debug("file {} not found at location {}".format(filename, file_path))
         raise ValueError("file {} not found".format(filename))
 
+    DependencyTracker.record_file(file_path)
     with open(file_path, "r") as f:
         spec = yaml.safe_load(f.read())
 
@@ -1,6 +1,11 @@
 """ Schema should be according to OpenAPI 3 format with x-calm-dsl-type extension"""
 
+import os
+import glob
 import json
+import pickle
+import hashlib
+import tempfile
 from copy import deepcopy
 from io import StringIO
 from distutils.version import LooseVersion as LV
@@ -12,20 +17,106 @@ from bidict import bidict
 
 from .validator import get_property_validators
 from calm.dsl.store import Version
+from calm.dsl.config import get_context
 from calm.dsl.log import get_logging_handle
 
 
 LOG = get_logging_handle(__name__)
 _SCHEMAS = None
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schemas")
+SCHEMA_CACHE_FILE_PREFIX = "schemas-"
+DEFAULT_CALM_VERSION = "2.9.0"
 
 
 def _get_all_schemas():
     global _SCHEMAS
     if not _SCHEMAS:
-        _SCHEMAS = _load_all_schemas()
+        _SCHEMAS = _load_cached_schemas()
     return _SCHEMAS
 
 
+def _get_schema_cache_file():
+    """returns file used to persist resolved schemas. File name contains
+    digest of schema templates, so any change in them invalidates the file"""
+
+    try:
+        init_config = get_context().get_init_config()
+        local_dir = init_config["LOCAL_DIR"]["location"]
+    except Exception:
+        LOG.debug("Local dir not found, schemas will not be persisted")
+        return None
+
+    digest = hashlib.sha256()
+    for schema_file in sorted(glob.glob(os.path.join(SCHEMA_DIR, "*.jinja2"))):
+        digest.update(os.path.basename(schema_file).encode())
+        with open(schema_file, "rb") as fd:
+            digest.update(fd.read())
+
+    return os.path.join(
+        local_dir,
+        "{}{}.pickle".format(SCHEMA_CACHE_FILE_PREFIX, digest.hexdigest()[:16]),
+    )
+
+
+def _to_plain_schema(obj, memo):
+    """returns copy of schema with jsonref proxies replaced by dicts/lists.
+    References are shared in copy too, as in the resolved schema"""
+
+    if id(obj) in memo:
+        return memo[id(obj)]
+
+    if isinstance(obj, dict):
+        plain_obj = memo[id(obj)] = {}
+        for k, v in obj.items():
+            plain_obj[k] = _to_plain_schema(v, memo)
+    elif isinstance(obj, list):
+        plain_obj = memo[id(obj)] = []
+        for v in obj:
+            plain_obj.append(_to_plain_schema(v, memo))
+    else:
+        plain_obj = obj
+
+    return plain_obj
+
+
+def _load_cached_schemas():
+    """returns resolved schemas from file persisted by earlier run, rendering
+    and resolving the schema templates if file is not there"""
+
+    cache_file = _get_schema_cache_file()
+    if cache_file and os.path.isfile(cache_file):
+        try:
+            with open(cache_file, "rb") as fd:
+                return pickle.load(fd)
+        except Exception:
+            LOG.debug("Failed to load schemas from {}".format(cache_file))
+
+    schemas = _load_all_schemas()
+    if not cache_file:
+        return schemas
+
+    schemas = _to_plain_schema(schemas, {})
+    try:
+        cache_dir = os.path.dirname(cache_file)
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+        for stale_file in glob.glob(
+            os.path.join(cache_dir, SCHEMA_CACHE_FILE_PREFIX + "*.pickle")
+        ):
+            os.remove(stale_file)
+
+        # Write to temp file first, so parallel runs never read a partial file
+        fd, temp_file = tempfile.mkstemp(dir=cache_dir)
+        with os.fdopen(fd, "wb") as temp_fd:
+            pickle.dump(schemas, temp_fd, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, cache_file)
+    except Exception:
+        LOG.debug("Failed to persist schemas in {}".format(cache_file))
+
+    return schemas
+
+
 def _load_all_schemas(schema_file="main.yaml.jinja2"):
 
     loader = PackageLoader(__name__, "schemas")
@@ -70,7 +161,15 @@ def get_schema_props(name):
     return schema_props
 
 
-def get_validator_details(schema_props, name):
+def get_calm_version():
+    """returns calm version used to filter schema attributes"""
+
+    # dev machines do not follow standard version protocols. Avoid matching there
+    # Raise warning and set default to 2.9.0
+    return Version.get_version("Calm") or DEFAULT_CALM_VERSION
+
+
+def get_validator_details(schema_props, name, calm_version=None):
 
     object_type = False
     is_array = False
@@ -92,16 +191,14 @@ def get_validator_details(schema_props, name):
             raise Exception("x-calm-dsl-type extension for {} not found".format(name))
         elif type_ == "object":
             object_type = True
+            if not calm_version:
+                calm_version = get_calm_version()
+
             for name in props.get("properties", {}):
                 attr_props = props["properties"].get(name, dict())
-                calm_version = Version.get_version("Calm")
-
-                # dev machines do not follow standard version protocols. Avoid matching there
                 attribute_min_version = str(
                     attr_props.get("x-calm-dsl-min-version", "")
                 )
-                if not calm_version:
-                    calm_version = "2.9.0"  # Raise warning and set default to 2.9.0
 
                 # If attribute version is less than calm version, ignore it
                 if attribute_min_version and LV(attribute_min_version) > LV(
@@ -110,7 +207,7 @@ def get_validator_details(schema_props, name):
                     continue
 
                 validator, is_array, default = get_validator_details(
-                    props["properties"], name
+                    props["properties"], name, calm_version
                 )
                 attr_name = props["properties"][name].get(
                     "x-calm-dsl-display-name", name
@@ -128,7 +225,7 @@ def get_validator_details(schema_props, name):
             LOG.debug("Item type not found in schema {}".format(item_props))
             raise Exception("Invalid schema {} given".format(item_props))
 
-        ValidatorType, _, _ = get_validator_details(props, "items")
+        ValidatorType, _, _ = get_validator_details(props, "items", calm_version)
         return ValidatorType, True, list
 
     property_validators = get_property_validators()
@@ -160,20 +257,17 @@ def get_validators_with_defaults(schema_props):
     validators = {}
     defaults = {}
     display_map = bidict()
+    calm_version = get_calm_version()
     for name, props in schema_props.items():
-        calm_version = Version.get_version("Calm")
-
-        # dev machines do not follow standard version protocols. Avoid matching there
         attribute_min_version = str(props.get("x-calm-dsl-min-version", ""))
-        if not calm_version:
-            # Raise warning and set default to 2.9.0
-            calm_version = "2.9.0"
 
         # If attribute version is less than calm version, ignore it
         if attribute_min_version and LV(attribute_min_version) > LV(calm_version):
             continue
 
-        ValidatorType, is_array, default = get_validator_details(schema_props, name)
+        ValidatorType, is_array, default = get_validator_details(
+            schema_props, name, calm_version
+        )
         attr_name = props.get("x-calm-dsl-display-name", name)
         validators[attr_name] = (ValidatorType, is_array)
         if props.get("x-calm-dsl-default-required", True):
@@ -14,6 +14,7 @@ from .helper import common as common_helper
 
 from calm.dsl.log import get_logging_handle
 from calm.dsl.api.handle import get_api_client
+from calm.dsl.tools import DependencyTracker
 from calm.dsl.builtins.models.ndb import (
     DatabaseServer,
     Database,
@@ -221,6 +222,7 @@ def _exec_create(
         file_path = os.path.join(
             os.path.dirname(sys._getframe(depth).f_globals.get("__file__")), filename
         )
+        DependencyTracker.record_file(file_path)
         with open(file_path, "r") as scriptf:
             script = scriptf.read()
 
@@ -268,6 +270,7 @@ def _decision_create(
             os.path.dirname(sys._getframe(depth).f_globals.get("__file__")), filename
         )
 
+        DependencyTracker.record_file(file_path)
         with open(file_path, "r") as scriptf:
             script = scriptf.read()
 
@@ -7,6 +7,7 @@ from ruamel import yaml
 import re
 from calm.dsl.log import get_logging_handle
 from calm.dsl.config import get_context
+from calm.dsl.tools import DependencyTracker
 
 LOG = get_logging_handle(__name__)
 
@@ -27,6 +28,7 @@ def read_file(filename, depth=1):
         LOG.debug("file {} not found at location {}".format(filename, file_path))
         raise ValueError("file {} not found".format(filename))
 
+    DependencyTracker.record_file(file_path)
     with open(file_path, "r") as data:
         return data.read()
 
@@ -53,12 +55,13 @@ def read_env(relpath=".env"):
     """
 
     # Init env
-    os_env = dict(os.environ)
+    os_env = dict(DependencyTracker.get_environ())
 
     # Get filepath
     filepath = _get_caller_filepath(relpath)
 
     LOG.debug("Reading env from file: {}".format(filepath))
+    DependencyTracker.record_file(filepath)
 
     # Check if file path exists
     if not os.path.exists(filepath):
@@ -100,7 +103,7 @@ def read_env(relpath=".env"):
     # Give priority to local env over OS env
     env = {**os_env, **local_env}
 
-    return env
+    return DependencyTracker.track_env(env, set(local_env))
 
 
 def file_exists(file_path):
@@ -116,6 +119,7 @@ def read_local_file(filename):
     )
 
     # If not exists read from home directory
+    DependencyTracker.record_file(abs_file_path)
     if not file_exists(abs_file_path):
         ContextObj = get_context()
         init_data = ContextObj.get_init_config()
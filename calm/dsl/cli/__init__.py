@@ -1,36 +1,72 @@
+import sys
+import importlib.util
+
 from .main import main
-from .bp_commands import *  # NoQA
-from .app_commands import *  # NoQA
-from .runbook_commands import *  # NoQA
-from .library_tasks_commands import *  # NoQA
-from .endpoint_commands import *  # NoQA
-from .config_commands import *  # NoQA
-from .account_commands import *  # NoQA
-from .provider_commands import *  # NoQA
-from .project_commands import *  # NoQA
-from .secret_commands import *  # NoQA
-from .cache_commands import *  # NoQA
-from .completion_commands import *  # NoQA
-from .init_command import *  # NoQA
-from calm.dsl.api import get_api_client
-from .marketplace_bp_commands import *  # NoQA
-from .marketplace_item_commands import *  # NoQA
-from .marketplace_runbook_commands import *  # NoQA
-from .app_icon_commands import *  # NoQA
-from .user_commands import *  # NoQA
-from .group_commands import *  # NoQA
-from .role_commands import *  # NoQA
-from .directory_service_commands import *  # NoQA
-from .acp_commands import *  # NoQA
-from .task_commands import *  # NoQA
-from .brownfield_commands import *  # NoQA
-from .environment_commands import *  # NoQA
-from .protection_policy_commands import *  # NoQA
-from .vm_recovery_point_commands import *  # NoQA
-from .scheduler_commands import *  # NoQA
-from .network_group_commands import *  # NoQA
-from .policy_commands import *  # NoQA
-from .approval_commands import *  # NoQA
-from .approval_request_commands import *  # NoQA
+from .command_index import CommandIndex
+
+# Modules registering the subcommands of cli, imported lazily
+COMMAND_MODULES = [
+    "bp_commands",
+    "app_commands",
+    "runbook_commands",
+    "library_tasks_commands",
+    "endpoint_commands",
+    "config_commands",
+    "account_commands",
+    "provider_commands",
+    "project_commands",
+    "secret_commands",
+    "cache_commands",
+    "completion_commands",
+    "init_command",
+    "marketplace_bp_commands",
+    "marketplace_item_commands",
+    "marketplace_runbook_commands",
+    "app_icon_commands",
+    "user_commands",
+    "group_commands",
+    "role_commands",
+    "directory_service_commands",
+    "acp_commands",
+    "task_commands",
+    "brownfield_commands",
+    "environment_commands",
+    "protection_policy_commands",
+    "vm_recovery_point_commands",
+    "scheduler_commands",
+    "network_group_commands",
+    "policy_commands",
+    "approval_commands",
+    "approval_request_commands",
+    "daemon_commands",
+    "batch_compile_commands",
+]
+
+CommandIndex.init(main, __name__, COMMAND_MODULES)
+
+
+def __getattr__(name):
+    """returns the names exported by command modules, importing all of them"""
+
+    if name.startswith("__"):
+        raise AttributeError(name)
+
+    if name == "get_api_client":
+        from calm.dsl.api import get_api_client
+
+        return get_api_client
+
+    # Submodules are imported directly
+    if importlib.util.find_spec("{}.{}".format(__name__, name)):
+        return importlib.import_module("{}.{}".format(__name__, name))
+
+    CommandIndex.load_all()
+    for module in COMMAND_MODULES:
+        module_obj = sys.modules["{}.{}".format(__name__, module)]
+        if not name.startswith("_") and hasattr(module_obj, name):
+            return getattr(module_obj, name)
+
+    raise AttributeError("module {} has no attribute {}".format(__name__, name))
+
 
 __all__ = ["main", "get_api_client"]
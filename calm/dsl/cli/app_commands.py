@@ -8,6 +8,7 @@ from .apps import (
     get_apps,
     describe_app,
     run_actions,
+    run_bulk_actions,
     run_patches,
     watch_patch_or_action,
     watch_app,
@@ -52,12 +53,20 @@ LOG = get_logging_handle(__name__)
     type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
     help="Path to python file for runtime editables",
 )
+@click.option(
+    "--no-cache",
+    "no_cache",
+    is_flag=True,
+    default=False,
+    help="Compile the blueprint, instead of reusing payload from compile cache",
+)
 def _create_app(
     app_name,
     bp_file,
     brownfield_deployment_file,
     ignore_runtime_variables,
     launch_params,
+    no_cache,
 ):
     """Creates an application.
 
@@ -73,6 +82,7 @@ def _create_app(
         patch_editables=not ignore_runtime_variables,
         launch_params=launch_params,
         brownfield_deployment_file=brownfield_deployment_file,
+        use_cache=not no_cache,
     )
 
 
@@ -126,9 +136,34 @@ def _describe_app(app_name, out):
     "app_name",
     "-a",
     default=None,
-    required=True,
     help="Watch action run in an app",
 )
+@click.option(
+    "--app-filter",
+    "app_filter",
+    default=None,
+    help="Run action on all apps with name containing this string",
+)
+@click.option(
+    "--apps-file",
+    "apps_file",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
+    help="Run action on all apps in file, having an app name per line",
+)
+@click.option(
+    "--concurrency",
+    "-c",
+    type=int,
+    default=None,
+    help="Max number of apps on which action is submitted in parallel (with --app-filter/--apps-file)",
+)
+@click.option(
+    "--timeout",
+    type=int,
+    default=60 * 60,
+    show_default=True,
+    help="Seconds to wait for actions to complete (with --app-filter/--apps-file)",
+)
 @click.option(
     "--ignore_runtime_variables",
     "-i",
@@ -145,7 +180,15 @@ def _describe_app(app_name, out):
 )
 @click.option("--watch/--no-watch", "-w", default=False, help="Watch scrolling output")
 def _run_actions(
-    app_name, action_name, watch, ignore_runtime_variables, runtime_params_file
+    app_name,
+    app_filter,
+    apps_file,
+    concurrency,
+    timeout,
+    action_name,
+    watch,
+    ignore_runtime_variables,
+    runtime_params_file,
 ):
     """App lcm actions.
     All runtime variables will be prompted by default. When passing the 'ignore_runtime_editable' flag, no variables will be prompted and all default values will be used.
@@ -159,8 +202,29 @@ def _run_actions(
                 "name": "<Variable Name>"
             }
         ]
+
+    \b
+    Bulk mode: When passing '--app-filter' or '--apps-file' instead of '--app', action is run on all
+    the matching apps with bounded concurrency, without prompting for runtime variables. Action runlogs of
+    all apps are watched together, and a summary of result and duration per app is displayed at the end.
     """
 
+    if len([opt for opt in [app_name, app_filter, apps_file] if opt]) != 1:
+        raise click.UsageError(
+            "Exactly one of '--app', '--app-filter' or '--apps-file' is required"
+        )
+
+    if app_filter or apps_file:
+        run_bulk_actions(
+            action_name=action_name,
+            app_filter=app_filter,
+            apps_file=apps_file,
+            concurrency=concurrency,
+            runtime_params_file=runtime_params_file,
+            timeout=timeout,
+        )
+        return
+
     run_actions(
         app_name=app_name,
         action_name=action_name,
@@ -5,6 +5,7 @@ import json
 import re
 import uuid
 from json import JSONEncoder
+from concurrent.futures import ThreadPoolExecutor
 
 import arrow
 import click
@@ -16,14 +17,7 @@ from calm.dsl.config import get_context
 
 from .utils import get_name_query, get_states_filter, highlight_text, Display
 from .constants import APPLICATION, RUNLOG, SYSTEM_ACTIONS
-from .bps import (
-    launch_blueprint_simple,
-    compile_blueprint,
-    create_blueprint,
-    get_app,
-    parse_launch_runtime_vars,
-    parse_launch_params_attribute,
-)
+from .poller import Poller, poll_until, get_poll_state
 from calm.dsl.log import get_logging_handle
 
 LOG = get_logging_handle(__name__)
@@ -268,12 +262,23 @@ def create_app(
     profile_name=None,
     patch_editables=True,
     launch_params=None,
+    use_cache=True,
 ):
+    # Blueprint modules are heavy, so imported only while creating app
+    from .bps import (
+        compile_blueprint,
+        create_blueprint,
+        get_app,
+        launch_blueprint_simple,
+    )
+
     client = get_api_client()
 
     # Compile blueprint
     bp_payload = compile_blueprint(
-        bp_file, brownfield_deployment_file=brownfield_deployment_file
+        bp_file,
+        brownfield_deployment_file=brownfield_deployment_file,
+        use_cache=use_cache,
     )
     if bp_payload is None:
         LOG.error("User blueprint not found in {}".format(bp_file))
@@ -664,6 +669,8 @@ def get_patch_runtime_args(
 ):
     """Returns patch arguments or variable data"""
 
+    from .bps import parse_launch_params_attribute
+
     patch_name = patch_payload["name"]
 
     patch_args = {}
@@ -1162,6 +1169,8 @@ def get_action_runtime_args(
 ):
     """Returns action arguments or variable data"""
 
+    from .bps import parse_launch_runtime_vars
+
     action_name = action_payload["name"]
 
     runtime_vars = {}
@@ -1398,50 +1407,26 @@ def get_recovery_point_group_arg(config, config_task_id, recovery_groups):
     }
 
 
-def run_actions(
-    app_name, action_name, watch, patch_editables=False, runtime_params_file=None
-):
-    client = get_api_client()
-    if action_name.lower() == SYSTEM_ACTIONS.CREATE:
-        click.echo(
-            "The Create Action is triggered automatically when you deploy a blueprint. It cannot be run separately."
-        )
-        return
-    if action_name.lower() == SYSTEM_ACTIONS.DELETE:
-        # Because Delete requries a differernt API workflow
-        delete_app([app_name])
-        return
-    if action_name.lower() == SYSTEM_ACTIONS.SOFT_DELETE:
-        delete_app(
-            [app_name], soft=True
-        )  # Because Soft Delete also requries the differernt API workflow
-        return
-
-    app = _get_app(client, app_name)
-    app_spec = app["spec"]
-    app_id = app["metadata"]["uuid"]
+def get_app_action(app, action_name):
+    """returns the payload of app action matching the action name"""
 
     calm_action_name = "action_" + action_name.lower()
-    action_payload = next(
+    return next(
         (
             action
-            for action in app_spec["resources"]["action_list"]
+            for action in app["spec"]["resources"]["action_list"]
             if action["name"] == calm_action_name or action["name"] == action_name
         ),
         None,
     )
-    if not action_payload:
-        LOG.error("No action found matching name {}".format(action_name))
-        sys.exit(-1)
 
-    action_id = action_payload["uuid"]
 
-    action_args = get_action_runtime_args(
-        app_uuid=app_id,
-        action_payload=action_payload,
-        patch_editables=patch_editables,
-        runtime_params_file=runtime_params_file,
-    )
+def trigger_app_action(client, app, action_payload, action_args):
+    """runs the action on app with given args, returns the action runlog uuid"""
+
+    app_id = app["metadata"]["uuid"]
+    action_id = action_payload["uuid"]
+    action_args = list(action_args)
 
     # Hit action run api (with metadata and minimal spec: [args, target_kind, target_uuid])
     status = app.pop("status")
@@ -1488,8 +1473,44 @@ def run_actions(
     if err:
         raise Exception("[{}] - {}".format(err["code"], err["error"]))
 
-    response = res.json()
-    runlog_uuid = response["status"]["runlog_uuid"]
+    return res.json()["status"]["runlog_uuid"]
+
+
+def run_actions(
+    app_name, action_name, watch, patch_editables=False, runtime_params_file=None
+):
+    client = get_api_client()
+    if action_name.lower() == SYSTEM_ACTIONS.CREATE:
+        click.echo(
+            "The Create Action is triggered automatically when you deploy a blueprint. It cannot be run separately."
+        )
+        return
+    if action_name.lower() == SYSTEM_ACTIONS.DELETE:
+        # Because Delete requries a differernt API workflow
+        delete_app([app_name])
+        return
+    if action_name.lower() == SYSTEM_ACTIONS.SOFT_DELETE:
+        delete_app(
+            [app_name], soft=True
+        )  # Because Soft Delete also requries the differernt API workflow
+        return
+
+    app = _get_app(client, app_name)
+    app_id = app["metadata"]["uuid"]
+
+    action_payload = get_app_action(app, action_name)
+    if not action_payload:
+        LOG.error("No action found matching name {}".format(action_name))
+        sys.exit(-1)
+
+    action_args = get_action_runtime_args(
+        app_uuid=app_id,
+        action_payload=action_payload,
+        patch_editables=patch_editables,
+        runtime_params_file=runtime_params_file,
+    )
+
+    runlog_uuid = trigger_app_action(client, app, action_payload, action_args)
     click.echo(
         "Action is triggered. Got Action Runlog uuid: {}".format(
             highlight_text(runlog_uuid)
@@ -1528,22 +1549,250 @@ def run_actions(
         )
 
 
-def poll_runnnable(poll_func, completion_func, poll_interval=10):
-    # Poll every 10 seconds on the app status, for 5 mins
-    maxWait = 5 * 60
-    count = 0
-    while count < maxWait:
+def get_bulk_action_apps(client, app_filter=None, apps_file=None):
+    """returns {app_name: app_uuid} of apps matching the name filter or the
+    names in apps file. Names not found are mapped to None"""
+
+    if app_filter:
+        entities = client.application.list_all(
+            base_params={"filter": get_name_query([app_filter])}
+        )
+        return {
+            entity["metadata"]["name"]: entity["metadata"]["uuid"]
+            for entity in entities
+        }
+
+    with open(apps_file, "r") as fd:
+        app_names = [
+            line.strip()
+            for line in fd.read().splitlines()
+            if line.strip() and not line.strip().startswith("#")
+        ]
+
+    # Apps are fetched once, instead of a lookup per app name
+    app_uuid_map = {
+        entity["metadata"]["name"]: entity["metadata"]["uuid"]
+        for entity in client.application.list_all()
+    }
+    return {app_name: app_uuid_map.get(app_name) for app_name in app_names}
+
+
+def submit_app_action(client, app_uuid, action_name, runtime_params_file=None):
+    """triggers the action on app without prompting for runtime variables,
+    returns the action runlog uuid"""
+
+    res, err = client.application.read(app_uuid)
+    if err:
+        raise Exception("[{}] - {}".format(err["code"], err["error"]))
+    app = res.json()
+
+    action_payload = get_app_action(app, action_name)
+    if not action_payload:
+        raise Exception("No action found matching name {}".format(action_name))
+
+    # Snapshot name and recovery group are prompted, that can't be done in bulk
+    config_types = get_prompted_config_types(app, action_payload)
+    if config_types:
+        raise Exception(
+            "Action {} prompts for {} config values, it cannot be run in bulk".format(
+                action_name, ", ".join(config_types)
+            )
+        )
+
+    action_args = get_action_runtime_args(
+        app_uuid=app_uuid,
+        action_payload=action_payload,
+        patch_editables=bool(runtime_params_file),
+        runtime_params_file=runtime_params_file,
+    )
+    return trigger_app_action(client, app, action_payload, action_args)
+
+
+def get_prompted_config_types(app, action_payload):
+    """returns types of snapshot/restore configs called by action, whose
+    values are prompted while triggering the action"""
+
+    config_list = list(app["status"]["resources"]["snapshot_config_list"])
+    config_list.extend(app["status"]["resources"]["restore_config_list"])
+    config_types = {config["uuid"]: config["type"] for config in config_list}
+
+    prompted_types = []
+    for task in action_payload["runbook"]["task_definition_list"]:
+        if task["type"] != "CALL_CONFIG":
+            continue
+        config_type = config_types.get(task["attrs"]["config_spec_reference"]["uuid"])
+        if config_type in ["AHV_SNAPSHOT", "AHV_RESTORE"]:
+            prompted_types.append(config_type)
+
+    return prompted_types
+
+
+def get_action_runlog_poll_func(client, app_uuid, runlog_uuid):
+    """returns poll func of Poller, completed once the action runlog and all
+    its child runlogs are in terminal state"""
+
+    url = client.application.ITEM.format(app_uuid) + "/app_runlogs/list"
+    payload = {"filter": "root_reference=={}".format(runlog_uuid)}
+
+    def poll():
+        res, err = client.application.poll_action_run(url, payload)
+        if err:
+            return True, None, "[{}] - {}".format(err["code"], err["error"])
+
+        runlog_states = [
+            (entity["metadata"]["uuid"], entity["status"]["state"])
+            for entity in res.json()["entities"]
+        ]
+        if not runlog_states:
+            return False, runlog_states, RUNLOG.STATUS.PENDING
+
+        for _, state in runlog_states:
+            if state in RUNLOG.FAILURE_STATES:
+                return True, runlog_states, state
+
+        for _, state in runlog_states:
+            if state not in RUNLOG.TERMINAL_STATES:
+                return False, runlog_states, RUNLOG.STATUS.RUNNING
+
+        return True, runlog_states, RUNLOG.STATUS.SUCCESS
+
+    return poll
+
+
+def run_bulk_actions(
+    action_name,
+    app_filter=None,
+    apps_file=None,
+    concurrency=None,
+    runtime_params_file=None,
+    timeout=60 * 60,
+):
+    """Runs the action on all apps matching the name filter or the names in
+    apps file. Actions are submitted concurrently, and their runlogs are
+    watched on a single poll loop. Runtime variables are not prompted, and
+    actions calling snapshot/restore configs are rejected."""
+
+    client = get_api_client()
+    if action_name.lower() == SYSTEM_ACTIONS.CREATE:
+        click.echo(
+            "The Create Action is triggered automatically when you deploy a blueprint. It cannot be run separately."
+        )
+        return
+
+    app_uuid_map = get_bulk_action_apps(client, app_filter, apps_file)
+    if not app_uuid_map:
+        LOG.warning("No application found")
+        return
+
+    if action_name.lower() in [SYSTEM_ACTIONS.DELETE, SYSTEM_ACTIONS.SOFT_DELETE]:
+        # Because Delete requries a differernt API workflow
+        delete_app(
+            [name for name, uuid in app_uuid_map.items() if uuid],
+            soft=action_name.lower() == SYSTEM_ACTIONS.SOFT_DELETE,
+        )
+        return
+
+    if concurrency is None:
+        concurrency = get_context().get_connection_config()["concurrency"]
+
+    # {app_name: [runlog_uuid, result, start time, end time]}
+    app_results = {}
+    for app_name, app_uuid in app_uuid_map.items():
+        app_results[app_name] = [None, "NOT FOUND", None, None]
+
+    def submit(app_name):
+        app_results[app_name][2] = time.time()
+        try:
+            app_results[app_name][0] = submit_app_action(
+                client, app_uuid_map[app_name], action_name, runtime_params_file
+            )
+            app_results[app_name][1] = RUNLOG.STATUS.PENDING
+        # Errors of an app are reported in its result, instead of exiting
+        except SystemExit:
+            app_results[app_name][1] = "SUBMIT FAILED: Check the logs above"
+            app_results[app_name][3] = time.time()
+        except Exception as exp:
+            LOG.debug("Failed to run action on app {}: {}".format(app_name, exp))
+            app_results[app_name][1] = "SUBMIT FAILED: {}".format(exp)
+            app_results[app_name][3] = time.time()
+
+    app_names = [name for name, uuid in app_uuid_map.items() if uuid]
+    LOG.info(
+        "Running action '{}' on {} apps, with {} concurrent requests".format(
+            action_name, len(app_names), concurrency
+        )
+    )
+    with ThreadPoolExecutor(max_workers=max(1, int(concurrency))) as executor:
+        list(executor.map(submit, app_names))
+
+    def get_poll_func(app_name):
+        poll_func = get_action_runlog_poll_func(
+            client, app_uuid_map[app_name], app_results[app_name][0]
+        )
+
+        def poll():
+            completed, state, result = poll_func()
+            if completed:
+                app_results[app_name][3] = time.time()
+            return completed, state, result
+
+        return poll
+
+    # Runlogs of all the apps are watched on a single loop
+    poller = Poller(timeout=timeout)
+    for app_name in app_names:
+        if app_results[app_name][0]:
+            poller.add(app_name, get_poll_func(app_name))
+
+    LOG.info("Watching {} action runlogs".format(len(poller.targets)))
+    for app_name, (completed, result) in poller.run().items():
+        if completed:
+            app_results[app_name][1] = result
+        else:
+            app_results[app_name][1] = "TIMEOUT"
+            app_results[app_name][3] = time.time()
+
+    table = PrettyTable()
+    table.field_names = ["APP NAME", "RUNLOG UUID", "RESULT", "DURATION (s)"]
+    failed_apps = 0
+    for app_name, (runlog_uuid, result, start, end) in app_results.items():
+        if result != RUNLOG.STATUS.SUCCESS:
+            failed_apps += 1
+        table.add_row(
+            [
+                highlight_text(app_name),
+                highlight_text(runlog_uuid or "-"),
+                highlight_text(result),
+                highlight_text("{:.1f}".format(end - start) if start and end else "-"),
+            ]
+        )
+    click.echo(table)
+
+    if failed_apps:
+        LOG.error(
+            "Action '{}' did not succeed on {} out of {} apps".format(
+                action_name, failed_apps, len(app_results)
+            )
+        )
+        sys.exit(-1)
+
+    LOG.info(
+        "Action '{}' succeeded on all {} apps".format(action_name, len(app_results))
+    )
+
+
+def poll_runnnable(poll_func, completion_func, poll_interval=10, timeout=5 * 60):
+    # Poll on the app status with backoff till poll_interval, for 5 mins
+    def poll():
         # call status api
         res, err = poll_func()
         if err:
             raise Exception("[{}] - {}".format(err["code"], err["error"]))
         response = res.json()
         (completed, msg) = completion_func(response)
-        if completed:
-            # click.echo(msg)
-            break
-        count += poll_interval
-        time.sleep(poll_interval)
+        return completed, get_poll_state(response), msg
+
+    poll_until(poll, timeout=timeout, max_interval=poll_interval)
 
 
 def download_runlog(runlog_id, app_name, file_name):
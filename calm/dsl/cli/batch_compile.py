@@ -0,0 +1,364 @@
+import os
+import sys
+import ast
+import copy
+import glob
+import json
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import click
+from ruamel import yaml
+from prettytable import PrettyTable
+
+from calm.dsl.config import get_context
+from calm.dsl.log import get_logging_handle, CustomLogging
+from calm.dsl.daemon_client import NO_DAEMON_ENV
+
+from .utils import highlight_text
+
+LOG = get_logging_handle(__name__)
+
+REPORT_FILE = "compile_report.json"
+
+# Base classes (and decorators) identifying the entity defined in a dsl file,
+# in order of precedence. Runbook files use endpoints as targets, and
+# blueprint files define credentials, so the first match wins.
+ENTITY_MARKERS = [
+    ("blueprint", ["Blueprint", "SimpleBlueprint", "VmBlueprint"]),
+    ("project", ["Project"]),
+    ("runbook", ["runbook"]),
+    ("endpoint", ["Endpoint", "CalmEndpoint"]),
+]
+
+# Set in worker processes by init_worker
+_WORKER_STATE = {}
+
+
+def get_base_name(node):
+    """returns the leftmost name of `a.b.c` or `a.b(...)` expressions"""
+
+    while True:
+        if isinstance(node, ast.Call):
+            node = node.func
+        elif isinstance(node, ast.Attribute):
+            node = node.value
+        elif isinstance(node, ast.Name):
+            return node.id
+        else:
+            return None
+
+
+def get_entity_type(dsl_file):
+    """returns type of the entity defined in dsl file, None if the file is
+    not a dsl entity file. The file is parsed, not executed"""
+
+    try:
+        with open(dsl_file) as fd:
+            tree = ast.parse(fd.read(), filename=dsl_file)
+    except (OSError, SyntaxError, ValueError):
+        # Compiled anyway, to report the error
+        return "unknown"
+
+    names = set()
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            names.update(get_base_name(base) for base in node.bases)
+        elif isinstance(node, ast.FunctionDef):
+            names.update(get_base_name(dec) for dec in node.decorator_list)
+        elif isinstance(node, ast.Assign):
+            # Endpoints are defined as `Ep = Endpoint.Linux.ip(...)`
+            names.add(get_base_name(node.value))
+
+    for entity_type, markers in ENTITY_MARKERS:
+        if names.intersection(markers):
+            return entity_type
+
+    return None
+
+
+def get_dsl_files(paths):
+    """returns (file, entity_type) of the dsl files in given directories or
+    glob patterns. Directories are searched recursively"""
+
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(glob.glob(os.path.join(path, "**", "*.py"), recursive=True))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            files.extend(
+                file for file in glob.glob(path, recursive=True) if file.endswith(".py")
+            )
+
+    dsl_files = []
+    for dsl_file in sorted(set(os.path.abspath(file) for file in files)):
+        entity_type = get_entity_type(dsl_file)
+        if entity_type:
+            dsl_files.append((dsl_file, entity_type))
+        else:
+            LOG.debug("Skipping {}, no dsl entity found".format(dsl_file))
+
+    return dsl_files
+
+
+class _ErrorCollector(logging.Handler):
+    """Collects the error logs of the file being compiled"""
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.errors = []
+
+    def emit(self, record):
+        # Strip the caller info added by CustomLogging
+        msg = record.getMessage().split("] ", 1)[-1]
+        self.errors.append(msg)
+
+
+def init_worker(config_file, verbose_level, use_cache):
+    """initializes the state of worker process, shared by the files it compiles"""
+
+    CustomLogging.set_verbose_level(verbose_level)
+    if config_file:
+        get_context().update_config_file_context(config_file=config_file)
+
+    # Loads the models once per worker
+    from calm.dsl.builtins import get_dsl_metadata_map
+
+    error_collector = _ErrorCollector()
+    logging.getLogger().addHandler(error_collector)
+
+    _WORKER_STATE.update(
+        {
+            "config_file": config_file,
+            "use_cache": use_cache,
+            "error_collector": error_collector,
+            "metadata_map": get_dsl_metadata_map(),
+        }
+    )
+
+
+def reset_worker_state():
+    """resets the module level state left by previous compile, so that files
+    compiled by the same worker do not affect each other"""
+
+    from calm.dsl.builtins import init_dsl_metadata_map
+    from calm.dsl.builtins.models.metadata_payload import reset_metadata_obj
+    from calm.dsl.decompile.main import init_decompile_context
+
+    init_dsl_metadata_map(copy.deepcopy(_WORKER_STATE["metadata_map"]))
+    reset_metadata_obj()
+    init_decompile_context()
+
+    ContextObj = get_context()
+    ContextObj.reset_configuration()
+    if _WORKER_STATE["config_file"]:
+        ContextObj.update_config_file_context(config_file=_WORKER_STATE["config_file"])
+
+    _WORKER_STATE["error_collector"].errors = []
+
+
+def compile_dsl_file(dsl_file, entity_type):
+    """returns payload of the entity in dsl file, None if not found"""
+
+    if entity_type == "blueprint":
+        from .bps import compile_blueprint
+
+        return compile_blueprint(dsl_file, use_cache=_WORKER_STATE["use_cache"])
+
+    elif entity_type == "runbook":
+        from .runbooks import compile_runbook
+
+        return compile_runbook(dsl_file)
+
+    elif entity_type == "endpoint":
+        from .endpoints import compile_endpoint
+
+        return compile_endpoint(dsl_file)
+
+    elif entity_type == "project":
+        from .projects import (
+            get_project_module_from_file,
+            get_project_class_from_module,
+            compile_project_dsl_class,
+        )
+
+        UserProject = get_project_class_from_module(
+            get_project_module_from_file(dsl_file)
+        )
+        if UserProject is None:
+            return None
+        return compile_project_dsl_class(UserProject)
+
+    # Files not parsed are loaded, to report the error
+    from calm.dsl.tools import get_module_from_file
+
+    get_module_from_file("calm.dsl.user_entity", dsl_file)
+    return None
+
+
+def compile_worker(dsl_file, entity_type, out_file, out):
+    """compiles the dsl file in worker process, writes the payload to out_file
+    and returns the result of compile"""
+
+    reset_worker_state()
+    error_collector = _WORKER_STATE["error_collector"]
+
+    result = {"file": dsl_file, "type": entity_type, "output": None, "error": None}
+    start_time = time.perf_counter()
+    try:
+        payload = compile_dsl_file(dsl_file, entity_type)
+        if payload is None:
+            raise Exception("No {} found in {}".format(entity_type, dsl_file))
+
+        os.makedirs(os.path.dirname(out_file), exist_ok=True)
+        with open(out_file, "w") as fd:
+            if out == "yaml":
+                yaml.dump(payload, fd, default_flow_style=False)
+            else:
+                json.dump(payload, fd, indent=4, separators=(",", ": "))
+        result["output"] = out_file
+
+    except SystemExit as exc:
+        errors = list(error_collector.errors)
+        if not isinstance(exc.code, int) and exc.code is not None:
+            errors.append(str(exc.code))
+        result["error"] = "\n".join(errors) or "Compilation failed"
+
+    except Exception as exc:
+        result["error"] = "\n".join(error_collector.errors + [str(exc)])
+
+    result["status"] = "FAILED" if result["error"] else "COMPILED"
+    result["duration"] = round(time.perf_counter() - start_time, 3)
+    return result
+
+
+def get_out_file(dsl_file, base_dir, out_dir, out):
+    rel_path = os.path.relpath(dsl_file, base_dir)
+    return os.path.join(out_dir, "{}.{}".format(os.path.splitext(rel_path)[0], out))
+
+
+def compile_dsl_files(
+    paths, out_dir, workers=None, out="json", use_cache=True, config_file=None
+):
+    """compiles the dsl files in paths using a pool of worker processes, and
+    returns the compile results in the order of files. config_file overrides
+    the config of workers, as passed to cli by `--config`"""
+
+    dsl_files = get_dsl_files(paths)
+    if not dsl_files:
+        LOG.warning("No dsl files found in {}".format(", ".join(paths)))
+        return []
+
+    base_dir = os.path.commonpath([os.path.dirname(file) for file, _ in dsl_files])
+    workers = min(workers or os.cpu_count() or 1, len(dsl_files))
+
+    LOG.info("Compiling {} files using {} workers".format(len(dsl_files), workers))
+
+    # Workers are spawned, not forked, so that they do not share the db
+    # connection and module state of this process. Schemas and cache db are
+    # loaded by each worker, and only read.
+    saved_no_daemon = os.environ.get(NO_DAEMON_ENV)
+    os.environ[NO_DAEMON_ENV] = "1"
+    results = {}
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(config_file, CustomLogging._VERBOSE_LEVEL, use_cache),
+        ) as executor:
+            futures = {
+                executor.submit(
+                    compile_worker,
+                    dsl_file,
+                    entity_type,
+                    get_out_file(dsl_file, base_dir, out_dir, out),
+                    out,
+                ): (dsl_file, entity_type)
+                for dsl_file, entity_type in dsl_files
+            }
+            for future in as_completed(futures):
+                dsl_file, entity_type = futures[future]
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    # Worker died, or result could not be pickled
+                    result = {
+                        "file": dsl_file,
+                        "type": entity_type,
+                        "output": None,
+                        "error": "Worker failed: {}".format(exc),
+                        "status": "FAILED",
+                        "duration": None,
+                    }
+                results[dsl_file] = result
+                LOG.info(
+                    "[{}/{}] {} {}".format(
+                        len(results), len(dsl_files), result["status"], dsl_file
+                    )
+                )
+    finally:
+        if saved_no_daemon is None:
+            os.environ.pop(NO_DAEMON_ENV, None)
+        else:
+            os.environ[NO_DAEMON_ENV] = saved_no_daemon
+
+    return [results[dsl_file] for dsl_file, _ in dsl_files]
+
+
+def compile_dsl_files_command(paths, out_dir, workers, out, use_cache):
+
+    start_time = time.monotonic()
+    config_file = click.get_current_context().find_root().params.get("config_file")
+    results = compile_dsl_files(
+        paths,
+        out_dir,
+        workers=workers,
+        out=out,
+        use_cache=use_cache,
+        config_file=config_file,
+    )
+    if not results:
+        return
+
+    table = PrettyTable()
+    table.field_names = ["FILE", "TYPE", "STATUS", "ERROR"]
+    for result in results:
+        error = (result["error"] or "").splitlines()
+        table.add_row(
+            [
+                highlight_text(os.path.relpath(result["file"])),
+                highlight_text(result["type"]),
+                highlight_text(result["status"]),
+                highlight_text(error[-1] if error else "-"),
+            ]
+        )
+    click.echo(table)
+
+    failed = [result for result in results if result["error"]]
+    report_file = os.path.join(out_dir, REPORT_FILE)
+    os.makedirs(out_dir, exist_ok=True)
+    with open(report_file, "w") as fd:
+        json.dump(
+            {
+                "total": len(results),
+                "failed": len(failed),
+                "duration": round(time.monotonic() - start_time, 3),
+                "results": results,
+            },
+            fd,
+            indent=4,
+        )
+
+    LOG.info(
+        "Compiled {} of {} files, report written to {}".format(
+            len(results) - len(failed), len(results), report_file
+        )
+    )
+    if failed:
+        LOG.error("Compilation of {} files failed".format(len(failed)))
+        sys.exit(-1)
@@ -0,0 +1,56 @@
+import os
+
+import click
+
+from .main import compile
+from .batch_compile import compile_dsl_files_command
+
+
+@compile.command("batch")
+@click.argument("paths", nargs=-1, required=True)
+@click.option(
+    "--out-dir",
+    "-d",
+    "out_dir",
+    default="compiled",
+    show_default=True,
+    type=click.Path(file_okay=False, dir_okay=True, writable=True),
+    help="Directory to write the compiled payloads and report to",
+)
+@click.option(
+    "--workers",
+    "-w",
+    "workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes, defaults to number of cpus",
+)
+@click.option(
+    "--out",
+    "-o",
+    "out",
+    type=click.Choice(["json", "yaml"]),
+    default="json",
+    help="output format",
+)
+@click.option(
+    "--no-cache",
+    "no_cache",
+    is_flag=True,
+    default=False,
+    help="Compile the blueprints, instead of reusing payloads from compile cache",
+)
+def _compile_dsl_files_command(paths, out_dir, workers, out, no_cache):
+    """Compiles the DSL (Python) files in directories or glob patterns into JSON or YAML
+
+    \b
+    Blueprint, runbook, endpoint and project files are compiled in parallel
+    worker processes. Payload of each file is written to OUT_DIR, at the
+    relative path of file, along with a report (compile_report.json) of
+    files that failed.
+    Example:
+        calm compile batch ./blueprints "./runbooks/**/*.py" -d compiled"""
+
+    compile_dsl_files_command(
+        paths, os.path.abspath(out_dir), workers, out, use_cache=not no_cache
+    )
@@ -15,6 +15,7 @@ from .bps import (
     format_blueprint_command,
     compile_blueprint_command,
     launch_blueprint_simple,
+    launch_blueprints_bulk,
     patch_bp_if_required,
     delete_blueprint,
     decompile_bp,
@@ -112,9 +113,18 @@ def _format_blueprint_command(bp_file):
     default="json",
     help="output format",
 )
-def _compile_blueprint_command(bp_file, brownfield_deployment_file, out):
+@click.option(
+    "--no-cache",
+    "no_cache",
+    is_flag=True,
+    default=False,
+    help="Compile the blueprint, instead of reusing payload from compile cache",
+)
+def _compile_blueprint_command(bp_file, brownfield_deployment_file, out, no_cache):
     """Compiles a DSL (Python) blueprint into JSON or YAML"""
-    compile_blueprint_command(bp_file, brownfield_deployment_file, out)
+    compile_blueprint_command(
+        bp_file, brownfield_deployment_file, out, use_cache=not no_cache
+    )
 
 
 @decompile.command("bp", experimental=True)
@@ -187,7 +197,14 @@ def _decompile_bp(name, bp_file, with_secrets, prefix, bp_dir, passphrase):
     default=None,
     help="Passphrase for the encrypted secret values in blueprint",
 )
-def create_blueprint_command(bp_file, name, description, force, passphrase):
+@click.option(
+    "--no-cache",
+    "no_cache",
+    is_flag=True,
+    default=False,
+    help="Compile the blueprint, instead of reusing payload from compile cache",
+)
+def create_blueprint_command(bp_file, name, description, force, passphrase, no_cache):
     """Creates a blueprint"""
 
     client = get_api_client()
@@ -205,10 +222,16 @@ def create_blueprint_command(bp_file, name, description, force, passphrase):
                 name=name,
                 description=description,
                 force_create=force,
+                use_cache=not no_cache,
             )
         else:
             res, err = create_blueprint_from_dsl(
-                client, bp_file, name=name, description=description, force_create=force
+                client,
+                bp_file,
+                name=name,
+                description=description,
+                force_create=force,
+                use_cache=not no_cache,
             )
     else:
         LOG.error("Unknown file format {}".format(bp_file))
@@ -405,6 +428,104 @@ def launch_blueprint_command(
         LOG.info("Action runs completed for app {}".format(app_name))
 
 
+@launch.command("bps")
+@click.option(
+    "--file",
+    "-f",
+    "manifest_file",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
+    help="Path of csv manifest having a launch per row",
+)
+@click.option(
+    "--blueprint", "-b", "blueprint_name", default=None, help="Blueprint to launch"
+)
+@click.option(
+    "--count",
+    "-n",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of apps to launch from blueprint",
+)
+@click.option(
+    "--app_name_prefix",
+    "-a",
+    default=None,
+    help="Prefix of app names, suffixed by app number",
+)
+@click.option(
+    "--profile_name",
+    "-p",
+    default=None,
+    help="Name of app profile to be used for blueprint launch",
+)
+@click.option(
+    "--launch_params",
+    "-l",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
+    help="Path to python file for runtime editables",
+)
+@click.option(
+    "--concurrency",
+    "-c",
+    type=int,
+    default=None,
+    help="Max number of launches submitted in parallel",
+)
+@click.option(
+    "--output",
+    "-o",
+    "output_file",
+    type=click.Path(file_okay=True, dir_okay=False, writable=True),
+    default=None,
+    help="Path of file to write launch results as json lines (stdout by default)",
+)
+@click.option(
+    "--timeout",
+    type=int,
+    default=60 * 60,
+    show_default=True,
+    help="Seconds to wait for launches to complete",
+)
+def launch_blueprints_bulk_command(
+    manifest_file,
+    blueprint_name,
+    count,
+    app_name_prefix,
+    profile_name,
+    launch_params,
+    concurrency,
+    output_file,
+    timeout,
+):
+    """Launches many apps in parallel, from a blueprint or a manifest file.
+    Runtime variables are not prompted, default values or the values in 'launch_params' file are used.
+    Result of each launch (blueprint, app_name, request_id, state, app_uuid, error, duration) is written as a json line.
+
+    \b
+    >: manifest: csv file with header row and columns 'blueprint', 'app_name' (optional),
+    'launch_params' (optional) and 'profile' (optional)
+    Ex: blueprint,app_name,launch_params
+        MyBlueprint,test-env-1,params_1.py
+        MyBlueprint,test-env-2,params_2.py
+    """
+
+    if bool(manifest_file) == bool(blueprint_name):
+        raise click.UsageError("Exactly one of '--file' or '--blueprint' is required")
+
+    launch_blueprints_bulk(
+        manifest_file=manifest_file,
+        blueprint_name=blueprint_name,
+        count=count,
+        app_name_prefix=app_name_prefix,
+        profile_name=profile_name,
+        launch_params=launch_params,
+        concurrency=concurrency,
+        output_file=output_file,
+        timeout=timeout,
+    )
+
+
 @delete.command("bp")
 @click.argument("blueprint_names", nargs=-1)
 def _delete_blueprint(blueprint_names):
@@ -1,4 +1,5 @@
 from re import sub
+import csv
 import time
 import json
 import sys
@@ -12,6 +13,7 @@ import arrow
 import click
 from prettytable import PrettyTable
 from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 from black import format_file_in_place, WriteBack, FileMode
 
 from calm.dsl.builtins import (
@@ -43,8 +45,9 @@ from .utils import (
 )
 from .secrets import find_secret, create_secret
 from .constants import BLUEPRINT
+from .poller import Poller, poll_until
 from .environments import get_project_environment
-from calm.dsl.tools import get_module_from_file
+from calm.dsl.tools import get_module_from_file, CompileCache, DependencyTracker
 from calm.dsl.builtins import Brownfield as BF
 from calm.dsl.providers import get_provider
 from calm.dsl.providers.plugins.ahv_vm.main import AhvNew
@@ -284,7 +287,31 @@ def get_brownfield_deployment_classes(brownfield_deployment_file=None):
     return bf_deployments
 
 
-def compile_blueprint(bp_file, brownfield_deployment_file=None):
+def compile_blueprint(bp_file, brownfield_deployment_file=None, use_cache=True):
+    """returns blueprint payload compiled from bp_file. Payload is reused
+    from compile cache, if bp_file and the files, cache tables and env
+    variables it reads are unchanged since last compile"""
+
+    if not use_cache:
+        return _compile_blueprint(bp_file, brownfield_deployment_file)
+
+    compile_cache = CompileCache()
+    cache_key = compile_cache.get_key(bp_file, brownfield_deployment_file)
+    bp_payload = compile_cache.get(cache_key)
+    if bp_payload is not None:
+        LOG.debug("Using compiled payload of {} from compile cache".format(bp_file))
+        return bp_payload
+
+    with DependencyTracker() as tracker:
+        bp_payload = _compile_blueprint(bp_file, brownfield_deployment_file)
+
+    if bp_payload is not None:
+        compile_cache.set(cache_key, bp_payload, tracker)
+
+    return bp_payload
+
+
+def _compile_blueprint(bp_file, brownfield_deployment_file=None):
 
     # Constructing metadata payload
     # Note: This should be constructed before loading bp module. As metadata will be used while getting bp_payload
@@ -453,7 +480,7 @@ def create_blueprint_from_json(
 
 
 def create_blueprint_from_dsl(
-    client, bp_file, name=None, description=None, force_create=False
+    client, bp_file, name=None, description=None, force_create=False, use_cache=True
 ):
 
     decompiled_secrets = decrypt_decompiled_secrets_file(pth=bp_file.rsplit("/", 1)[0])
@@ -462,7 +489,7 @@ def create_blueprint_from_dsl(
             "Decompiled secrets metadata found. Use `--passphrase/-ps` cli option to create blueprint with decompiled secrets"
         )
 
-    bp_payload = compile_blueprint(bp_file)
+    bp_payload = compile_blueprint(bp_file, use_cache=use_cache)
     if bp_payload is None:
         err_msg = "User blueprint not found in {}".format(bp_file)
         err = {"error": err_msg, "code": -1}
@@ -485,14 +512,20 @@ def create_blueprint_from_dsl(
 
 
 def create_blueprint_from_dsl_with_encrypted_secrets(
-    client, bp_file, passphrase, name=None, description=None, force_create=False
+    client,
+    bp_file,
+    passphrase,
+    name=None,
+    description=None,
+    force_create=False,
+    use_cache=True,
 ):
     """
     creates blueprint from the bp python file supplied using import_file API.
     NOTE: Project mentioned remains unchanged
     """
 
-    bp_payload = compile_blueprint(bp_file)
+    bp_payload = compile_blueprint(bp_file, use_cache=use_cache)
     if bp_payload is None:
         err_msg = "User blueprint not found in {}".format(bp_file)
         err = {"error": err_msg, "code": -1}
@@ -679,10 +712,12 @@ def _decompile_bp(
     )
 
 
-def compile_blueprint_command(bp_file, brownfield_deployment_file, out):
+def compile_blueprint_command(bp_file, brownfield_deployment_file, out, use_cache=True):
 
     bp_payload = compile_blueprint(
-        bp_file, brownfield_deployment_file=brownfield_deployment_file
+        bp_file,
+        brownfield_deployment_file=brownfield_deployment_file,
+        use_cache=use_cache,
     )
     if bp_payload is None:
         LOG.error("User blueprint not found in {}".format(bp_file))
@@ -1065,23 +1100,24 @@ def get_variable_value_options(bp_uuid, var_uuid, poll_interval=10):
     trl_id = var_task_data["trl_id"]
 
     # Poll till completion of epsilon task
-    maxWait = 5 * 60
-    count = 0
-    while count < maxWait:
+    def poll():
         res, err = client.blueprint.variable_values_from_trlid(
             uuid=bp_uuid, var_uuid=var_uuid, req_id=req_id, trl_id=trl_id
         )
 
         # If there is exception during variable api call, it would be silently ignored
         if err:
-            return list(), err
+            return True, None, (list(), err)
 
         var_val_data = res.json()
         if var_val_data["state"] == "SUCCESS":
-            return var_val_data["values"], None
+            return True, var_val_data["state"], (var_val_data["values"], None)
 
-        count += poll_interval
-        time.sleep(poll_interval)
+        return False, var_val_data["state"], None
+
+    completed, result = poll_until(poll, timeout=5 * 60, max_interval=poll_interval)
+    if completed:
+        return result
 
     LOG.error("Waited for 5 minutes for dynamic variable evaludation")
     sys.exit(-1)
@@ -1367,7 +1403,12 @@ def launch_blueprint_simple(
     is_brownfield=False,
     brownfield_deployment_file=None,
     skip_app_name_check=False,
+    wait_for_launch=True,
 ):
+    """Launches the blueprint and polls the launch till completion. If
+    wait_for_launch is False, returns (blueprint_uuid, launch_request_id)
+    without polling"""
+
     client = get_api_client()
 
     if app_name and not skip_app_name_check:
@@ -1816,14 +1857,15 @@ def launch_blueprint_simple(
     response = res.json()
     launch_req_id = response["status"]["request_id"]
 
+    if not wait_for_launch:
+        return blueprint_uuid, launch_req_id
+
     poll_launch_status(client, blueprint_uuid, launch_req_id)
 
 
-def poll_launch_status(client, blueprint_uuid, launch_req_id):
-    # Poll every 10 seconds on the app status, for 5 mins
-    maxWait = 5 * 60
-    count = 0
-    while count < maxWait:
+def poll_launch_status(client, blueprint_uuid, launch_req_id, timeout=5 * 60):
+    # Poll on the app status with backoff till 10 seconds, for 5 mins
+    def poll():
         # call status api
         LOG.info("Polling status of Launch")
         res, err = client.blueprint.poll_launch(blueprint_uuid, launch_req_id)
@@ -1845,16 +1887,225 @@ def poll_launch_status(client, blueprint_uuid, launch_req_id):
                     pc_ip, pc_port, app_uuid
                 )
             )
-            break
+            return True, app_state, response
         elif app_state == "failure":
             LOG.debug("API response: {}".format(response))
             LOG.error("Failed to launch blueprint. Check API response above.")
-            break
+            return True, app_state, response
         elif err:
             raise Exception("[{}] - {}".format(err["code"], err["error"]))
         LOG.info(app_state)
-        count += 10
-        time.sleep(10)
+        return False, app_state, response
+
+    poll_until(poll, timeout=timeout)
+
+
+def get_bulk_launch_rows(
+    manifest_file=None, blueprint_name=None, count=1, app_name_prefix=None
+):
+    """returns launch rows [{blueprint, app_name, launch_params, profile}] from
+    manifest csv file, or 'count' rows of given blueprint"""
+
+    if manifest_file:
+        with open(manifest_file, "r", newline="") as fd:
+            rows = []
+            for row in csv.DictReader(fd):
+                if not (row.get("blueprint") or "").strip():
+                    continue
+                rows.append(
+                    {
+                        field: (row.get(field) or "").strip() or None
+                        for field in [
+                            "blueprint",
+                            "app_name",
+                            "launch_params",
+                            "profile",
+                        ]
+                    }
+                )
+
+        # Generated app names are suffixed with row number to keep them unique
+        timestamp = int(time.time())
+        for index, row in enumerate(rows, start=1):
+            if not row["app_name"]:
+                row["app_name"] = "App-{}-{}-{}".format(
+                    row["blueprint"], timestamp, index
+                )
+        return rows
+
+    app_name_prefix = app_name_prefix or "App-{}-{}".format(
+        blueprint_name, int(time.time())
+    )
+    return [
+        {
+            "blueprint": blueprint_name,
+            "app_name": "{}-{}".format(app_name_prefix, index),
+            "launch_params": None,
+            "profile": None,
+        }
+        for index in range(1, count + 1)
+    ]
+
+
+def get_launch_poll_func(client, blueprint_uuid, launch_req_id):
+    """returns poll func of Poller for the launch request"""
+
+    def poll():
+        res, err = client.blueprint.poll_launch(blueprint_uuid, launch_req_id)
+        if err:
+            return True, None, {"state": "failure", "error": err}
+
+        status = res.json()["status"]
+        app_state = status["state"]
+        if app_state in ["success", "failure"]:
+            return True, app_state, status
+        return False, app_state, status
+
+    return poll
+
+
+def launch_blueprints_bulk(
+    manifest_file=None,
+    blueprint_name=None,
+    count=1,
+    app_name_prefix=None,
+    profile_name=None,
+    launch_params=None,
+    concurrency=None,
+    output_file=None,
+    timeout=60 * 60,
+):
+    """Launches many apps from the blueprint rows of manifest file, or 'count'
+    apps from the blueprint. Launches are submitted concurrently, and their
+    launch requests are polled on a single loop. Result of each launch is
+    written as a json line to output file (stdout by default).
+    Runtime variables are not prompted."""
+
+    client = get_api_client()
+    rows = get_bulk_launch_rows(manifest_file, blueprint_name, count, app_name_prefix)
+    if not rows:
+        LOG.warning("No launch found in manifest")
+        return
+
+    if concurrency is None:
+        concurrency = get_context().get_connection_config()["concurrency"]
+
+    # Blueprints are fetched once, instead of once per launch
+    blueprints = {}
+    for bp_name in set(row["blueprint"] for row in rows):
+        try:
+            blueprints[bp_name] = get_blueprint(bp_name)
+        except (Exception, SystemExit) as exp:
+            LOG.error("Failed to fetch blueprint {}: {}".format(bp_name, exp))
+            blueprints[bp_name] = None
+
+    results = []
+    for row in rows:
+        results.append(
+            {
+                "blueprint": row["blueprint"],
+                "app_name": row["app_name"],
+                "request_id": None,
+                "state": None,
+                "app_uuid": None,
+                "error": None,
+                "duration": None,
+            }
+        )
+
+    def submit(index):
+        row, result = rows[index], results[index]
+        result["start_time"] = time.time()
+        blueprint = blueprints[row["blueprint"]]
+        if not blueprint:
+            result["error"] = "Blueprint {} not found".format(row["blueprint"])
+            return
+
+        launch_params_file = row["launch_params"] or launch_params
+        try:
+            bp_uuid, launch_req_id = launch_blueprint_simple(
+                row["blueprint"],
+                row["app_name"],
+                blueprint=deepcopy(blueprint),
+                profile_name=row["profile"] or profile_name,
+                patch_editables=bool(launch_params_file),
+                launch_params=launch_params_file,
+                wait_for_launch=False,
+            )
+            result["blueprint_uuid"] = bp_uuid
+            result["request_id"] = launch_req_id
+
+        # Errors of a launch are reported in its result, instead of exiting
+        except SystemExit:
+            result["error"] = "Launch failed. Check the logs above"
+        except Exception as exp:
+            result["error"] = "{}".format(exp)
+
+    LOG.info(
+        "Launching {} apps, with {} concurrent launches".format(len(rows), concurrency)
+    )
+    with ThreadPoolExecutor(max_workers=max(1, int(concurrency))) as executor:
+        list(executor.map(submit, range(len(rows))))
+
+    output = open(output_file, "w") if output_file else sys.stdout
+
+    def write_result(result):
+        start_time = result.pop("start_time", None)
+        result.pop("blueprint_uuid", None)
+        if start_time:
+            result["duration"] = round(time.time() - start_time, 1)
+        if not result["state"]:
+            result["state"] = "failure"
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+
+    def get_poll_func(result):
+        poll_func = get_launch_poll_func(
+            client, result["blueprint_uuid"], result["request_id"]
+        )
+
+        def poll():
+            completed, state, status = poll_func()
+            if completed:
+                result["state"] = status["state"]
+                result["app_uuid"] = status.get("application_uuid")
+                if status.get("error"):
+                    result["error"] = status["error"]
+                write_result(result)
+            return completed, state, status
+
+        return poll
+
+    # Launch requests are polled on a single loop with backoff
+    poller = Poller(timeout=timeout)
+    for index, result in enumerate(results):
+        if result["request_id"]:
+            poller.add(index, get_poll_func(result))
+        else:
+            write_result(result)
+
+    try:
+        for index, (completed, _) in poller.run().items():
+            if not completed:
+                results[index]["state"] = "timeout"
+                results[index][
+                    "error"
+                ] = "Launch did not complete in {} seconds".format(timeout)
+                write_result(results[index])
+    finally:
+        if output_file:
+            output.close()
+
+    failed_launches = [result for result in results if result["state"] != "success"]
+    if failed_launches:
+        LOG.error(
+            "{} out of {} launches did not succeed".format(
+                len(failed_launches), len(results)
+            )
+        )
+        sys.exit(-1)
+
+    LOG.info("All {} apps launched successfully".format(len(results)))
 
 
 def delete_blueprint(blueprint_names):
@@ -4,7 +4,7 @@ import click
 from calm.dsl.store import Cache
 from calm.dsl.constants import CACHE
 
-from .main import show, update, clear
+from .main import show, update, clear, calm_export, calm_import
 from .utils import highlight_text
 from calm.dsl.log import get_logging_handle
 
@@ -63,13 +63,70 @@ def clear_cache():
     help="Cache entity, if not given will update whole cache",
     type=click.Choice(get_cache_table_types()),
 )
-def update_cache(entity):
+@click.option(
+    "--incremental",
+    "-i",
+    is_flag=True,
+    default=False,
+    help="Sync only the entities modified since last cache update, for tables supporting it",
+)
+def update_cache(entity, incremental):
     """Update the data for dynamic entities stored in the cache"""
 
     if entity:
-        Cache.sync_table(entity)
+        Cache.sync_table(entity, incremental=incremental)
         Cache.show_table(entity)
     else:
-        Cache.sync()
+        Cache.sync(incremental=incremental)
         Cache.show_data()
     LOG.info(highlight_text("Cache updated at {}".format(datetime.datetime.now())))
+
+
+@calm_export.command("cache")
+@click.option(
+    "--file",
+    "-f",
+    "snapshot_file",
+    type=click.Path(dir_okay=False, writable=True),
+    required=True,
+    help="Path of cache snapshot file",
+)
+def export_cache(snapshot_file):
+    """Export the cache to a snapshot file, that can be imported on other machines"""
+
+    row_counts = Cache.export_snapshot(snapshot_file)
+    LOG.info(
+        highlight_text(
+            "Cache exported to {} ({} rows)".format(
+                snapshot_file, sum(row_counts.values())
+            )
+        )
+    )
+
+
+@calm_import.command("cache")
+@click.option(
+    "--file",
+    "-f",
+    "snapshot_file",
+    type=click.Path(exists=True, dir_okay=False, readable=True),
+    required=True,
+    help="Path of cache snapshot file",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help="Import snapshot exported from a different server also",
+)
+def import_cache(snapshot_file, force):
+    """Replace the cache by the one in snapshot file, without syncing it from server"""
+
+    row_counts = Cache.import_snapshot(snapshot_file, force=force)
+    LOG.info(
+        highlight_text(
+            "Cache imported from {} ({} rows) at {}".format(
+                snapshot_file, sum(row_counts.values()), datetime.datetime.now()
+            )
+        )
+    )
@@ -0,0 +1,166 @@
+import os
+import sys
+import json
+import glob
+import hashlib
+import tempfile
+import importlib
+
+import click
+
+from calm.dsl.config import get_context
+from calm.dsl.log import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+COMMAND_INDEX_FILE_PREFIX = "cli-index-"
+
+
+class CommandIndex:
+    """Index of the cli command tree, used to import the modules registering
+    commands only when the command is resolved.
+
+    Index is stored as {group path: {command name: module}} in the local dir,
+    and is rebuilt (by importing all the command modules) whenever any cli
+    module changes.
+    """
+
+    package = None
+    root_group = None
+    command_modules = []
+    _index = None
+
+    @classmethod
+    def init(cls, root_group, package, command_modules):
+        """loads the index of command tree of root_group. Imports all the
+        command modules, if index is not persisted yet"""
+
+        cls.root_group = root_group
+        cls.package = package
+        cls.command_modules = command_modules
+
+        index_file = cls.get_index_file()
+        if index_file and os.path.isfile(index_file):
+            try:
+                with open(index_file) as fd:
+                    cls._index = json.load(fd)
+                return
+            except Exception:
+                LOG.debug("Failed to load cli command index {}".format(index_file))
+
+        index = cls.build_index()
+        if index_file:
+            cls.save_index(index, index_file)
+
+    @classmethod
+    def get_index_file(cls):
+        """returns file used to persist the index. File name contains digest
+        of cli modules, so any change in them invalidates the file"""
+
+        try:
+            init_config = get_context().get_init_config()
+            local_dir = init_config["LOCAL_DIR"]["location"]
+        except Exception:
+            LOG.debug("Local dir not found, cli command index will not be persisted")
+            return None
+
+        package_dir = os.path.dirname(sys.modules[cls.package].__file__)
+        digest = hashlib.sha256()
+        for module_file in sorted(glob.glob(os.path.join(package_dir, "*.py"))):
+            stat = os.stat(module_file)
+            digest.update(
+                "{}:{}:{}".format(
+                    os.path.basename(module_file), stat.st_mtime_ns, stat.st_size
+                ).encode()
+            )
+
+        return os.path.join(
+            local_dir,
+            "{}{}.json".format(COMMAND_INDEX_FILE_PREFIX, digest.hexdigest()[:16]),
+        )
+
+    @classmethod
+    def save_index(cls, index, index_file):
+
+        try:
+            index_dir = os.path.dirname(index_file)
+            if not os.path.isdir(index_dir):
+                os.makedirs(index_dir)
+
+            for stale_file in glob.glob(
+                os.path.join(index_dir, COMMAND_INDEX_FILE_PREFIX + "*.json")
+            ):
+                os.remove(stale_file)
+
+            # Write to temp file first, so parallel runs never read a partial file
+            fd, temp_file = tempfile.mkstemp(dir=index_dir)
+            with os.fdopen(fd, "w") as temp_fd:
+                json.dump(index, temp_fd)
+            os.replace(temp_file, index_file)
+        except Exception:
+            LOG.debug("Failed to persist cli command index in {}".format(index_file))
+
+    @classmethod
+    def build_index(cls):
+        """imports the command modules one by one, and returns the index of
+        commands registered by each of them"""
+
+        commands = set(cls.walk_commands(cls.root_group))
+        index = {}
+        for module in cls.command_modules:
+            importlib.import_module("{}.{}".format(cls.package, module))
+            for group_path, cmd_name in cls.walk_commands(cls.root_group):
+                if (group_path, cmd_name) not in commands:
+                    commands.add((group_path, cmd_name))
+                    index.setdefault(group_path, {})[cmd_name] = module
+
+        return index
+
+    @staticmethod
+    def walk_commands(group, group_path=""):
+        """yields (group path, command name) for all the commands under group"""
+
+        for cmd_name, cmd in group.commands.items():
+            yield group_path, cmd_name
+            if isinstance(cmd, click.Group):
+                yield from CommandIndex.walk_commands(
+                    cmd, CommandIndex.get_path(group_path, cmd_name)
+                )
+
+    @staticmethod
+    def get_path(group_path, cmd_name):
+        return "{} {}".format(group_path, cmd_name).strip()
+
+    @classmethod
+    def is_lazy(cls):
+        return cls._index is not None
+
+    @classmethod
+    def get_command_names(cls, group_path):
+        """returns commands of group, including the ones not loaded yet"""
+
+        return list((cls._index or {}).get(group_path, {}).keys())
+
+    @classmethod
+    def load_command(cls, group_path, cmd_name):
+        """imports the module registering the command"""
+
+        module = (cls._index or {}).get(group_path, {}).get(cmd_name)
+        if module:
+            importlib.import_module("{}.{}".format(cls.package, module))
+
+    @classmethod
+    def load_group(cls, group_path):
+        """imports the modules registering any command under group"""
+
+        for _path, commands in (cls._index or {}).items():
+            if _path == group_path or _path.startswith(group_path + " "):
+                for module in commands.values():
+                    importlib.import_module("{}.{}".format(cls.package, module))
+
+    @classmethod
+    def load_all(cls):
+        """imports all the command modules"""
+
+        for module in cls.command_modules:
+            importlib.import_module("{}.{}".format(cls.package, module))
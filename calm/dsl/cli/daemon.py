@@ -0,0 +1,327 @@
+import os
+import sys
+import time
+import socket
+import logging
+import traceback
+
+from calm.dsl.daemon_client import get_socket_path, send_message, read_message
+
+
+class _StreamProxy:
+    """Text stream writing to the client of running command, or to the
+    daemon's own stream when no command is running"""
+
+    encoding = "utf-8"
+    errors = "replace"
+
+    def __init__(self, name, stream):
+        self.name = name
+        self.stream = stream
+        self.sock_file = None
+        self.tty = False
+
+    def write(self, data):
+        if self.sock_file is None:
+            return self.stream.write(data)
+
+        if isinstance(data, (bytes, bytearray)):
+            data = data.decode(self.encoding, self.errors)
+        if data:
+            send_message(self.sock_file, type="output", stream=self.name, data=data)
+        return len(data)
+
+    def flush(self):
+        if self.sock_file is None:
+            self.stream.flush()
+
+    def isatty(self):
+        if self.sock_file is None:
+            return self.stream.isatty()
+        return self.tty
+
+    def fileno(self):
+        return self.stream.fileno()
+
+    @property
+    def closed(self):
+        return False
+
+    def writable(self):
+        return True
+
+    def readable(self):
+        return False
+
+
+class _StdinProxy:
+    """Text stream reading the stdin of client, on demand"""
+
+    encoding = "utf-8"
+    errors = "replace"
+    closed = False
+
+    def __init__(self, sock_file, tty):
+        self.sock_file = sock_file
+        self.tty = tty
+
+    def _read(self, size):
+        send_message(self.sock_file, type="stdin", size=size)
+        message = read_message(self.sock_file)
+        return message["data"] if message else ""
+
+    def readline(self, *args):
+        return self._read("line")
+
+    def read(self, *args):
+        return self._read("all")
+
+    def __iter__(self):
+        return iter(self.readline, "")
+
+    def isatty(self):
+        return self.tty
+
+    def readable(self):
+        return True
+
+
+class DaemonServer:
+    """Long-lived process running cli commands forwarded by `calm` clients.
+
+    Modules, schemas, config context, cache db connection and the api client
+    session pool are loaded once and reused by all the commands. Commands are
+    run one at a time, in the daemon process, with the argv, cwd and
+    environment of the client. Output is streamed back to the client.
+    """
+
+    def __init__(self, socket_path=None):
+        self.socket_path = socket_path or get_socket_path()
+        self.start_time = None
+        self.commands_run = 0
+        self.server_config_key = None
+        # DSL metadata map of the models, as loaded before any command
+        self.dsl_metadata_map = None
+        self.stdout = _StreamProxy("stdout", sys.stdout)
+        self.stderr = _StreamProxy("stderr", sys.stderr)
+        self._running = False
+
+    def warm_up(self):
+        """loads the modules and state shared by commands"""
+
+        from calm.dsl.cli import CommandIndex
+        from calm.dsl.config import get_context
+        from calm.dsl.log import get_logging_handle
+
+        LOG = get_logging_handle(__name__)
+        CommandIndex.load_all()
+
+        # Loads the dsl models, and the schemas they are built from
+        from calm.dsl.builtins import get_dsl_metadata_map
+
+        self.dsl_metadata_map = get_dsl_metadata_map()
+
+        try:
+            get_context()
+            self.update_api_client()
+            from calm.dsl.store import Version
+
+            Version.get_version("Calm")
+        except (Exception, SystemExit):
+            LOG.debug("Config not initialized, skipping warm up of api client")
+
+    def reset_dsl_state(self):
+        """resets the module level state left by previous command (as done for
+        batch compile workers), so that commands do not affect each other"""
+
+        import copy
+        from calm.dsl.builtins import get_dsl_metadata_map, init_dsl_metadata_map
+        from calm.dsl.builtins.models.metadata_payload import reset_metadata_obj
+        from calm.dsl.decompile.main import init_decompile_context
+        from calm.dsl.store import Cache
+
+        if self.dsl_metadata_map is None:
+            self.dsl_metadata_map = get_dsl_metadata_map()
+
+        init_dsl_metadata_map(copy.deepcopy(self.dsl_metadata_map))
+        reset_metadata_obj()
+        init_decompile_context()
+
+        # Cache may be updated by other processes since last command
+        Cache.lookup_cache.invalidate()
+
+    def update_api_client(self):
+        """re-creates api client, if server config is changed since last
+        command, reusing the current client otherwise"""
+
+        from calm.dsl.api.handle import update_api_client
+        from calm.dsl.config import get_context
+
+        server_config = get_context().server_config
+        key = tuple(
+            server_config.get(attr)
+            for attr in ["pc_ip", "pc_port", "pc_username", "pc_password"]
+        )
+        if key == self.server_config_key or not all(key):
+            return
+
+        update_api_client(host=key[0], port=key[1], auth=(key[2], key[3]))
+        self.server_config_key = key
+
+    def redirect_log_streams(self):
+        """points the log handlers created before daemon start to proxies"""
+
+        loggers = [logging.getLogger()] + [
+            logger
+            for logger in logging.Logger.manager.loggerDict.values()
+            if isinstance(logger, logging.Logger)
+        ]
+        for logger in loggers:
+            for handler in logger.handlers:
+                if not isinstance(handler, logging.StreamHandler):
+                    continue
+                if handler.stream is self.stderr.stream:
+                    handler.setStream(self.stderr)
+                elif handler.stream is self.stdout.stream:
+                    handler.setStream(self.stdout)
+
+    def serve_forever(self):
+        """listens on the socket and runs the commands till stopped"""
+
+        self.warm_up()
+        sys.stdout, sys.stderr = self.stdout, self.stderr
+        self.redirect_log_streams()
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+
+        server_sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server_sock.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        server_sock.listen(16)
+
+        self.start_time = time.time()
+        self._running = True
+        try:
+            while self._running:
+                conn, _ = server_sock.accept()
+                with conn, conn.makefile("rwb") as sock_file:
+                    try:
+                        self.handle(sock_file)
+                    except (OSError, ValueError):
+                        # Client went away
+                        traceback.print_exc(file=self.stderr.stream)
+        finally:
+            server_sock.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def handle(self, sock_file):
+        message = read_message(sock_file)
+        if message is None:
+            return
+
+        if message["type"] == "ping":
+            send_message(sock_file, type="pong", **self.get_status())
+
+        elif message["type"] == "stop":
+            self._running = False
+            send_message(sock_file, type="stopped", pid=os.getpid())
+
+        elif message["type"] == "run":
+            code = self.run_command(sock_file, message)
+            send_message(sock_file, type="exit", code=code)
+
+    def get_status(self):
+        return {
+            "pid": os.getpid(),
+            "uptime": time.time() - self.start_time,
+            "commands_run": self.commands_run,
+        }
+
+    def remove_user_modules(self, saved_modules):
+        """removes user modules (blueprint helpers etc.) imported by command
+        from sys.modules, so that next command imports their latest version"""
+
+        from calm.dsl.tools import is_user_file
+
+        for name in set(sys.modules) - saved_modules:
+            module_file = getattr(sys.modules.get(name), "__file__", None)
+            if module_file and is_user_file(module_file):
+                del sys.modules[name]
+
+    def run_command(self, sock_file, message):
+        """runs the cli command in the client's cwd and environment, and
+        returns its exit code"""
+
+        from calm.dsl.cli import main
+        from calm.dsl.config import get_context
+        from calm.dsl.config.env_config import EnvConfig
+        from calm.dsl.log import CustomLogging
+
+        saved_env = dict(os.environ)
+        saved_cwd = os.getcwd()
+        saved_argv = sys.argv
+        saved_path = list(sys.path)
+        saved_modules = set(sys.modules)
+        saved_stdin = sys.stdin
+        saved_log_state = (CustomLogging._VERBOSE_LEVEL, CustomLogging._SHOW_TRACE)
+
+        code = 0
+        try:
+            os.environ.clear()
+            os.environ.update(message["env"])
+            os.chdir(message["cwd"])
+            sys.argv = ["calm"] + message["argv"]
+            sys.stdin = _StdinProxy(sock_file, message["isatty"]["stdin"])
+            for proxy in [self.stdout, self.stderr]:
+                proxy.sock_file = sock_file
+                proxy.tty = message["isatty"][proxy.name]
+
+            # Config files or environment may have changed since last command
+            EnvConfig.load()
+            get_context().reset_configuration()
+            self.update_api_client()
+            self.reset_dsl_state()
+
+            main.main(args=message["argv"], prog_name="calm")
+
+        except SystemExit as exc:
+            if exc.code is None:
+                code = 0
+            elif isinstance(exc.code, int):
+                code = exc.code
+            else:
+                sys.stderr.write("{}\n".format(exc.code))
+                code = 1
+
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+            code = 1
+
+        finally:
+            self.stdout.flush()
+            for proxy in [self.stdout, self.stderr]:
+                proxy.sock_file = None
+            sys.stdin = saved_stdin
+            sys.argv = saved_argv
+            sys.path[:] = saved_path
+            self.remove_user_modules(saved_modules)
+            os.chdir(saved_cwd)
+            os.environ.clear()
+            os.environ.update(saved_env)
+            CustomLogging._VERBOSE_LEVEL, CustomLogging._SHOW_TRACE = saved_log_state
+            self.commands_run += 1
+
+        return code
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="calm dsl daemon")
+    parser.add_argument("--socket", default=None, help="Path of unix socket")
+    args = parser.parse_args()
+
+    DaemonServer(args.socket).serve_forever()
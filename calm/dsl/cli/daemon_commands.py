@@ -0,0 +1,113 @@
+import os
+import sys
+import time
+import subprocess
+
+import click
+
+from calm.dsl.log import get_logging_handle
+from calm.dsl.daemon_client import get_socket_path, request_daemon
+
+from .main import daemon
+from .daemon import DaemonServer
+
+LOG = get_logging_handle(__name__)
+
+
+@daemon.command("start")
+@click.option(
+    "--socket",
+    "socket_path",
+    default=None,
+    help="Path of unix socket, defaults to ~/.calm/daemon.sock or 'CALM_DSL_DAEMON_SOCKET'",
+)
+@click.option(
+    "--foreground",
+    is_flag=True,
+    default=False,
+    help="Run the daemon in current process, instead of in background",
+)
+@click.option(
+    "--timeout",
+    default=60,
+    show_default=True,
+    help="Seconds to wait for the daemon to be ready",
+)
+def start_daemon(socket_path, foreground, timeout):
+    """Starts the daemon running calm commands with warm state.
+
+    \b
+    Once started, `calm` commands are run by the daemon, with the argv, cwd
+    and environment of the caller. Commands are run one at a time. Set
+    'CALM_DSL_NO_DAEMON=1' to run a command in its own process."""
+
+    socket_path = socket_path or get_socket_path()
+    status = request_daemon("ping", socket_path)
+    if status:
+        LOG.info("Daemon is already running (pid: {})".format(status["pid"]))
+        return
+
+    if foreground:
+        LOG.info("Starting daemon on {}".format(socket_path))
+        DaemonServer(socket_path).serve_forever()
+        return
+
+    log_file = os.path.join(os.path.dirname(socket_path), "daemon.log")
+    env = dict(os.environ)
+    env.pop("CALM_DSL_NO_DAEMON", None)
+    with open(log_file, "a") as log_fd:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "calm.dsl.cli.daemon", "--socket", socket_path],
+            stdin=subprocess.DEVNULL,
+            stdout=log_fd,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+            env=env,
+        )
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            LOG.error("Daemon exited, check logs at {}".format(log_file))
+            sys.exit(-1)
+
+        status = request_daemon("ping", socket_path)
+        if status:
+            LOG.info(
+                "Daemon started (pid: {}) on {}".format(status["pid"], socket_path)
+            )
+            return
+        time.sleep(0.2)
+
+    LOG.error("Daemon not ready in {} seconds".format(timeout))
+    sys.exit(-1)
+
+
+@daemon.command("stop")
+@click.option("--socket", "socket_path", default=None, help="Path of unix socket")
+def stop_daemon(socket_path):
+    """Stops the daemon"""
+
+    res = request_daemon("stop", socket_path)
+    if not res:
+        LOG.info("Daemon is not running")
+        return
+
+    LOG.info("Daemon (pid: {}) stopped".format(res["pid"]))
+
+
+@daemon.command("status")
+@click.option("--socket", "socket_path", default=None, help="Path of unix socket")
+def daemon_status(socket_path):
+    """Shows the status of daemon"""
+
+    status = request_daemon("ping", socket_path)
+    if not status:
+        click.echo("Daemon is not running")
+        return
+
+    click.echo(
+        "Daemon is running (pid: {}, uptime: {:.0f}s, commands run: {})".format(
+            status["pid"], status["uptime"], status["commands_run"]
+        )
+    )
@@ -127,6 +127,7 @@ def initialize_engine(
     )
     init_db()
     sync_cache()
+    precompile_decompile_templates()
 
     click.echo("\nHINT: To get started, follow the 3 steps below:")
     click.echo("1. Initialize an example blueprint DSL: calm init bp")
@@ -295,6 +296,13 @@ def sync_cache():
     Cache.sync()
 
 
+def precompile_decompile_templates():
+    from calm.dsl.decompile.render import precompile_templates
+
+    LOG.info("Compiling decompile templates")
+    precompile_templates()
+
+
 @init.command("bp")
 @click.option("--name", "-n", "bp_name", default="Hello", help="Name of blueprint")
 @click.option(
@@ -1,16 +1,13 @@
-from ruamel import yaml
 import click
 import json
 import copy
 
 import click_completion
 import click_completion.core
-from click_repl import repl
 from prettytable import PrettyTable
 
-# TODO - move providers to separate file
-from calm.dsl.providers import get_provider, get_provider_types
 from calm.dsl.api import get_api_client, get_resource_api
+from calm.dsl.api.instrumentation import RequestHooks, RequestTimings, RequestTrace
 from calm.dsl.log import get_logging_handle
 from calm.dsl.config import get_context
 from calm.dsl.store import Cache
@@ -45,9 +42,30 @@ LOG = get_logging_handle(__name__)
     default=False,
     help="Update cache before running command",
 )
+@click.option(
+    "--profile-startup",
+    "profile_startup",
+    is_flag=True,
+    default=False,
+    help="Show import time of modules loaded by the command, at exit",
+)
+@click.option(
+    "--timings",
+    "timings",
+    is_flag=True,
+    default=False,
+    help="Show count and latency of requests made to each api endpoint, at exit",
+)
+@click.option(
+    "--trace-file",
+    "trace_file",
+    default=None,
+    type=click.Path(file_okay=True, dir_okay=False, writable=True),
+    help="Write requests made by the command to a trace file (chrome://tracing format)",
+)
 @click.version_option("3.7.0")
 @click.pass_context
-def main(ctx, config_file, sync):
+def main(ctx, config_file, sync, profile_startup, timings, trace_file):
     """Calm CLI
 
     \b
@@ -68,6 +86,8 @@ def main(ctx, config_file, sync):
       calm create endpoint -f sample_ep.py --name Sample-Endpoint -> Upload a new endpoint from a python DSL file"""
     ctx.ensure_object(dict)
     ctx.obj["verbose"] = True
+    if timings or trace_file:
+        add_request_hooks(ctx, timings, trace_file)
     try:
         validate_version()
     except Exception:
@@ -88,43 +108,26 @@ def main(ctx, config_file, sync):
         Cache.sync()
 
 
-@main.group(cls=FeatureFlagGroup)
-def validate():
-    """Validate provider specs"""
-    pass
-
+def add_request_hooks(ctx, timings, trace_file):
+    """registers request instrumentation hooks, reported on command exit"""
 
-@validate.command("provider_spec")
-@click.option(
-    "--file",
-    "-f",
-    "spec_file",
-    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
-    required=True,
-    help="Path of provider spec file",
-)
-@click.option(
-    "--type",
-    "-t",
-    "provider_type",
-    type=click.Choice(get_provider_types()),
-    default="AHV_VM",
-    help="Provider type",
-)
-def validate_provider_spec(spec_file, provider_type):
-    """validates provider spec for given provider"""
+    if timings:
+        request_timings = RequestTimings()
+        RequestHooks.add(request_timings)
+        ctx.call_on_close(request_timings.show)
+        ctx.call_on_close(lambda: RequestHooks.remove(request_timings))
 
-    with open(spec_file) as f:
-        spec = yaml.safe_load(f.read())
+    if trace_file:
+        request_trace = RequestTrace()
+        RequestHooks.add(request_trace)
+        ctx.call_on_close(lambda: request_trace.write(trace_file))
+        ctx.call_on_close(lambda: RequestHooks.remove(request_trace))
 
-    try:
-        Provider = get_provider(provider_type)
-        Provider.validate_spec(spec)
 
-        LOG.info("File {} is a valid {} spec.".format(spec_file, provider_type))
-    except Exception as ee:
-        LOG.info("File {} is invalid {} spec".format(spec_file, provider_type))
-        raise Exception(ee.message)
+@main.group(cls=FeatureFlagGroup)
+def validate():
+    """Validate provider specs"""
+    pass
 
 
 @main.group(cls=FeatureFlagGroup)
@@ -406,22 +409,6 @@ def reset():
     """Reset entity"""
 
 
-@create.command("provider_spec")
-@click.option(
-    "--type",
-    "provider_type",
-    "-t",
-    type=click.Choice(get_provider_types()),
-    default="AHV_VM",
-    help="Provider type",
-)
-def create_provider_spec(provider_type):
-    """Creates a provider_spec"""
-
-    Provider = get_provider(provider_type)
-    Provider.create_spec()
-
-
 @main.group(cls=FeatureFlagGroup)
 def update():
     """Update entities"""
@@ -469,6 +456,9 @@ def calmrepl():
       :exit, :q, :quit  exits the repl
 
       :?, :h, :help     displays general help information"""
+
+    from click_repl import repl
+
     repl(click.get_current_context())
 
 
@@ -480,7 +470,13 @@ def set():
 
 @main.group("import", cls=FeatureFlagGroup)
 def calm_import():
-    """Import entities in Calm (task library)"""
+    """Import entities in Calm (task library, cache)"""
+    pass
+
+
+@main.group("export", cls=FeatureFlagGroup)
+def calm_export():
+    """Export entities (cache)"""
     pass
 
 
@@ -514,6 +510,12 @@ def library_delete():
     pass
 
 
+@main.group(cls=FeatureFlagGroup)
+def daemon():
+    """Manage the background process running cli commands"""
+    pass
+
+
 @main.group(cls=FeatureFlagGroup)
 def sync():
     """Sync platform account"""
@@ -0,0 +1,195 @@
+import time
+import heapq
+import random
+import itertools
+
+from calm.dsl.log import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+# Default poll intervals (in seconds) of watched objects
+POLL_MIN_INTERVAL = 0.5
+POLL_MAX_INTERVAL = 10
+POLL_BACKOFF_FACTOR = 2
+POLL_JITTER = 0.2
+
+
+class Backoff:
+    """Exponential backoff of poll interval, with jitter"""
+
+    def __init__(
+        self,
+        min_interval=POLL_MIN_INTERVAL,
+        max_interval=POLL_MAX_INTERVAL,
+        factor=POLL_BACKOFF_FACTOR,
+        jitter=POLL_JITTER,
+    ):
+        self.min_interval = min(min_interval, max_interval)
+        self.max_interval = max_interval
+        self.factor = factor
+        self.jitter = jitter
+        self.interval = self.min_interval
+
+    def reset(self):
+        """starts the backoff again from min interval"""
+
+        self.interval = self.min_interval
+
+    def next_interval(self):
+        """returns the interval to wait before next poll"""
+
+        interval = self.interval
+        self.interval = min(self.interval * self.factor, self.max_interval)
+
+        # Jitter spreads the polls of objects watched together
+        interval *= 1 + random.uniform(-self.jitter, self.jitter)
+        return min(interval, self.max_interval)
+
+
+class PollTarget:
+    """Object watched by poller"""
+
+    def __init__(self, key, poll_func, backoff):
+        self.key = key
+        self.poll_func = poll_func
+        self.backoff = backoff
+        self.state = None
+        self.result = None
+        self.completed = False
+        self.poll_count = 0
+
+
+class Poller:
+    """Polls many watched objects on a single loop.
+
+    Each object is polled immediately, and then after an interval starting
+    at min interval and increased exponentially till max interval as long as
+    its state does not change. A change in state resets the interval. Polling
+    stops once all objects are completed or the deadline is reached.
+
+    Usage:
+        poller = Poller(timeout=300)
+        poller.add("app1", poll_func)   # poll_func() -> (completed, state, result)
+        results = poller.run()          # {"app1": (completed, result)}
+    """
+
+    def __init__(
+        self,
+        timeout=None,
+        min_interval=POLL_MIN_INTERVAL,
+        max_interval=POLL_MAX_INTERVAL,
+        factor=POLL_BACKOFF_FACTOR,
+        jitter=POLL_JITTER,
+    ):
+        self.timeout = timeout
+        self.backoff_config = {
+            "min_interval": min_interval,
+            "max_interval": max_interval,
+            "factor": factor,
+            "jitter": jitter,
+        }
+        self.targets = {}
+        self._queue = []
+        self._counter = itertools.count()
+
+    def add(self, key, poll_func, **backoff_config):
+        """watches the object, polled using poll_func
+
+        Args:
+            key (str): key of object in results
+            poll_func (function): returns (completed, state, result) tuple
+            backoff_config: overrides the backoff config of poller for object
+        """
+
+        if key in self.targets:
+            raise Exception("Object with key {} is already watched".format(key))
+
+        config = dict(self.backoff_config)
+        config.update(backoff_config)
+        target = PollTarget(key, poll_func, Backoff(**config))
+        self.targets[key] = target
+
+        # First poll is done immediately
+        self._schedule(target, time.monotonic())
+
+    def _schedule(self, target, poll_time):
+        heapq.heappush(self._queue, (poll_time, next(self._counter), target))
+
+    def poll(self, target):
+        """polls the target once, and schedules the next poll if required"""
+
+        completed, state, result = target.poll_func()
+        target.poll_count += 1
+        target.result = result
+        if completed:
+            target.completed = True
+            return
+
+        if target.poll_count > 1 and state != target.state:
+            target.backoff.reset()
+        target.state = state
+
+        self._schedule(target, time.monotonic() + target.backoff.next_interval())
+
+    def run(self):
+        """polls the objects till they are completed or deadline is reached
+
+        Returns:
+            dict: {key: (completed, result of last poll)} of watched objects
+        """
+
+        deadline = None
+        if self.timeout is not None:
+            deadline = time.monotonic() + self.timeout
+
+        while self._queue:
+            poll_time, _, target = heapq.heappop(self._queue)
+            if deadline is not None and poll_time > deadline:
+                LOG.debug("Deadline reached before next poll of {}".format(target.key))
+                # Remaining objects are not polled after deadline too
+                self._queue = []
+                break
+
+            wait_time = poll_time - time.monotonic()
+            if wait_time > 0:
+                time.sleep(wait_time)
+
+            self.poll(target)
+
+        return {
+            key: (target.completed, target.result)
+            for key, target in self.targets.items()
+        }
+
+
+def get_poll_state(response):
+    """returns coarse state of entity (or entity list) response, so that only
+    the state changes of runlogs reset the backoff, not their progress"""
+
+    if "entities" in response:
+        return tuple(
+            (
+                entity.get("metadata", {}).get("uuid"),
+                entity.get("status", {}).get("state"),
+            )
+            for entity in response["entities"]
+        )
+
+    return response.get("status", {}).get("state")
+
+
+def poll_until(poll_func, timeout=None, **backoff_config):
+    """polls a single object using poll_func, till it is completed or timed out
+
+    Args:
+        poll_func (function): returns (completed, state, result) tuple
+        timeout (float): seconds after which polling is stopped
+        backoff_config: min_interval, max_interval, factor, jitter of backoff
+
+    Returns:
+        tuple: (completed, result of last poll)
+    """
+
+    poller = Poller(timeout=timeout, **backoff_config)
+    poller.add("object", poll_func)
+    return poller.run()["object"]
@@ -14,6 +14,7 @@ from calm.dsl.api import get_api_client, get_resource_api
 from calm.dsl.config import get_context
 
 from .utils import get_name_query, highlight_text
+from .poller import poll_until
 from .environments import create_environment_from_dsl_class
 from calm.dsl.tools import get_module_from_file
 from calm.dsl.log import get_logging_handle
@@ -123,8 +124,8 @@ def watch_project_task(project_uuid, task_uuid, poll_interval=4):
     """poll project tasks"""
 
     client = get_api_client()
-    cnt = 0
-    while True:
+
+    def poll():
         LOG.info("Fetching status of project task (uuid={})".format(task_uuid))
         res, err = client.project.read_pending_task(project_uuid, task_uuid)
         if err:
@@ -138,12 +139,15 @@ def watch_project_task(project_uuid, task_uuid, poll_interval=4):
             message_list = res["status"].get("message_list")
             if status != PROJECT_TASK.STATUS.SUCCESS and message_list:
                 LOG.error(message_list)
-            return status
+            return True, status, status
+
+        return False, status, status
 
-        time.sleep(poll_interval)
-        cnt += 1
-        if cnt == 10:
-            break
+    completed, status = poll_until(
+        poll, timeout=poll_interval * 10, max_interval=poll_interval
+    )
+    if completed:
+        return status
 
     LOG.info(
         "Task couldn't reached to terminal state in {} seconds. Exiting...".format(
@@ -1,8 +1,10 @@
 import click
+from ruamel import yaml
 
+from calm.dsl.providers import get_provider, get_provider_types
 from calm.dsl.log import get_logging_handle
 
-from .main import describe
+from .main import validate, create, describe
 from .providers import describe_custom_provider
 
 LOG = get_logging_handle(__name__)
@@ -22,3 +24,52 @@ def _describe_provider(provider_name, out):
     """Describe a provider"""
 
     describe_custom_provider(provider_name, out)
+
+
+@validate.command("provider_spec")
+@click.option(
+    "--file",
+    "-f",
+    "spec_file",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
+    required=True,
+    help="Path of provider spec file",
+)
+@click.option(
+    "--type",
+    "-t",
+    "provider_type",
+    type=click.Choice(get_provider_types()),
+    default="AHV_VM",
+    help="Provider type",
+)
+def validate_provider_spec(spec_file, provider_type):
+    """validates provider spec for given provider"""
+
+    with open(spec_file) as f:
+        spec = yaml.safe_load(f.read())
+
+    try:
+        Provider = get_provider(provider_type)
+        Provider.validate_spec(spec)
+
+        LOG.info("File {} is a valid {} spec.".format(spec_file, provider_type))
+    except Exception as ee:
+        LOG.info("File {} is invalid {} spec".format(spec_file, provider_type))
+        raise Exception(ee.message)
+
+
+@create.command("provider_spec")
+@click.option(
+    "--type",
+    "provider_type",
+    "-t",
+    type=click.Choice(get_provider_types()),
+    default="AHV_VM",
+    help="Provider type",
+)
+def create_provider_spec(provider_type):
+    """Creates a provider_spec"""
+
+    Provider = get_provider(provider_type)
+    Provider.create_spec()
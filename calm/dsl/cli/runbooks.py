@@ -38,6 +38,7 @@ from .utils import (
     _get_nested_messages,
 )
 from .constants import RUNBOOK, RUNLOG
+from .poller import poll_until, get_poll_state
 from .runlog import get_completion_func, get_runlog_status
 from .endpoints import get_endpoint
 
@@ -1028,24 +1029,22 @@ def abort_runbook_execution(runlog_uuid):
     click.echo(json.dumps(stdout_dict, indent=4, separators=(",", ": ")))
 
 
-def poll_action(poll_func, completion_func, poll_interval=10, **kwargs):
-    # Poll every 10 seconds on the runlog status, for 10 mins
-    maxWait = 10 * 60
-    count = 0
-    while count < maxWait:
+def poll_action(
+    poll_func, completion_func, poll_interval=10, timeout=10 * 60, **kwargs
+):
+    # Poll on the runlog status with backoff till poll_interval, for 10 mins
+    def poll():
         # call status api
         res, err = poll_func()
         if err:
             raise Exception("[{}] - {}".format(err["code"], err["error"]))
         response = res.json()
         (completed, msg) = completion_func(response, **kwargs)
-        if completed:
-            # click.echo(msg)
-            if msg:
-                return False
-            break
-        count += poll_interval
-        time.sleep(poll_interval)
+        return completed, get_poll_state(response), msg
+
+    completed, msg = poll_until(poll, timeout=timeout, max_interval=poll_interval)
+    if completed and msg:
+        return False
     return True
 
 
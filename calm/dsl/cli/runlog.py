@@ -16,8 +16,10 @@ from asciimatics.scene import Scene
 from asciimatics.screen import Screen
 from asciimatics.exceptions import StopApplication
 import time
+import bisect
 from time import sleep
 from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
 import itertools
 
 from anytree import NodeMixin, RenderTree
@@ -25,6 +27,7 @@ import datetime
 
 from .constants import RUNLOG, SINGLE_INPUT
 from calm.dsl.api import get_api_client
+from calm.dsl.config import get_context
 
 
 def parse_machine_name(runlog_id, machine_name):
@@ -185,7 +188,12 @@ class ConfirmFrame(Frame):
 
 
 def displayRunLogTree(screen, root, completed_tasks, total_tasks, msg=None):
-    screen.clear()
+    if hasattr(screen, "clear_buffer"):
+        # Clearing the double buffer instead of the screen, so that refresh
+        # only redraws the cells that have changed since the last draw
+        screen.clear_buffer(Screen.COLOUR_WHITE, Screen.A_NORMAL, Screen.COLOUR_BLACK)
+    else:
+        screen.clear()
     if total_tasks:
         progress = "{0:.2f}".format(completed_tasks / total_tasks * 100)
         screen.print_at("Progress: {}%".format(progress), 0, 0)
@@ -237,6 +245,176 @@ class RunlogNode(NodeMixin):
             self.children = children
 
 
+class RunlogTree:
+    """Runlog tree of a run, updated incrementally on each poll.
+
+    Nodes are created only for the new runlogs, and outputs of task runlogs
+    are fetched concurrently, only when their state has changed. Outputs of
+    the task runlogs in terminal state are never fetched again.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.nodes = {}
+        self.runlog_map = {}
+        # [(creation_time, uuid)] of runlogs, sorted on creation time
+        self.sorted_runlogs = []
+        # Runlogs of meta tasks and endpoint loops, not shown in tree
+        self.hidden_uuids = set()
+        # {uuid: (state, last_update_time)} of task runlogs at last output fetch
+        self.output_versions = {}
+
+    def get_sorted_runlogs(self):
+        """returns the runlogs sorted on creation time"""
+
+        return [self.runlog_map[uuid] for _, uuid in self.sorted_runlogs]
+
+    def update(self, client, entities, runlog_uuid, task_type_map):
+        """updates the tree using runlog entities of poll response"""
+
+        new_uuids = []
+        for runlog in entities:
+            uuid = str(runlog["metadata"]["uuid"])
+            if uuid not in self.runlog_map:
+                new_uuids.append(uuid)
+                bisect.insort(
+                    self.sorted_runlogs,
+                    (int(runlog["metadata"]["creation_time"]), uuid),
+                )
+            self.runlog_map[uuid] = runlog
+
+        if not self.sorted_runlogs:
+            return
+
+        # TODO - Get details of root node
+        if not self.root:
+            first_uuid = self.sorted_runlogs[0][1]
+            root_uuid = str(
+                self.runlog_map[first_uuid]["status"]["root_reference"]["uuid"]
+            )
+            root_runlog = {
+                "metadata": {"uuid": root_uuid},
+                "status": {"type": "action_runlog", "state": ""},
+            }
+            self.root = RunlogNode(root_runlog)
+            self.nodes[root_uuid] = self.root
+
+        for uuid in new_uuids:
+            self.add_node(uuid, runlog_uuid, task_type_map)
+
+        for uuid, node in self.nodes.items():
+            if node is not self.root:
+                node.runlog = self.runlog_map[uuid]
+                node.reasons = node.runlog["status"].get("reason_list", [])
+
+        if new_uuids:
+            self.attach_nodes()
+
+        self.update_outputs(client, runlog_uuid, task_type_map)
+
+    def add_node(self, uuid, runlog_uuid, task_type_map):
+        """creates node for a new runlog, if it is to be shown in tree"""
+
+        runlog = self.runlog_map[uuid]
+        machine_name = runlog["status"].get("machine_name", None)
+        machine = parse_machine_name(runlog_uuid, machine_name)
+        if machine and len(machine) == 1:
+            self.hidden_uuids.add(uuid)
+            return  # this runlog corresponds to endpoint loop
+        elif machine:
+            machine = "{} ({})".format(machine[1], machine[0])
+
+        if runlog["status"]["type"] == "task_runlog":
+            task_id = runlog["status"]["task_reference"]["uuid"]
+            if task_id in task_type_map and task_type_map[task_id] == "META":
+                self.hidden_uuids.add(uuid)
+                return  # don't add metatask's trl in runlogTree
+
+        self.nodes[uuid] = RunlogNode(runlog, machine=machine)
+
+    def attach_nodes(self):
+        """attaches the nodes to their parents, in order of creation time"""
+
+        entity_nodes = [
+            (uuid, self.nodes[uuid])
+            for _, uuid in self.sorted_runlogs
+            if uuid in self.nodes and self.nodes[uuid] is not self.root
+        ]
+
+        # Nodes are detached first, so that children are in order of creation
+        for _, node in entity_nodes:
+            node.parent = None
+
+        for uuid, node in entity_nodes:
+            runlog = self.runlog_map[uuid]
+            parent_uuid = str(runlog["status"]["parent_reference"]["uuid"])
+            while parent_uuid in self.hidden_uuids:
+                parent_runlog = self.runlog_map[parent_uuid]
+                parent_uuid = str(parent_runlog["status"]["parent_reference"]["uuid"])
+
+            node.parent = self.nodes[parent_uuid]
+
+    def update_outputs(self, client, runlog_uuid, task_type_map):
+        """fetches outputs of task runlogs whose state has changed since last poll"""
+
+        pending_runlogs = []
+        for uuid, node in self.nodes.items():
+            status = node.runlog["status"]
+            if status["type"] != "task_runlog":
+                continue
+
+            # Output is not valid for input, confirm and while_loop tasks
+            task_id = status["task_reference"]["uuid"]
+            if task_id in task_type_map and task_type_map[task_id] in [
+                "INPUT",
+                "CONFIRM",
+                "WHILE_LOOP",
+            ]:
+                continue
+
+            version = (status["state"], node.runlog["metadata"]["last_update_time"])
+            fetched_version = self.output_versions.get(uuid)
+            if fetched_version and (
+                fetched_version[0] in RUNLOG.TERMINAL_STATES
+                or fetched_version == version
+            ):
+                continue
+
+            pending_runlogs.append((uuid, version))
+
+        if not pending_runlogs:
+            return
+
+        concurrency = get_context().get_connection_config()["concurrency"]
+        concurrency = max(1, min(int(concurrency), len(pending_runlogs)))
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outputs_list = list(
+                executor.map(
+                    lambda pending_runlog: get_runlog_outputs(
+                        client, runlog_uuid, pending_runlog[0]
+                    ),
+                    pending_runlogs,
+                )
+            )
+
+        for (uuid, version), outputs in zip(pending_runlogs, outputs_list):
+            self.nodes[uuid].outputs = outputs
+            self.output_versions[uuid] = version
+
+
+def get_runlog_outputs(client, runlog_uuid, uuid):
+    """returns the outputs of task runlog"""
+
+    res, err = client.runbook.runlog_output(runlog_uuid, uuid)
+    if err:
+        raise Exception("\n[{}] - {}".format(err["code"], err["error"]))
+
+    output_list = res.json()["status"]["output_list"]
+    if len(output_list) > 0:
+        return [output_list[0]["output"]]
+    return []
+
+
 def displayRunLog(screen, obj, pre, fill, line):
 
     if not isinstance(obj, RunlogNode):
@@ -342,6 +520,10 @@ def displayRunLog(screen, obj, pre, fill, line):
 
 
 def get_completion_func(screen):
+
+    # Runlog tree is kept across polls, so that only the changes are processed
+    tree = RunlogTree()
+
     def is_action_complete(
         response,
         task_type_map=[],
@@ -367,89 +549,9 @@ def get_completion_func(screen):
             if hasattr(screen, "get_event"):
                 interrupt = screen.get_event()
 
-            # Sort entities based on creation time
-            sorted_entities = sorted(
-                entities, key=lambda x: int(x["metadata"]["creation_time"])
-            )
-
-            # Create nodes of runlog tree and a map based on uuid
-            root = None
-            nodes = {}
-            runlog_map = {}
-            for runlog in sorted_entities:
-                # Create root node
-                # TODO - Get details of root node
-                if not root:
-                    root_uuid = runlog["status"]["root_reference"]["uuid"]
-                    root_runlog = {
-                        "metadata": {"uuid": root_uuid},
-                        "status": {"type": "action_runlog", "state": ""},
-                    }
-                    runlog_map[str(root_uuid)] = root_runlog
-                    root = RunlogNode(root_runlog)
-                    nodes[str(root_uuid)] = root
-
-                uuid = runlog["metadata"]["uuid"]
-                runlog_map[str(uuid)] = runlog
-                reasons = runlog["status"].get("reason_list", [])
-                outputs = []
-                machine_name = runlog["status"].get("machine_name", None)
-                machine = parse_machine_name(runlog_uuid, machine_name)
-                if machine and len(machine) == 1:
-                    runlog["status"]["machine_name"] = "-"
-                    continue  # this runlog corresponds to endpoint loop
-                elif machine:
-                    machine = "{} ({})".format(machine[1], machine[0])
-
-                if runlog["status"]["type"] == "task_runlog":
-
-                    task_id = runlog["status"]["task_reference"]["uuid"]
-                    if task_id in task_type_map and task_type_map[task_id] == "META":
-                        continue  # don't add metatask's trl in runlogTree
-
-                    # Output is not valid for input, confirm and while_loop tasks
-                    if task_id not in task_type_map or (
-                        task_id in task_type_map
-                        and task_type_map[task_id]
-                        not in ["INPUT", "CONFIRM", "WHILE_LOOP"]
-                    ):
-                        res, err = client.runbook.runlog_output(runlog_uuid, uuid)
-                        if err:
-                            raise Exception(
-                                "\n[{}] - {}".format(err["code"], err["error"])
-                            )
-                        runlog_output = res.json()
-                        output_list = runlog_output["status"]["output_list"]
-                        if len(output_list) > 0:
-                            outputs.append(output_list[0]["output"])
-
-                nodes[str(uuid)] = RunlogNode(
-                    runlog,
-                    parent=root,
-                    outputs=outputs,
-                    machine=machine,
-                    reasons=reasons,
-                )
-
-            # Attach parent to nodes
-            for runlog in sorted_entities:
-                uuid = runlog["metadata"]["uuid"]
-                if nodes.get(str(uuid), None) is None:
-                    continue
-                parent_uuid = runlog["status"]["parent_reference"]["uuid"]
-                parent_runlog = runlog_map[str(parent_uuid)]
-                parent_type = parent_runlog["status"]["type"]
-                while (
-                    parent_type == "task_runlog"
-                    and task_type_map[parent_runlog["status"]["task_reference"]["uuid"]]
-                    == "META"
-                ) or parent_runlog["status"].get("machine_name", None) == "-":
-                    parent_uuid = parent_runlog["status"]["parent_reference"]["uuid"]
-                    parent_runlog = runlog_map[str(parent_uuid)]
-                    parent_type = parent_runlog["status"]["type"]
-
-                node = nodes[str(uuid)]
-                node.parent = nodes[str(parent_uuid)]
+            tree.update(client, entities, runlog_uuid, task_type_map)
+            root = tree.root
+            sorted_entities = tree.get_sorted_runlogs()
 
             # Show Progress
             # TODO - Draw progress bar
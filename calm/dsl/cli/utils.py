@@ -13,6 +13,8 @@ from calm.dsl.constants import PROVIDER_ACCOUNT_TYPE_MAP
 from calm.dsl.store import Version
 from calm.dsl.log import get_logging_handle
 
+from .command_index import CommandIndex
+
 LOG = get_logging_handle(__name__)
 
 
@@ -125,6 +127,10 @@ class FeatureFlagMixin:
 
         cmd_name = ctx.protected_args[0]
 
+        # Feature flags are registered along with the command
+        if isinstance(self, LazyCommandMixin):
+            self.load_command(cmd_name)
+
         feature_min_version = self.feature_version_map.get(cmd_name, "")
         if feature_min_version:
             calm_version = Version.get_version("Calm")
@@ -147,9 +153,39 @@ class FeatureFlagMixin:
             return super().invoke(ctx)
 
 
-class FeatureFlagGroup(FeatureFlagMixin, DYMMixin, click.Group):
+class LazyCommandMixin:
+    """Imports the module registering a subcommand only when the subcommand is
+    resolved, using the CommandIndex of cli command tree"""
+
+    # Path of group in command tree, set when group is resolved by its parent
+    index_path = ""
+
+    def load_command(self, cmd_name):
+        CommandIndex.load_command(self.index_path, cmd_name)
+
+    def list_commands(self, ctx):
+        commands = set(super().list_commands(ctx))
+        commands.update(CommandIndex.get_command_names(self.index_path))
+        return sorted(commands)
+
+    def get_command(self, ctx, cmd_name):
+        self.load_command(cmd_name)
+        cmd = super().get_command(ctx, cmd_name)
+
+        cmd_path = CommandIndex.get_path(self.index_path, cmd_name)
+        if isinstance(cmd, LazyCommandMixin):
+            cmd.index_path = cmd_path
+
+        # Plain click groups can't load their subcommands lazily
+        elif isinstance(cmd, click.Group):
+            CommandIndex.load_group(cmd_path)
+
+        return cmd
+
+
+class FeatureFlagGroup(FeatureFlagMixin, LazyCommandMixin, DYMMixin, click.Group):
     """click Group that have *did-you-mean* functionality and adds *feature_min_version* paramter to each subcommand
-    which can be used to set minimum calm version for command"""
+    which can be used to set minimum calm version for command. Subcommands are loaded lazily"""
 
     pass
 
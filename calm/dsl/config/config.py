@@ -107,7 +107,7 @@ class ConfigFileParser:
                     connection_config[k] = self._CONFIG_PARSER_OBJECT[
                         "CONNECTION"
                     ].getboolean(k)
-                elif k in ["connection_timeout", "read_timeout"]:
+                elif k in ["connection_timeout", "read_timeout", "concurrency"]:
                     connection_config[k] = self._CONFIG_PARSER_OBJECT[
                         "CONNECTION"
                     ].getint(k)
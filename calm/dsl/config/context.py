@@ -11,6 +11,7 @@ LOG = get_logging_handle(__name__)
 DEFAULT_RETRIES_ENABLED = True
 DEFAILT_CONNECTION_TIMEOUT = 5
 DEFAULT_READ_TIMEOUT = 30
+DEFAULT_CONCURRENCY = 5
 
 
 class Context:
@@ -117,6 +118,8 @@ class Context:
             config["connection_timeout"] = DEFAILT_CONNECTION_TIMEOUT
         if "read_timeout" not in config:
             config["read_timeout"] = DEFAULT_READ_TIMEOUT
+        if "concurrency" not in config:
+            config["concurrency"] = DEFAULT_CONCURRENCY
 
         return config
 
@@ -242,4 +245,5 @@ def get_default_connection_config():
         "connection_timeout": DEFAILT_CONNECTION_TIMEOUT,
         "read_timeout": DEFAULT_READ_TIMEOUT,
         "retries_enabled": DEFAULT_RETRIES_ENABLED,
+        "concurrency": DEFAULT_CONCURRENCY,
     }
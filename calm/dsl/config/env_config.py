@@ -2,16 +2,31 @@ import os
 
 
 class EnvConfig:
-    pc_ip = os.environ.get("CALM_DSL_PC_IP") or ""
-    pc_port = os.environ.get("CALM_DSL_PC_PORT") or ""
-    pc_username = os.environ.get("CALM_DSL_PC_USERNAME") or ""
-    pc_password = os.environ.get("CALM_DSL_PC_PASSWORD") or ""
-    default_project = os.environ.get("CALM_DSL_DEFAULT_PROJECT") or ""
-    log_level = os.environ.get("CALM_DSL_LOG_LEVEL") or ""
+    pc_ip = ""
+    pc_port = ""
+    pc_username = ""
+    pc_password = ""
+    default_project = ""
+    log_level = ""
 
-    config_file_location = os.environ.get("CALM_DSL_CONFIG_FILE_LOCATION") or ""
-    local_dir_location = os.environ.get("CALM_DSL_LOCAL_DIR_LOCATION") or ""
-    db_location = os.environ.get("CALM_DSL_DB_LOCATION")
+    config_file_location = ""
+    local_dir_location = ""
+    db_location = None
+
+    @classmethod
+    def load(cls):
+        """reads the config from environment variables"""
+
+        cls.pc_ip = os.environ.get("CALM_DSL_PC_IP") or ""
+        cls.pc_port = os.environ.get("CALM_DSL_PC_PORT") or ""
+        cls.pc_username = os.environ.get("CALM_DSL_PC_USERNAME") or ""
+        cls.pc_password = os.environ.get("CALM_DSL_PC_PASSWORD") or ""
+        cls.default_project = os.environ.get("CALM_DSL_DEFAULT_PROJECT") or ""
+        cls.log_level = os.environ.get("CALM_DSL_LOG_LEVEL") or ""
+
+        cls.config_file_location = os.environ.get("CALM_DSL_CONFIG_FILE_LOCATION") or ""
+        cls.local_dir_location = os.environ.get("CALM_DSL_LOCAL_DIR_LOCATION") or ""
+        cls.db_location = os.environ.get("CALM_DSL_DB_LOCATION")
 
     @classmethod
     def get_server_config(cls):
@@ -63,3 +78,6 @@ class EnvConfig:
             config["db_location"] = cls.db_location
 
         return config
+
+
+EnvConfig.load()
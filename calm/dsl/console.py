@@ -0,0 +1,27 @@
+import sys
+
+# Only stdlib modules are imported at module level, as commands are forwarded
+# to calm daemon before importing the cli
+
+
+def main():
+    """console entry point of calm cli. Commands are forwarded to calm daemon,
+    if it is running, and the process exits with the exit code of command"""
+
+    argv = sys.argv[1:]
+    if "--profile-startup" in argv:
+        # Installed before importing the cli, so that all imports are profiled
+        from calm.dsl.import_profiler import ImportProfiler
+
+        ImportProfiler.start()
+
+    # Daemon commands always run locally
+    else:
+        from calm.dsl.daemon_client import forward_to_daemon, get_command_name
+
+        if get_command_name(argv) != "daemon":
+            forward_to_daemon(argv)
+
+    from calm.dsl.cli import main as cli_main
+
+    return cli_main()
@@ -0,0 +1,129 @@
+import os
+import sys
+import json
+import socket
+
+# Only stdlib modules are imported, as commands are forwarded to calm daemon
+# before importing any other module
+
+DAEMON_SOCKET_ENV = "CALM_DSL_DAEMON_SOCKET"
+NO_DAEMON_ENV = "CALM_DSL_NO_DAEMON"
+DEFAULT_SOCKET_FILE = os.path.join(os.path.expanduser("~"), ".calm", "daemon.sock")
+
+# Options of root command taking a value, skipped when finding the subcommand
+ROOT_VALUE_OPTIONS = ["--config", "-c", "--trace-file"]
+
+
+def get_command_name(argv):
+    """returns the subcommand of root command in argv, None if not given"""
+
+    args = iter(argv)
+    for arg in args:
+        if arg == "--":
+            return next(args, None)
+        if arg in ROOT_VALUE_OPTIONS:
+            next(args, None)
+        elif not arg.startswith("-"):
+            return arg
+
+    return None
+
+
+def get_socket_path():
+    """returns path of unix socket, daemon listens on"""
+
+    return os.environ.get(DAEMON_SOCKET_ENV) or DEFAULT_SOCKET_FILE
+
+
+def send_message(sock_file, **message):
+    sock_file.write((json.dumps(message) + "\n").encode("utf-8"))
+    sock_file.flush()
+
+
+def read_message(sock_file):
+    """returns next message from socket, None if socket is closed"""
+
+    line = sock_file.readline()
+    if not line:
+        return None
+    return json.loads(line.decode("utf-8"))
+
+
+def connect_daemon(socket_path=None, timeout=None):
+    """returns socket connected to daemon, None if daemon is not running"""
+
+    socket_path = socket_path or get_socket_path()
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+
+    return sock
+
+
+def request_daemon(message_type, socket_path=None, timeout=5):
+    """sends control message (ping/stop) to daemon and returns its reply"""
+
+    sock = connect_daemon(socket_path, timeout=timeout)
+    if sock is None:
+        return None
+
+    with sock, sock.makefile("rwb") as sock_file:
+        send_message(sock_file, type=message_type)
+        return read_message(sock_file)
+
+
+def forward_to_daemon(argv, socket_path=None):
+    """runs the command in daemon, if it is running, and exits with the
+    exit code of command. Returns if daemon is not available"""
+
+    if os.environ.get(NO_DAEMON_ENV):
+        return
+
+    sock = connect_daemon(socket_path)
+    if sock is None:
+        return
+
+    with sock, sock.makefile("rwb") as sock_file:
+        send_message(
+            sock_file,
+            type="run",
+            argv=argv,
+            cwd=os.getcwd(),
+            env=dict(os.environ),
+            isatty={
+                "stdin": sys.stdin is not None and sys.stdin.isatty(),
+                "stdout": sys.stdout.isatty(),
+                "stderr": sys.stderr.isatty(),
+            },
+        )
+
+        while True:
+            message = read_message(sock_file)
+            if message is None:
+                sys.stderr.write("calm daemon closed the connection\n")
+                sys.exit(-1)
+
+            if message["type"] == "output":
+                stream = sys.stdout if message["stream"] == "stdout" else sys.stderr
+                stream.write(message["data"])
+                stream.flush()
+
+            elif message["type"] == "stdin":
+                data = ""
+                if sys.stdin is not None:
+                    if message["size"] == "line":
+                        data = sys.stdin.readline()
+                    else:
+                        data = sys.stdin.read()
+                send_message(sock_file, type="stdin", data=data)
+
+            elif message["type"] == "exit":
+                sys.stdout.flush()
+                sys.exit(message["code"])
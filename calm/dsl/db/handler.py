@@ -1,6 +1,8 @@
 import atexit
 import os
 
+from peewee import DatabaseError, OperationalError
+
 from calm.dsl.config import get_context
 from .table_config import dsl_database, SecretTable, DataTable, VersionTable
 from .table_config import CacheTableBase
@@ -8,6 +10,18 @@ from calm.dsl.log import get_logging_handle
 
 LOG = get_logging_handle(__name__)
 
+# Readers do not block the writer in wal mode, so that calm processes can use
+# the db while cache is synced by another one
+DB_PRAGMAS = {
+    "journal_mode": "wal",
+    # Commits are durable in wal mode, without syncing the db on every commit
+    "synchronous": "normal",
+    "cache_size": -16 * 1024,  # 16MB
+    "mmap_size": 64 * 1024 * 1024,
+}
+# Seconds to wait for the lock held by other connections, before failing
+DB_BUSY_TIMEOUT = 30
+
 
 class Database:
     """DSL database connection"""
@@ -24,7 +38,7 @@ class Database:
         ContextObj = get_context()
         init_obj = ContextObj.get_init_config()
         db_location = init_obj["DB"]["location"]
-        dsl_database.init(db_location)
+        dsl_database.init(db_location, pragmas=DB_PRAGMAS, timeout=DB_BUSY_TIMEOUT)
         return dsl_database
 
     def __init__(self):
@@ -44,6 +58,9 @@ class Database:
 
         if not self.db.table_exists((table_cls.__name__).lower()):
             self.db.create_tables([table_cls])
+        else:
+            # Create indexes added to the existing tables
+            table_cls._schema.create_indexes(safe=True)
 
         # Register table to class
         if table_cls not in self.registered_tables:
@@ -85,6 +102,28 @@ def get_db_handle():
     return _Database
 
 
+def clear_db(db_location):
+    """drops all the tables of db. The db file is not removed, as other calm
+    processes may have it open. Unreadable db file is removed"""
+
+    dsl_database.init(db_location, pragmas=DB_PRAGMAS, timeout=DB_BUSY_TIMEOUT)
+    try:
+        with dsl_database.connection_context():
+            with dsl_database.atomic("IMMEDIATE"):
+                for table_name in dsl_database.get_tables():
+                    dsl_database.execute_sql('DROP TABLE "{}"'.format(table_name))
+
+    except OperationalError:
+        # Db is locked by other process, that may still be using the files
+        raise
+
+    except DatabaseError as exc:
+        LOG.debug("Removing unreadable db {}: {}".format(db_location, exc))
+        for db_file in [db_location, db_location + "-wal", db_location + "-shm"]:
+            if os.path.exists(db_file):
+                os.remove(db_file)
+
+
 def init_db_handle():
     """Initializes database module and replaces the existing one"""
 
@@ -102,12 +141,12 @@ def init_db_handle():
     except:  # noqa
         pass
 
-    # Removing existing db at init location if exists
+    # Clearing existing db at init location if exists
     ContextObj = get_context()
     init_obj = ContextObj.get_init_config()
     db_location = init_obj["DB"]["location"]
     if os.path.exists(db_location):
-        os.remove(db_location)
+        clear_db(db_location)
 
     # Initialize new database object
     _Database = Database()
@@ -9,8 +9,15 @@ from peewee import (
     CompositeKey,
     DoesNotExist,
     IntegerField,
+    chunked,
 )
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import datetime
+import time
+import uuid
+import os
 import click
 import arrow
 import json
@@ -22,12 +29,67 @@ from calm.dsl.api import get_resource_api, get_api_client
 from calm.dsl.config import get_context
 from calm.dsl.log import get_logging_handle
 from calm.dsl.constants import CACHE
+from .writer import execute_write
 
 LOG = get_logging_handle(__name__)
+SYNC_MARKER_PREFIX = "sync_marker"
+# Allowed clock skew between client and server, while setting sync markers
+SYNC_MARKER_SKEW_USECS = 5 * 60 * 1000000
+SHADOW_TABLE_SUFFIX = "__shadow"
+SQLITE_MAX_VARIABLES = 900
+BULK_INSERT_CHUNK_SIZE = 500
 NON_ALPHA_NUMERIC_CHARACTER = "[^0-9a-zA-Z]+"
 REPLACED_CLUSTER_NAME_CHARACTER = "_"
 # Proxy database
 dsl_database = SqliteDatabase(None)
+# Rows buffered by CacheTableBase.batch_writes(), per thread
+_write_buffers = threading.local()
+
+
+def is_process_alive(pid):
+    """returns True if process with given pid is running"""
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def fetch_missing_account_entity(table, list_func, name, account_uuid=None):
+    """adds entities (with given name) of nutanix_pc accounts to table,
+    listed using provider api list_func. Returns True if any entity is added.
+    """
+
+    if account_uuid:
+        account_uuids = [account_uuid]
+    else:
+        client = get_api_client()
+        payload = {"length": 250, "filter": "state==VERIFIED;type==nutanix_pc"}
+        account_uuids = list(client.account.get_name_uuid_map(payload).values())
+
+    found = False
+    for _account_uuid in account_uuids:
+        res = list_func(
+            account_uuid=_account_uuid, filter_query="name=={}".format(name)
+        )
+        for entity in res.get("entities", []):
+            entry = table.get_account_entity_entry(entity, _account_uuid)
+            execute_write(
+                table.delete()
+                .where(
+                    (table.uuid == entry["uuid"])
+                    & (table.account_uuid == _account_uuid)
+                )
+                .execute
+            )
+            table.create_entry(**entry)
+            found = True
+
+    table.flush_writes()
+    return found
 
 
 class BaseModel(Model):
@@ -66,10 +128,16 @@ class CacheTableBase(BaseModel):
     tables = {}
     is_approval_policy_required = False
     is_policy_required = False
+    # cache types of tables that must be synced before this table
+    sync_dependencies = []
 
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
 
+        # Shadow models are not registered, they stand in for their table
+        if "shadow_of" in cls.__dict__:
+            return
+
         cache_type = cls.get_cache_type()
         if not cache_type:
             raise TypeError("Base table does not have a cache type attribute")
@@ -105,9 +173,197 @@ class CacheTableBase(BaseModel):
     @classmethod
     def clear(cls):
         """removes entire data from table"""
-        raise NotImplementedError(
-            "clear helper not implemented for {} table".format(cls.get_cache_type())
-        )
+
+        execute_write(cls.delete().execute)
+
+    @classmethod
+    def create(cls, **query):
+        """creates a row in table, through the active db writer (if any).
+        Inside batch_writes() block, row is buffered and inserted in bulk.
+        """
+
+        write_buffer = cls.get_write_buffer()
+        if write_buffer is None:
+            return execute_write(super().create, **query)
+
+        write_buffer.append(query)
+        if len(write_buffer) >= BULK_INSERT_CHUNK_SIZE:
+            cls.flush_writes()
+
+    @classmethod
+    def get_write_buffer(cls):
+        """returns rows buffered for table by current thread, None if not batching"""
+
+        return getattr(_write_buffers, "tables", {}).get(cls)
+
+    @classmethod
+    @contextmanager
+    def batch_writes(cls):
+        """buffers the rows created inside the block, and inserts them in bulk
+        transactions of BULK_INSERT_CHUNK_SIZE rows. Buffered rows are discarded
+        if block raises an exception.
+        """
+
+        if not hasattr(_write_buffers, "tables"):
+            _write_buffers.tables = {}
+
+        # Nested block, rows are flushed by outer one
+        if cls in _write_buffers.tables:
+            yield
+            return
+
+        _write_buffers.tables[cls] = []
+        try:
+            yield
+            cls.flush_writes()
+        finally:
+            _write_buffers.tables.pop(cls, None)
+
+    @classmethod
+    def flush_writes(cls):
+        """inserts the rows buffered by batch_writes() block"""
+
+        write_buffer = cls.get_write_buffer()
+        if not write_buffer:
+            return
+
+        rows = [cls.get_insert_row(query) for query in write_buffer]
+        write_buffer.clear()
+        execute_write(cls.insert_rows, rows)
+
+    @classmethod
+    def get_insert_row(cls, query):
+        """returns row with defaults of missing fields, as insert_many requires
+        same fields for all the rows"""
+
+        row = dict(query)
+        for field in cls._meta.sorted_fields:
+            if field.name in row or (field.default is None and not field.null):
+                continue
+
+            default = field.default
+            row[field.name] = default() if callable(default) else default
+
+        return row
+
+    @classmethod
+    def insert_rows(cls, rows):
+        """inserts rows in a single transaction"""
+
+        # Keeping sql variables per statement under sqlite limit
+        batch_size = max(1, SQLITE_MAX_VARIABLES // len(cls._meta.sorted_fields))
+        with cls._meta.database.atomic():
+            for batch in chunked(rows, batch_size):
+                cls.insert_many(batch).execute()
+
+    @classmethod
+    def get_shadow_model(cls):
+        """returns model of a new shadow table, having fields and sync methods
+        of table. Table model itself keeps pointing to the live table.
+        Shadow table name is unique per call, so that concurrent syncs (of
+        other threads and processes) never fill or swap the same table"""
+
+        class Meta:
+            table_name = "{}{}{}_{}".format(
+                cls._meta.table_name,
+                SHADOW_TABLE_SUFFIX,
+                os.getpid(),
+                uuid.uuid4().hex[:8],
+            )
+            database = cls._meta.database
+
+        return type(cls.__name__ + "Shadow", (cls,), {"Meta": Meta, "shadow_of": cls})
+
+    @classmethod
+    def get_shadow_table_names(cls):
+        """returns names of the shadow tables of table present in db"""
+
+        prefix = cls._meta.table_name + SHADOW_TABLE_SUFFIX
+        return [
+            name for name in cls._meta.database.get_tables() if name.startswith(prefix)
+        ]
+
+    @classmethod
+    def drop_stale_shadow_tables(cls):
+        """drops shadow tables left by killed processes"""
+
+        db = cls._meta.database
+        prefix = cls._meta.table_name + SHADOW_TABLE_SUFFIX
+        for name in cls.get_shadow_table_names():
+            pid = name[len(prefix) :].split("_")[0]
+            if pid.isdigit() and not is_process_alive(int(pid)):
+                LOG.debug("Dropping stale shadow table {}".format(name))
+                db.execute_sql('DROP TABLE IF EXISTS "{}"'.format(name))
+
+    @classmethod
+    @contextmanager
+    def shadow_table(cls):
+        """yields model of an empty shadow table, to be filled inside the
+        block. On exit, the shadow table replaces the table in a single
+        transaction, so that readers (other threads and processes) see either
+        the old rows or the new ones, never a partially synced table.
+        Shadow table is dropped if block raises an exception.
+        """
+
+        table_name = cls._meta.table_name
+        shadow_model = cls.get_shadow_model()
+        shadow_name = shadow_model._meta.table_name
+        db = cls._meta.database
+
+        def create_shadow_table():
+            with db.atomic("IMMEDIATE"):
+                cls.drop_stale_shadow_tables()
+                # Indexes are created after swap, with the names of table
+                shadow_model._schema.create_table(safe=False)
+
+        def swap_shadow_table():
+            with db.atomic("IMMEDIATE"):
+                if not db.table_exists(shadow_name):
+                    raise Exception(
+                        "Shadow table {} of {} table was dropped during sync".format(
+                            shadow_name, table_name
+                        )
+                    )
+                db.execute_sql('DROP TABLE IF EXISTS "{}"'.format(table_name))
+                db.execute_sql(
+                    'ALTER TABLE "{}" RENAME TO "{}"'.format(shadow_name, table_name)
+                )
+                cls._schema.create_indexes()
+
+        def drop_shadow_table():
+            db.execute_sql('DROP TABLE IF EXISTS "{}"'.format(shadow_name))
+
+        execute_write(create_shadow_table)
+        try:
+            yield shadow_model
+            execute_write(swap_shadow_table)
+        except BaseException:
+            execute_write(drop_shadow_table)
+            # Rows synced since the marker are lost, next sync is complete one
+            cls.set_sync_marker(None)
+            raise
+
+    @classmethod
+    def supports_incremental_sync(cls):
+        """returns True if table can be synced incrementally now"""
+
+        Obj, _ = cls.get_sync_list_api()
+        return Obj is not None and cls.get_sync_marker() is not None
+
+    @classmethod
+    def sync_table(cls, incremental=False):
+        """syncs the table, modifying the rows in place for incremental syncs.
+        Complete syncs fill a shadow table, that replaces the table once done.
+        """
+
+        if incremental and cls.supports_incremental_sync():
+            with cls.batch_writes():
+                cls.sync_incremental()
+            return
+
+        # Buffered rows are flushed to shadow table, before it is swapped
+        with cls.shadow_table() as shadow_model, shadow_model.batch_writes():
+            shadow_model.sync()
 
     @classmethod
     def show_data(cls):
@@ -116,10 +372,258 @@ class CacheTableBase(BaseModel):
         )
 
     @classmethod
-    def sync(cls):
+    def get_sync_list_api(cls):
+        """returns (ResourceAPI object, list payload) used to sync the table.
+        Tables built from a single list api implement it along with
+        get_sync_entries, to get default sync() and sync_incremental() support.
+        """
+
+        return None, {}
+
+    @classmethod
+    def get_sync_entries(cls, entity):
+        """returns list of create_entry kwargs for an entity of list api"""
+
         raise NotImplementedError(
-            "sync helper not implemented for {} table".format(cls.get_cache_type())
+            "get_sync_entries helper not implemented for {} table".format(
+                cls.get_cache_type()
+            )
+        )
+
+    @classmethod
+    def sync(cls):
+        """sync the table from server"""
+
+        Obj, params = cls.get_sync_list_api()
+        if Obj is None:
+            raise NotImplementedError(
+                "sync helper not implemented for {} table".format(cls.get_cache_type())
+            )
+
+        # clear old data
+        cls.clear()
+
+        sync_start_usecs = get_sync_start_usecs()
+        sync_marker = None
+        skipped_uuids = set()
+        entities = Obj.iter_all(base_params=params)
+        for entity, kwargs in cls.prepare_sync_entries(entities):
+            sync_marker = max(sync_marker or 0, get_entity_update_usecs(entity))
+            if not cls.create_entity_entries(cls.get_sync_entries(entity, **kwargs)):
+                skipped_uuids.add(entity["metadata"]["uuid"])
+
+        cls.set_sync_marker(get_new_sync_marker(sync_marker, sync_start_usecs))
+        cls.set_skipped_uuids(skipped_uuids)
+
+    @classmethod
+    def prepare_sync_entries(cls, entities):
+        """yields (entity, get_sync_entries kwargs) for entities listed by
+        sync. Tables fetching extra data of many entities together override it"""
+
+        for entity in entities:
+            yield entity, {}
+
+    @classmethod
+    def create_entity_entries(cls, entries):
+        """creates the rows of an entity, returns False if entity has none"""
+
+        for entry in entries:
+            cls.create_entry(**entry)
+        return bool(entries)
+
+    @classmethod
+    def sync_incremental(cls):
+        """syncs only the entities modified since last sync of table.
+        Falls back to complete sync for tables not supporting it, or if
+        table was never synced before.
+        """
+
+        Obj, params = cls.get_sync_list_api()
+        sync_marker = cls.get_sync_marker()
+        if Obj is None or sync_marker is None:
+            cls.sync()
+            return
+
+        # Latest modified entities come first, so stop at the first old entity
+        params = dict(params)
+        params["sort_attribute"] = "_last_update_timestamp_usecs_"
+        params["sort_order"] = "DESCENDING"
+
+        # Listing stops early, so next page is not prefetched
+        sync_start_usecs = get_sync_start_usecs()
+        new_sync_marker = sync_marker
+        modified_entity_count = 0
+        skipped_uuids = cls.get_skipped_uuids()
+        for entity in Obj.iter_all(base_params=params, prefetch=False):
+            update_usecs = get_entity_update_usecs(entity)
+            if update_usecs < sync_marker:
+                break
+
+            new_sync_marker = max(new_sync_marker, update_usecs)
+            modified_entity_count += 1
+
+            if cls.refresh_entity_entries(entity):
+                skipped_uuids.discard(entity["metadata"]["uuid"])
+            else:
+                skipped_uuids.add(entity["metadata"]["uuid"])
+
+        LOG.debug(
+            "{} entities modified in {} table since last sync".format(
+                modified_entity_count, cls.get_cache_type()
+            )
+        )
+        cls.flush_writes()
+        cls.remove_deleted_entities(Obj, params, skipped_uuids)
+        cls.set_sync_marker(get_new_sync_marker(new_sync_marker, sync_start_usecs))
+        cls.set_skipped_uuids(skipped_uuids)
+
+    @classmethod
+    def refresh_entity_entries(cls, entity):
+        """replaces the rows of list api entity by its latest entries. Returns
+        False if entity has no entries"""
+
+        entity_uuid = entity["metadata"]["uuid"]
+        execute_write(cls.delete().where(cls.uuid == entity_uuid).execute)
+        return cls.create_entity_entries(cls.get_sync_entries(entity))
+
+    @classmethod
+    def get_read_through_api(cls):
+        """returns ResourceAPI object used to fetch entities missing in table"""
+
+        return cls.get_sync_list_api()[0]
+
+    @classmethod
+    def fetch_missing_entity(cls, name=None, uuid=None, **kwargs):
+        """fetches entity (using name or uuid) missing in table from server,
+        and adds it to the table. Returns True if any entity is added.
+        """
+
+        Obj = cls.get_read_through_api()
+        if Obj is None:
+            return False
+
+        if uuid:
+            res, err = Obj.read(uuid)
+            if err:
+                LOG.debug(
+                    "Failed to read {} (uuid={}): {}".format(
+                        cls.get_cache_type(), uuid, err["error"]
+                    )
+                )
+                return False
+            entities = [res.json()]
+
+        else:
+            params = {"length": 250, "filter": "name=={}".format(name)}
+            entities = list(Obj.iter_all(base_params=params, prefetch=False))
+
+        supports_list_entries = cls.get_sync_list_api()[0] is not None
+        for entity in entities:
+            if supports_list_entries:
+                cls.refresh_entity_entries(entity)
+                continue
+
+            entity_uuid = entity["metadata"]["uuid"]
+            if not cls.select().where(cls.uuid == entity_uuid).exists():
+                cls.add_one(entity_uuid)
+
+        cls.flush_writes()
+        return bool(entities)
+
+    @classmethod
+    def remove_deleted_entities(cls, Obj, params, skipped_uuids=None):
+        """removes entries of entities deleted from server. Deleted entities
+        are removed from skipped_uuids (synced entities without entries) too"""
+
+        if skipped_uuids is None:
+            skipped_uuids = set()
+
+        count_params = dict(params)
+        count_params["length"] = 1
+        count_params["offset"] = 0
+        res, err = Obj.list(count_params, ignore_error=True)
+        if err:
+            raise Exception("[{}] - {}".format(err["code"], err["error"]))
+
+        # Every entity created after last sync is already present in table (or
+        # in skipped_uuids), so equal counts mean that nothing got deleted
+        server_entity_count = int(res.json()["metadata"]["total_matches"])
+        db_uuids = set(row.uuid for row in cls.select(cls.uuid).distinct())
+        if len(db_uuids | skipped_uuids) == server_entity_count:
+            return
+
+        # List api has no field projection, so only uuids are kept from pages
+        server_uuids = set(
+            entity["metadata"]["uuid"] for entity in Obj.iter_all(base_params=params)
+        )
+        deleted_uuids = list(db_uuids - server_uuids)
+        skipped_uuids.intersection_update(server_uuids)
+        LOG.debug(
+            "Removing {} deleted entities from {} table".format(
+                len(deleted_uuids), cls.get_cache_type()
+            )
         )
+        for i in range(0, len(deleted_uuids), SQLITE_MAX_VARIABLES):
+            uuids = deleted_uuids[i : i + SQLITE_MAX_VARIABLES]
+            execute_write(cls.delete().where(cls.uuid.in_(uuids)).execute)
+
+    @classmethod
+    def get_sync_marker_name(cls):
+        return "{}{}{}".format(
+            SYNC_MARKER_PREFIX, CACHE.KEY_SEPARATOR, cls.get_cache_type()
+        )
+
+    @classmethod
+    def get_sync_marker(cls):
+        """returns last_update_time(usecs) from which next incremental sync of
+        table lists modified entities"""
+
+        try:
+            entity = VersionTable.get(VersionTable.name == cls.get_sync_marker_name())
+            return int(entity.version)
+
+        except DoesNotExist:
+            return None
+
+    @classmethod
+    def set_sync_marker(cls, update_usecs):
+        """stores last_update_time(usecs) from which next incremental sync of
+        table lists modified entities"""
+
+        marker_name = cls.get_sync_marker_name()
+        execute_write(
+            VersionTable.delete().where(VersionTable.name == marker_name).execute
+        )
+        if update_usecs is not None:
+            execute_write(
+                VersionTable.create, name=marker_name, version=str(update_usecs)
+            )
+
+    @classmethod
+    def get_skipped_uuids_name(cls):
+        return "{}{}skipped".format(cls.get_sync_marker_name(), CACHE.KEY_SEPARATOR)
+
+    @classmethod
+    def get_skipped_uuids(cls):
+        """returns uuids of entities synced in table, that have no entries"""
+
+        try:
+            entity = VersionTable.get(VersionTable.name == cls.get_skipped_uuids_name())
+            return set(json.loads(entity.version))
+
+        except DoesNotExist:
+            return set()
+
+    @classmethod
+    def set_skipped_uuids(cls, uuids):
+        """stores uuids of entities synced in table, that have no entries"""
+
+        name = cls.get_skipped_uuids_name()
+        execute_write(VersionTable.delete().where(VersionTable.name == name).execute)
+        if uuids:
+            execute_write(
+                VersionTable.create, name=name, version=json.dumps(sorted(uuids))
+            )
 
     @classmethod
     def create_entry(cls, name, uuid, **kwargs):
@@ -179,7 +683,7 @@ class AccountCache(CacheTableBase):
     feature_min_version = "2.7.0"
     is_policy_required = False
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     provider_type = CharField()
     state = CharField()
     is_host = BooleanField(default=False)  # Used for Ntnx accounts only
@@ -197,12 +701,6 @@ class AccountCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -374,6 +872,11 @@ class AccountCache(CacheTableBase):
         query_obj["data"] = json.dumps(data)
         return query_obj
 
+    @classmethod
+    def get_read_through_api(cls):
+        client = get_api_client()
+        return client.account
+
     @classmethod
     def add_one(cls, uuid, **kwargs):
         """adds one entry to project table"""
@@ -413,7 +916,7 @@ class ProviderCache(CacheTableBase):
     feature_min_version = "3.7.0"
     is_policy_required = False
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     _type = CharField()
     use_parent_auth = BooleanField(default=False)
     parent_uuid = CharField()
@@ -435,12 +938,6 @@ class ProviderCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -553,7 +1050,7 @@ class ResourceTypeCache(CacheTableBase):
     feature_min_version = "3.7.0"
     is_policy_required = False
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     _type = CharField()
     state = CharField()
     tags = CharField()
@@ -575,12 +1072,6 @@ class ResourceTypeCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -720,9 +1211,9 @@ class AhvClustersCache(CacheTableBase):
     feature_min_version = "3.5.0"
     is_policy_required = False
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     pe_account_uuid = CharField(default="")
-    account_uuid = CharField(default="")
+    account_uuid = CharField(default="", index=True)
     last_update_time = DateTimeField(default=datetime.datetime.now())
 
     def get_detail_dict(self):
@@ -734,12 +1225,6 @@ class AhvClustersCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -906,8 +1391,8 @@ class AhvVpcsCache(CacheTableBase):
     feature_min_version = "3.5.0"
     is_policy_required = False
     name = CharField()
-    uuid = CharField()
-    account_uuid = CharField(default="")
+    uuid = CharField(index=True)
+    account_uuid = CharField(default="", index=True)
     tunnel_name = CharField(default="")
     tunnel_uuid = CharField(default="")
     last_update_time = DateTimeField(default=datetime.datetime.now())
@@ -922,12 +1407,6 @@ class AhvVpcsCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -983,8 +1462,15 @@ class AhvVpcsCache(CacheTableBase):
         AhvVmProvider = cls.get_provider_plugin("AHV_VM")
         AhvObj = AhvVmProvider.get_api_obj()
 
-        # Get all Calm vpcs and Tunnels
-        calm_vpc_entities = client.network_group.list_all()
+        # Get all Calm vpcs and Tunnels, keeping only vpc_uuid -> tunnel_reference map
+        vpc_tunnel_reference_map = {}
+        for calm_vpc in client.network_group.iter_all():
+            calm_vpc_resources = calm_vpc["status"]["resources"]
+            for _vpc_uuid in calm_vpc_resources.get("platform_vpc_uuid_list", []):
+                vpc_tunnel_reference_map.setdefault(
+                    _vpc_uuid, calm_vpc_resources.get("tunnel_reference", {})
+                )
+
         for pc_acc_name, pc_acc_uuid in account_name_uuid_map.items():
             try:
                 res = AhvObj.vpcs(account_uuid=pc_acc_uuid)
@@ -1000,18 +1486,7 @@ class AhvVpcsCache(CacheTableBase):
                 name = entity["status"]["name"]
                 uuid = entity["metadata"]["uuid"]
 
-                # TODO improve this, it shouldn't iterate over these entities every time
-                tunnel_reference = next(
-                    (
-                        calm_vpc["status"]["resources"].get("tunnel_reference", {})
-                        for calm_vpc in calm_vpc_entities
-                        if uuid
-                        in calm_vpc["status"]["resources"].get(
-                            "platform_vpc_uuid_list", []
-                        )
-                    ),
-                    {},
-                )
+                tunnel_reference = vpc_tunnel_reference_map.get(uuid, {})
 
                 cls.create_entry(
                     name=name,
@@ -1084,9 +1559,10 @@ class AhvSubnetsCache(CacheTableBase):
     __cache_type__ = CACHE.ENTITY.AHV_SUBNET
     feature_min_version = "2.7.0"
     is_policy_required = False
+    sync_dependencies = [CACHE.ENTITY.AHV_CLUSTER, CACHE.ENTITY.AHV_VPC]
     name = CharField()
-    uuid = CharField()
-    account_uuid = CharField(default="")
+    uuid = CharField(index=True)
+    account_uuid = CharField(default="", index=True)
     last_update_time = DateTimeField(default=datetime.datetime.now())
     subnet_type = CharField()
     cluster = ForeignKeyField(AhvClustersCache, to_field="uuid", null=True)
@@ -1108,12 +1584,6 @@ class AhvSubnetsCache(CacheTableBase):
             details["vpc_uuid"] = self.vpc.uuid
         return details
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -1180,37 +1650,48 @@ class AhvSubnetsCache(CacheTableBase):
                 continue
 
             for entity in res.get("entities", []):
-                name = entity["status"]["name"]
-                uuid = entity["metadata"]["uuid"]
-                subnet_type = (
-                    entity["status"].get("resources", {}).get("subnet_type", "-")
-                )
-                cluster_uuid = (
-                    entity["status"].get("cluster_reference", {}).get("uuid", "")
-                )
-                vpc_uuid = (
-                    entity["status"]
-                    .get("resources")
-                    .get("vpc_reference", {})
-                    .get("uuid", "")
-                )
-                LOG.debug(
-                    "Cluster: {}, VPC: {} for account: {}, subnet: {}".format(
-                        cluster_uuid, vpc_uuid, e_uuid, uuid
-                    )
-                )
-                cls.create_entry(
-                    name=name,
-                    uuid=uuid,
-                    subnet_type=subnet_type,
-                    account_uuid=e_uuid,
-                    cluster_uuid=cluster_uuid,
-                    vpc_uuid=vpc_uuid,
-                )
+                cls.create_entry(**cls.get_account_entity_entry(entity, e_uuid))
 
         # For older version < 2.9.0
         # Add working for older versions too
 
+    @classmethod
+    def get_account_entity_entry(cls, entity, account_uuid):
+        """returns create_entry kwargs for subnet entity of account"""
+
+        name = entity["status"]["name"]
+        uuid = entity["metadata"]["uuid"]
+        subnet_type = entity["status"].get("resources", {}).get("subnet_type", "-")
+        cluster_uuid = entity["status"].get("cluster_reference", {}).get("uuid", "")
+        vpc_uuid = (
+            entity["status"].get("resources").get("vpc_reference", {}).get("uuid", "")
+        )
+        LOG.debug(
+            "Cluster: {}, VPC: {} for account: {}, subnet: {}".format(
+                cluster_uuid, vpc_uuid, account_uuid, uuid
+            )
+        )
+        return {
+            "name": name,
+            "uuid": uuid,
+            "subnet_type": subnet_type,
+            "account_uuid": account_uuid,
+            "cluster_uuid": cluster_uuid,
+            "vpc_uuid": vpc_uuid,
+        }
+
+    @classmethod
+    def fetch_missing_entity(cls, name=None, uuid=None, **kwargs):
+        """fetches subnet (using name) missing in table from server"""
+
+        if not name:
+            return False
+
+        AhvVmProvider = cls.get_provider_plugin("AHV_VM")
+        return fetch_missing_account_entity(
+            cls, AhvVmProvider.get_api_obj().subnets, name, kwargs.get("account_uuid")
+        )
+
     @classmethod
     def create_entry(cls, name, uuid, **kwargs):
         account_uuid = kwargs.get("account_uuid", "")
@@ -1291,8 +1772,8 @@ class AhvImagesCache(CacheTableBase):
     is_policy_required = False
     name = CharField()
     image_type = CharField()
-    uuid = CharField()
-    account_uuid = CharField()
+    uuid = CharField(index=True)
+    account_uuid = CharField(index=True)
     last_update_time = DateTimeField(default=datetime.datetime.now())
 
     def get_detail_dict(self):
@@ -1304,12 +1785,6 @@ class AhvImagesCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -1367,13 +1842,31 @@ class AhvImagesCache(CacheTableBase):
                 continue
 
             for entity in res.get("entities", []):
-                name = entity["status"]["name"]
-                uuid = entity["metadata"]["uuid"]
-                # TODO add proper validation for karbon images
-                image_type = entity["status"]["resources"].get("image_type", "")
-                cls.create_entry(
-                    name=name, uuid=uuid, image_type=image_type, account_uuid=e_uuid
-                )
+                cls.create_entry(**cls.get_account_entity_entry(entity, e_uuid))
+
+    @classmethod
+    def get_account_entity_entry(cls, entity, account_uuid):
+        """returns create_entry kwargs for image entity of account"""
+
+        # TODO add proper validation for karbon images
+        return {
+            "name": entity["status"]["name"],
+            "uuid": entity["metadata"]["uuid"],
+            "image_type": entity["status"]["resources"].get("image_type", ""),
+            "account_uuid": account_uuid,
+        }
+
+    @classmethod
+    def fetch_missing_entity(cls, name=None, uuid=None, **kwargs):
+        """fetches image (using name) missing in table from server"""
+
+        if not name:
+            return False
+
+        AhvVmProvider = cls.get_provider_plugin("AHV_VM")
+        return fetch_missing_account_entity(
+            cls, AhvVmProvider.get_api_obj().images, name, kwargs.get("account_uuid")
+        )
 
     @classmethod
     def create_entry(cls, name, uuid, **kwargs):
@@ -1436,8 +1929,9 @@ class ProjectCache(CacheTableBase):
     __cache_type__ = CACHE.ENTITY.PROJECT
     feature_min_version = "2.7.0"
     is_policy_required = False
+    sync_dependencies = [CACHE.ENTITY.ACCOUNT]
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     accounts_data = CharField()
     whitelisted_subnets = CharField()
     whitelisted_clusters = CharField()
@@ -1455,12 +1949,6 @@ class ProjectCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -1485,180 +1973,199 @@ class ProjectCache(CacheTableBase):
         click.echo(table)
 
     @classmethod
-    def sync(cls):
-        """sync the table data from server"""
-        # clear old data
-        cls.clear()
+    def fetch_pc_account_entities(cls, AhvObj, entity_type, account_uuid):
+        """returns the entities (subnets, clusters or vpcs) of nutanix_pc account.
+        Failures are logged, and no entities are returned"""
 
-        # update by latest data
-        client = get_api_client()
+        LOG.debug(
+            "Fetching {} for nutanix_pc account_uuid {}".format(
+                entity_type, account_uuid
+            )
+        )
+        try:
+            res = getattr(AhvObj, entity_type)(account_uuid=account_uuid)
+        except Exception as exp:
+            LOG.exception(exp)
+            LOG.warning(
+                "Unable to fetch {} for Nutanix_PC Account(uuid={})".format(
+                    entity_type, account_uuid
+                )
+            )
+            return []
 
-        payload = {"length": 200, "offset": 0, "filter": "state!=DELETED;type!=nutanix"}
-        account_uuid_type_map = client.account.get_uuid_type_map(payload)
+        return res.get("entities", [])
 
-        # store subnets for nutanix_pc accounts in some map, else we had to subnets api
-        # for each project (Speed very low in case of ~1000 projects)
-        ntnx_pc_account_subnet_map = dict()
-        ntnx_pc_account_vpc_map = dict()
-        ntnx_pc_account_cluster_map = dict()
-        ntnx_pc_subnet_cluster_map = dict()
-        ntnx_pc_subnet_vpc_map = dict()
-        for _acct_uuid in account_uuid_type_map.keys():
-            if account_uuid_type_map[_acct_uuid] == "nutanix_pc":
-                ntnx_pc_account_subnet_map[_acct_uuid] = list()
-                ntnx_pc_account_vpc_map[_acct_uuid] = list()
-                ntnx_pc_account_cluster_map[_acct_uuid] = list()
-
-        # Get the subnets for each nutanix_pc account
-        AhvVmProvider = cls.get_provider_plugin("AHV_VM")
-        AhvObj = AhvVmProvider.get_api_obj()
-        for acct_uuid in ntnx_pc_account_subnet_map.keys():
-            LOG.debug(
-                "Fetching subnets for nutanix_pc account_uuid {}".format(acct_uuid)
+    @classmethod
+    def get_pc_infra_index(cls, account_entities):
+        """returns lookup maps of nutanix_pc account infra, built once for all
+        the projects
+
+        Args:
+            account_entities (dict): {(account_uuid, entity_type): entities}
+        """
+
+        index = {
+            "account_subnets": {},
+            "account_clusters": {},
+            "account_vpcs": {},
+            "subnet_cluster": {},
+            "subnet_vpc": {},
+        }
+        for (account_uuid, entity_type), entities in account_entities.items():
+            index["account_{}".format(entity_type)][account_uuid] = set(
+                row["metadata"]["uuid"] for row in entities
             )
-            res = {}
-            try:
-                res = AhvObj.subnets(account_uuid=acct_uuid)
-            except Exception as exp:
-                LOG.exception(exp)
-                LOG.warning(
-                    "Unable to fetch subnets for Nutanix_PC Account(uuid={})".format(
-                        acct_uuid
-                    )
-                )
+            if entity_type != "subnets":
                 continue
 
-            for row in res.get("entities", []):
-                _sub_uuid = row["metadata"]["uuid"]
-                ntnx_pc_account_subnet_map[acct_uuid].append(_sub_uuid)
-                if row["status"]["resources"]["subnet_type"] == "VLAN":
-                    ntnx_pc_subnet_cluster_map[_sub_uuid] = row["status"][
+            for row in entities:
+                subnet_uuid = row["metadata"]["uuid"]
+                subnet_type = row["status"]["resources"]["subnet_type"]
+                if subnet_type == "VLAN":
+                    index["subnet_cluster"][subnet_uuid] = row["status"][
                         "cluster_reference"
                     ]["uuid"]
-                elif row["status"]["resources"]["subnet_type"] == "OVERLAY":
-                    ntnx_pc_subnet_vpc_map[_sub_uuid] = row["status"]["resources"][
+                elif subnet_type == "OVERLAY":
+                    index["subnet_vpc"][subnet_uuid] = row["status"]["resources"][
                         "vpc_reference"
                     ]["uuid"]
 
-            LOG.debug(
-                "Fetching clusters for nutanix_pc account_uuid {}".format(acct_uuid)
-            )
-            res = {}
-            try:
-                res = AhvObj.clusters(account_uuid=acct_uuid)
-            except Exception as exp:
-                LOG.exception(exp)
-                LOG.warning(
-                    "Unable to fetch clusters for Nutanix_PC Account(uuid={})".format(
-                        acct_uuid
-                    )
-                )
-            for row in res.get("entities", []):
-                ntnx_pc_account_cluster_map[acct_uuid].append(row["metadata"]["uuid"])
-
-            LOG.debug("Fetching VPCs for nutanix_pc account_uuid {}".format(acct_uuid))
-            res = {}
-            try:
-                res = AhvObj.vpcs(account_uuid=acct_uuid)
-            except Exception as exp:
-                LOG.exception(exp)
-                LOG.warning(
-                    "Unable to fetch VPCs for Nutanix_PC Account(uuid={})".format(
-                        acct_uuid
-                    )
-                )
-            for row in res.get("entities", []):
-                ntnx_pc_account_vpc_map[acct_uuid].append(row["metadata"]["uuid"])
+        return index
 
-        # Getting projects data
-        res_entities, err = client.project.list_all(ignore_error=True)
-        if err:
-            LOG.exception(err)
+    @classmethod
+    def get_project_refs(cls, entity):
+        """returns the references of project entity used by cache"""
 
-        for entity in res_entities:
-            # populating a map to lookup the account to which a subnet belongs
-            whitelisted_subnets = dict()
-            whitelisted_clusters = dict()
-            whitelisted_vpcs = dict()
+        status_resources = entity["status"]["resources"]
+        spec_resources = entity["spec"].get("resources", {})
+        subnet_refs = spec_resources.get(
+            "external_network_list", []
+        ) + spec_resources.get("subnet_reference_list", [])
 
-            name = entity["status"]["name"]
-            uuid = entity["metadata"]["uuid"]
+        return {
+            "name": entity["status"]["name"],
+            "uuid": entity["metadata"]["uuid"],
+            "account_uuids": [
+                account["uuid"]
+                for account in status_resources.get("account_reference_list", [])
+            ],
+            "subnet_uuids": [subnet["uuid"] for subnet in subnet_refs],
+            "cluster_uuids": [
+                cluster["uuid"]
+                for cluster in status_resources.get("cluster_reference_list", [])
+            ],
+            "vpc_uuids": [
+                vpc["uuid"] for vpc in status_resources.get("vpc_reference_list", [])
+            ],
+        }
 
-            account_list = entity["status"]["resources"].get(
-                "account_reference_list", []
-            )
+    @classmethod
+    def get_project_entry(cls, project_refs, account_uuid_type_map, infra_index):
+        """returns create_entry kwargs of project, using the infra index"""
 
-            cluster_uuids = [
-                cluster["uuid"]
-                for cluster in entity["status"]["resources"].get(
-                    "cluster_reference_list", []
-                )
-            ]
-            vpc_uuids = [
-                vpc["uuid"]
-                for vpc in entity["status"]["resources"].get("vpc_reference_list", [])
-            ]
+        # Ordered sets, as clusters and vpcs of whitelisted subnets are added
+        subnet_uuids = dict.fromkeys(project_refs["subnet_uuids"])
+        cluster_uuids = dict.fromkeys(project_refs["cluster_uuids"])
+        vpc_uuids = dict.fromkeys(project_refs["vpc_uuids"])
 
-            project_subnets_ref_list = entity["spec"].get("resources", {}).get(
-                "external_network_list", []
-            ) + entity["spec"].get("resources", {}).get("subnet_reference_list", [])
-            project_subnet_uuids = [item["uuid"] for item in project_subnets_ref_list]
+        account_map = {}
+        whitelisted_subnets = {}
+        whitelisted_clusters = {}
+        whitelisted_vpcs = {}
+        for account_uuid in project_refs["account_uuids"]:
+            # As projects may have deleted accounts registered
+            if account_uuid not in account_uuid_type_map:
+                continue
 
-            account_map = {}
-            for account in account_list:
-                account_uuid = account["uuid"]
-                # As projects may have deleted accounts registered
-                if account_uuid not in account_uuid_type_map:
-                    continue
+            account_type = account_uuid_type_map[account_uuid]
+            account_map.setdefault(account_type, []).append(account_uuid)
 
-                account_type = account_uuid_type_map[account_uuid]
+            if account_type != "nutanix_pc":
+                continue
 
-                if not account_map.get(account_type):
-                    account_map[account_type] = []
+            account_subnets = infra_index["account_subnets"].get(account_uuid, set())
+            whitelisted_subnets[account_uuid] = [
+                _uuid for _uuid in subnet_uuids if _uuid in account_subnets
+            ]
+            for _subnet_uuid in whitelisted_subnets[account_uuid]:
+                _cluster_uuid = infra_index["subnet_cluster"].get(_subnet_uuid)
+                if _cluster_uuid:
+                    cluster_uuids[_cluster_uuid] = None
+                _vpc_uuid = infra_index["subnet_vpc"].get(_subnet_uuid)
+                if _vpc_uuid:
+                    vpc_uuids[_vpc_uuid] = None
+
+            account_vpcs = infra_index["account_vpcs"].get(account_uuid, set())
+            whitelisted_vpcs[account_uuid] = [
+                _uuid for _uuid in vpc_uuids if _uuid in account_vpcs
+            ]
+            account_clusters = infra_index["account_clusters"].get(account_uuid, set())
+            whitelisted_clusters[account_uuid] = [
+                _uuid for _uuid in cluster_uuids if _uuid in account_clusters
+            ]
 
-                account_map[account_type].append(account_uuid)
+        return {
+            "name": project_refs["name"],
+            "uuid": project_refs["uuid"],
+            "accounts_data": json.dumps(account_map),
+            "whitelisted_subnets": json.dumps(whitelisted_subnets),
+            "whitelisted_clusters": json.dumps(whitelisted_clusters),
+            "whitelisted_vpcs": json.dumps(whitelisted_vpcs),
+        }
 
-                # for PC accounts add subnets to subnet_to_account_map. Will use it to populate whitelisted_subnets
-                if account_type == "nutanix_pc":
-                    whitelisted_subnets[account_uuid] = list(
-                        set(project_subnet_uuids)
-                        & set(ntnx_pc_account_subnet_map[account_uuid])
-                    )
+    @classmethod
+    def sync(cls):
+        """sync the table data from server"""
+        # clear old data
+        cls.clear()
 
-                    for _subnet_uuid in whitelisted_subnets[account_uuid]:
-                        _subnet_cluster_uuid = ntnx_pc_subnet_cluster_map.get(
-                            _subnet_uuid
-                        )
-                        if (
-                            _subnet_cluster_uuid
-                            and _subnet_cluster_uuid not in cluster_uuids
-                        ):
-                            cluster_uuids.append(_subnet_cluster_uuid)
-                        _subnet_vpc_uuid = ntnx_pc_subnet_vpc_map.get(_subnet_uuid)
-                        if _subnet_vpc_uuid and _subnet_vpc_uuid not in vpc_uuids:
-                            vpc_uuids.append(_subnet_vpc_uuid)
-
-                    whitelisted_vpcs[account_uuid] = list(
-                        set(vpc_uuids) & set(ntnx_pc_account_vpc_map[account_uuid])
-                    )
+        # update by latest data
+        client = get_api_client()
 
-                    whitelisted_clusters[account_uuid] = list(
-                        set(cluster_uuids)
-                        & set(ntnx_pc_account_cluster_map[account_uuid])
-                    )
+        payload = {"length": 200, "offset": 0, "filter": "state!=DELETED;type!=nutanix"}
+        account_uuid_type_map = client.account.get_uuid_type_map(payload)
+        pc_account_uuids = [
+            _uuid
+            for _uuid, _type in account_uuid_type_map.items()
+            if _type == "nutanix_pc"
+        ]
 
-            accounts_data = json.dumps(account_map)
+        # store infra of nutanix_pc accounts in some map, else we had to call
+        # subnets api for each project (Speed very low in case of ~1000 projects)
+        AhvVmProvider = cls.get_provider_plugin("AHV_VM")
+        AhvObj = AhvVmProvider.get_api_obj()
+        infra_requests = [
+            (acct_uuid, entity_type)
+            for acct_uuid in pc_account_uuids
+            for entity_type in ["subnets", "clusters", "vpcs"]
+        ]
+        concurrency = get_context().get_connection_config()["concurrency"]
+        max_workers = max(1, min(int(concurrency), len(infra_requests)))
+
+        # Infra of accounts is fetched in background, while projects are listed.
+        # Only the references of projects are kept, till the infra is fetched.
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            infra_futures = {
+                (acct_uuid, entity_type): executor.submit(
+                    cls.fetch_pc_account_entities, AhvObj, entity_type, acct_uuid
+                )
+                for acct_uuid, entity_type in infra_requests
+            }
+            projects = [
+                cls.get_project_refs(entity) for entity in client.project.iter_all()
+            ]
+            infra_index = cls.get_pc_infra_index(
+                {
+                    infra_request: future.result()
+                    for infra_request, future in infra_futures.items()
+                }
+            )
 
-            whitelisted_subnets = json.dumps(whitelisted_subnets)
-            whitelisted_clusters = json.dumps(whitelisted_clusters)
-            whitelisted_vpcs = json.dumps(whitelisted_vpcs)
+        for project_refs in projects:
             cls.create_entry(
-                name=name,
-                uuid=uuid,
-                accounts_data=accounts_data,
-                whitelisted_subnets=whitelisted_subnets,
-                whitelisted_clusters=whitelisted_clusters,
-                whitelisted_vpcs=whitelisted_vpcs,
+                **cls.get_project_entry(
+                    project_refs, account_uuid_type_map, infra_index
+                )
             )
 
     @classmethod
@@ -1855,6 +2362,11 @@ class ProjectCache(CacheTableBase):
             "whitelisted_vpcs": whitelisted_vpcs,
         }
 
+    @classmethod
+    def get_read_through_api(cls):
+        client = get_api_client()
+        return client.project
+
     @classmethod
     def add_one(cls, uuid, **kwargs):
         """adds one entry to project table"""
@@ -1893,9 +2405,10 @@ class EnvironmentCache(CacheTableBase):
     __cache_type__ = "environment"
     feature_min_version = "2.7.0"
     is_policy_required = False
+    sync_dependencies = [CACHE.ENTITY.ACCOUNT]
     name = CharField()
-    uuid = CharField()
-    project_uuid = CharField()
+    uuid = CharField(index=True)
+    project_uuid = CharField(index=True)
     accounts_data = CharField()
     last_update_time = DateTimeField(default=datetime.datetime.now())
 
@@ -1908,12 +2421,6 @@ class EnvironmentCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -1938,100 +2445,184 @@ class EnvironmentCache(CacheTableBase):
             )
         click.echo(table)
 
-    @classmethod
-    def sync(cls):
-        """sync the table data from server"""
-        # clear old data
-        cls.clear()
+    # Max subnet uuids in the filter of a subnets list call
+    subnet_batch_size = 100
 
-        # update by latest data
+    @classmethod
+    def get_sync_list_api(cls):
         client = get_api_client()
+        return client.environment, {}
 
-        env_list = client.environment.list_all()
-        for entity in env_list:
-            name = entity["status"]["name"]
-            uuid = entity["metadata"]["uuid"]
-            project_uuid = (
-                entity["metadata"].get("project_reference", {}).get("uuid", "")
-            )
+    @classmethod
+    def get_infra_subnet_uuids(cls, entities):
+        """returns {account_uuid: subnet uuids} of the nutanix_pc infra of
+        environments, without duplicates"""
 
-            # ignore environments that are not associated to a project
-            if not project_uuid:
-                continue
+        account_subnet_uuids = {}
+        for entity in entities:
+            for infra in entity["status"]["resources"].get("infra_inclusion_list", []):
+                if infra["type"] != "nutanix_pc":
+                    continue
 
-            infra_inclusion_list = entity["status"]["resources"].get(
-                "infra_inclusion_list", []
-            )
-            account_map = {}
-            for infra in infra_inclusion_list:
-                account_type = infra["type"]
-                account_uuid = infra["account_reference"]["uuid"]
-                account_data = dict(
-                    uuid=account_uuid,
-                    name=infra["account_reference"]["name"],
+                subnet_uuids = account_subnet_uuids.setdefault(
+                    infra["account_reference"]["uuid"], {}
                 )
+                for row in infra.get("subnet_references", []):
+                    subnet_uuids[row["uuid"]] = None
 
-                if account_type == "nutanix_pc":
-                    AhvVmProvider = cls.get_provider_plugin("AHV_VM")
-                    AhvObj = AhvVmProvider.get_api_obj()
-                    subnet_refs = infra.get("subnet_references", [])
-                    account_data["subnet_uuids"] = [row["uuid"] for row in subnet_refs]
-                    cluster_refs = infra.get("cluster_references", [])
-                    account_data["cluster_uuids"] = [
-                        row["uuid"] for row in cluster_refs
-                    ]
-                    vpc_refs = infra.get("vpc_references", [])
-                    account_data["vpc_uuids"] = [row["uuid"] for row in vpc_refs]
+        return {
+            account_uuid: list(subnet_uuids)
+            for account_uuid, subnet_uuids in account_subnet_uuids.items()
+        }
 
-                    # It may happen, that cluster reference is not present in migrated environment
-                    res = {}
-                    filter_query = "_entity_id_=={}".format(
-                        "|".join(account_data["subnet_uuids"])
-                    )
-                    try:
-                        res = AhvObj.subnets(
-                            account_uuid=account_uuid, filter_query=filter_query
-                        )
-                    except Exception as exp:
-                        LOG.exception(exp)
-                        LOG.warning(
-                            "Unable to fetch subnets for Nutanix_PC Account(uuid={})".format(
-                                account_uuid
-                            )
+    @classmethod
+    def fetch_subnet_index(cls, account_subnet_uuids):
+        """returns {account_uuid: {subnet_uuid: subnet}} of given subnets, where
+        subnet has the cluster_uuid or vpc_uuid of subnet. Subnets are fetched in
+        batches, concurrently. Subnets of the batches that could not be fetched
+        are None in the index.
+        """
+
+        subnet_index = {account_uuid: {} for account_uuid in account_subnet_uuids}
+        batches = [
+            (account_uuid, subnet_uuids[i : i + cls.subnet_batch_size])
+            for account_uuid, subnet_uuids in account_subnet_uuids.items()
+            for i in range(0, len(subnet_uuids), cls.subnet_batch_size)
+        ]
+        if not batches:
+            return subnet_index
+
+        AhvVmProvider = cls.get_provider_plugin("AHV_VM")
+        AhvObj = AhvVmProvider.get_api_obj()
+
+        def fetch_subnets(account_uuid, subnet_uuids):
+            filter_query = "_entity_id_=={}".format("|".join(subnet_uuids))
+            return AhvObj.subnets(account_uuid=account_uuid, filter_query=filter_query)
+
+        concurrency = get_context().get_connection_config()["concurrency"]
+        max_workers = max(1, min(int(concurrency), len(batches)))
+
+        LOG.debug(
+            "Fetching subnets of {} nutanix_pc accounts in {} batches".format(
+                len(account_subnet_uuids), len(batches)
+            )
+        )
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                (account_uuid, executor.submit(fetch_subnets, account_uuid, batch))
+                for account_uuid, batch in batches
+            ]
+            for (account_uuid, batch), (_, future) in zip(batches, futures):
+                try:
+                    res = future.result()
+                except Exception as exp:
+                    LOG.exception(exp)
+                    LOG.warning(
+                        "Unable to fetch {} subnets for Nutanix_PC Account(uuid={})".format(
+                            len(batch), account_uuid
                         )
-                        continue
-                    for row in res.get("entities", []):
-                        _subnet_type = row["status"]["resources"]["subnet_type"]
-                        if (
-                            _subnet_type == "VLAN"
-                            and row["status"]["cluster_reference"]["uuid"]
-                            not in account_data["cluster_uuids"]
-                        ):
-                            account_data["cluster_uuids"].append(
-                                row["status"]["cluster_reference"]["uuid"]
-                            )
-                        elif (
-                            _subnet_type == "OVERLAY"
-                            and row["status"]["resources"]["vpc_reference"]["uuid"]
-                            not in account_data["vpc_uuids"]
-                        ):
-                            account_data["vpc_uuids"].append(
-                                row["status"]["resources"]["vpc_reference"]["uuid"]
-                            )
+                    )
+                    for subnet_uuid in batch:
+                        subnet_index[account_uuid][subnet_uuid] = None
+                    continue
 
-                if not account_map.get(account_type):
-                    account_map[account_type] = []
+                for row in res.get("entities", []):
+                    _subnet_type = row["status"]["resources"]["subnet_type"]
+                    subnet = {}
+                    if _subnet_type == "VLAN":
+                        subnet["cluster_uuid"] = row["status"]["cluster_reference"][
+                            "uuid"
+                        ]
+                    elif _subnet_type == "OVERLAY":
+                        subnet["vpc_uuid"] = row["status"]["resources"][
+                            "vpc_reference"
+                        ]["uuid"]
+                    subnet_index[account_uuid][row["metadata"]["uuid"]] = subnet
+
+        return subnet_index
+
+    @classmethod
+    def prepare_sync_entries(cls, entities):
+        """Subnets of all the environments are fetched together, instead of
+        once per environment"""
+
+        entities = list(entities)
+        subnet_index = cls.fetch_subnet_index(cls.get_infra_subnet_uuids(entities))
+        for entity in entities:
+            yield entity, {"subnet_index": subnet_index}
 
-                account_map[account_type].append(account_data)
+    @classmethod
+    def get_sync_entries(cls, entity, subnet_index=None):
+        """returns create_entry kwargs of environment. Subnets are looked up in
+        subnet_index, fetched for the environment if not given"""
 
-            accounts_data = json.dumps(account_map)
-            cls.create_entry(
-                name=name,
-                uuid=uuid,
-                accounts_data=accounts_data,
-                project_uuid=project_uuid,
+        name = entity["status"]["name"]
+        uuid = entity["metadata"]["uuid"]
+        project_uuid = entity["metadata"].get("project_reference", {}).get("uuid", "")
+
+        # ignore environments that are not associated to a project
+        if not project_uuid:
+            return []
+
+        if subnet_index is None:
+            subnet_index = cls.fetch_subnet_index(cls.get_infra_subnet_uuids([entity]))
+
+        infra_inclusion_list = entity["status"]["resources"].get(
+            "infra_inclusion_list", []
+        )
+        account_map = {}
+        for infra in infra_inclusion_list:
+            account_type = infra["type"]
+            account_uuid = infra["account_reference"]["uuid"]
+            account_data = dict(
+                uuid=account_uuid,
+                name=infra["account_reference"]["name"],
             )
 
+            if account_type == "nutanix_pc":
+                subnet_refs = infra.get("subnet_references", [])
+                account_data["subnet_uuids"] = [row["uuid"] for row in subnet_refs]
+                cluster_refs = infra.get("cluster_references", [])
+                account_data["cluster_uuids"] = [row["uuid"] for row in cluster_refs]
+                vpc_refs = infra.get("vpc_references", [])
+                account_data["vpc_uuids"] = [row["uuid"] for row in vpc_refs]
+
+                # Some subnets of environment could not be fetched
+                account_subnets = subnet_index.get(account_uuid, {})
+                if any(
+                    account_subnets.get(_subnet_uuid, {}) is None
+                    for _subnet_uuid in account_data["subnet_uuids"]
+                ):
+                    continue
+
+                # It may happen, that cluster reference is not present in migrated environment
+                for _subnet_uuid in account_data["subnet_uuids"]:
+                    subnet = account_subnets.get(_subnet_uuid, {})
+                    _cluster_uuid = subnet.get("cluster_uuid")
+                    _vpc_uuid = subnet.get("vpc_uuid")
+                    if (
+                        _cluster_uuid
+                        and _cluster_uuid not in account_data["cluster_uuids"]
+                    ):
+                        account_data["cluster_uuids"].append(_cluster_uuid)
+                    elif _vpc_uuid and _vpc_uuid not in account_data["vpc_uuids"]:
+                        account_data["vpc_uuids"].append(_vpc_uuid)
+
+            if not account_map.get(account_type):
+                account_map[account_type] = []
+
+            account_map[account_type].append(account_data)
+
+        accounts_data = json.dumps(account_map)
+        return [
+            {
+                "name": name,
+                "uuid": uuid,
+                "accounts_data": accounts_data,
+                "project_uuid": project_uuid,
+            }
+        ]
+
     @classmethod
     def create_entry(cls, name, uuid, **kwargs):
         super().create(
@@ -2185,7 +2776,7 @@ class UsersCache(CacheTableBase):
     feature_min_version = "2.7.0"
     is_policy_required = False
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     display_name = CharField()
     directory = CharField()
     last_update_time = DateTimeField(default=datetime.datetime.now())
@@ -2199,12 +2790,6 @@ class UsersCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -2252,35 +2837,34 @@ class UsersCache(CacheTableBase):
         )
 
     @classmethod
-    def sync(cls):
-        """sync the table from server"""
-
-        # clear old data
-        cls.clear()
-
+    def get_sync_list_api(cls):
         client = get_api_client()
-        entities = client.user.list_all(api_limit=500)
+        return client.user, {"length": 500}
 
-        for entity in entities:
+    @classmethod
+    def get_sync_entries(cls, entity):
+        name = entity["status"]["name"]
+        uuid = entity["metadata"]["uuid"]
+        display_name = entity["status"]["resources"].get("display_name") or ""
+        directory_service_user = (
+            entity["status"]["resources"].get("directory_service_user") or dict()
+        )
+        directory_service_ref = (
+            directory_service_user.get("directory_service_reference") or dict()
+        )
+        directory_service_name = directory_service_ref.get("name", "LOCAL")
 
-            name = entity["status"]["name"]
-            uuid = entity["metadata"]["uuid"]
-            display_name = entity["status"]["resources"].get("display_name") or ""
-            directory_service_user = (
-                entity["status"]["resources"].get("directory_service_user") or dict()
-            )
-            directory_service_ref = (
-                directory_service_user.get("directory_service_reference") or dict()
-            )
-            directory_service_name = directory_service_ref.get("name", "LOCAL")
+        if not directory_service_name:
+            return []
 
-            if directory_service_name:
-                cls.create_entry(
-                    name=name,
-                    uuid=uuid,
-                    display_name=display_name,
-                    directory=directory_service_name,
-                )
+        return [
+            {
+                "name": name,
+                "uuid": uuid,
+                "display_name": display_name,
+                "directory": directory_service_name,
+            }
+        ]
 
     @classmethod
     def get_entity_data(cls, name, **kwargs):
@@ -2377,7 +2961,7 @@ class RolesCache(CacheTableBase):
     feature_min_version = "2.7.0"
     is_policy_required = False
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     last_update_time = DateTimeField(default=datetime.datetime.now())
 
     def get_detail_dict(self, *args, **kwargs):
@@ -2387,12 +2971,6 @@ class RolesCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -2475,6 +3053,11 @@ class RolesCache(CacheTableBase):
 
         return {"name": name, "uuid": uuid}
 
+    @classmethod
+    def get_read_through_api(cls):
+        client = get_api_client()
+        return client.role
+
     @classmethod
     def add_one(cls, uuid, **kwargs):
         """adds one entry to env table"""
@@ -2499,7 +3082,7 @@ class DirectoryServiceCache(CacheTableBase):
     feature_min_version = "2.7.0"
     is_policy_required = False
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     last_update_time = DateTimeField(default=datetime.datetime.now())
 
     def get_detail_dict(self, *args, **kwargs):
@@ -2509,12 +3092,6 @@ class DirectoryServiceCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -2592,7 +3169,7 @@ class UserGroupCache(CacheTableBase):
     feature_min_version = "2.7.0"
     is_policy_required = False
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     display_name = CharField()
     directory = CharField()
     last_update_time = DateTimeField(default=datetime.datetime.now())
@@ -2606,12 +3183,6 @@ class UserGroupCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -2801,7 +3372,7 @@ class AhvNetworkFunctionChain(CacheTableBase):
     feature_min_version = "2.7.0"
     is_policy_required = False
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     last_update_time = DateTimeField(default=datetime.datetime.now())
 
     def get_detail_dict(self, *args, **kwargs):
@@ -2811,12 +3382,6 @@ class AhvNetworkFunctionChain(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -2882,7 +3447,7 @@ class AppProtectionPolicyCache(CacheTableBase):
     feature_min_version = "3.3.0"
     is_policy_required = False
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     rule_name = CharField()
     rule_uuid = CharField()
     rule_expiry = IntegerField()
@@ -2902,12 +3467,6 @@ class AppProtectionPolicyCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -2947,49 +3506,49 @@ class AppProtectionPolicyCache(CacheTableBase):
         click.echo(table)
 
     @classmethod
-    def sync(cls):
-        # clear old data
-        cls.clear()
-
-        # update by latest data
+    def get_sync_list_api(cls):
         client = get_api_client()
         Obj = get_resource_api(
             "app_protection_policies", client.connection, calm_api=True
         )
-        entities = Obj.list_all()
+        return Obj, {}
 
-        for entity in entities:
-            name = entity["status"]["name"]
-            uuid = entity["metadata"]["uuid"]
-            project_reference = entity["metadata"].get("project_reference", {})
-            for rule in entity["status"]["resources"]["app_protection_rule_list"]:
-                expiry = 0
-                rule_type = ""
-                if rule.get("remote_snapshot_retention_policy", {}):
-                    rule_type = "Remote"
-                    expiry = (
-                        rule["remote_snapshot_retention_policy"]
-                        .get("snapshot_expiry_policy", {})
-                        .get("multiple", 0)
-                    )
-                elif rule.get("local_snapshot_retention_policy", {}):
-                    rule_type = "Local"
-                    expiry = (
-                        rule["local_snapshot_retention_policy"]
-                        .get("snapshot_expiry_policy", {})
-                        .get("multiple", 0)
-                    )
-                rule_name = rule["name"]
-                rule_uuid = rule["uuid"]
-                cls.create_entry(
-                    name=name,
-                    uuid=uuid,
-                    rule_name=rule_name,
-                    rule_uuid=rule_uuid,
-                    project_name=project_reference.get("name", ""),
-                    rule_expiry=expiry,
-                    rule_type=rule_type,
+    @classmethod
+    def get_sync_entries(cls, entity):
+        name = entity["status"]["name"]
+        uuid = entity["metadata"]["uuid"]
+        project_reference = entity["metadata"].get("project_reference", {})
+        entries = []
+        for rule in entity["status"]["resources"]["app_protection_rule_list"]:
+            expiry = 0
+            rule_type = ""
+            if rule.get("remote_snapshot_retention_policy", {}):
+                rule_type = "Remote"
+                expiry = (
+                    rule["remote_snapshot_retention_policy"]
+                    .get("snapshot_expiry_policy", {})
+                    .get("multiple", 0)
+                )
+            elif rule.get("local_snapshot_retention_policy", {}):
+                rule_type = "Local"
+                expiry = (
+                    rule["local_snapshot_retention_policy"]
+                    .get("snapshot_expiry_policy", {})
+                    .get("multiple", 0)
                 )
+            entries.append(
+                {
+                    "name": name,
+                    "uuid": uuid,
+                    "rule_name": rule["name"],
+                    "rule_uuid": rule["uuid"],
+                    "project_name": project_reference.get("name", ""),
+                    "rule_expiry": expiry,
+                    "rule_type": rule_type,
+                }
+            )
+
+        return entries
 
     @classmethod
     def create_entry(cls, name, uuid, **kwargs):
@@ -3044,7 +3603,7 @@ class PolicyEventCache(CacheTableBase):
     is_approval_policy_required = True
     entity_type = CharField()
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     last_update_time = DateTimeField(default=datetime.datetime.now())
 
     def get_detail_dict(self, *args, **kwargs):
@@ -3055,12 +3614,6 @@ class PolicyEventCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -3167,12 +3720,6 @@ class PolicyAttributesCache(CacheTableBase):
             "jsonpath": self.jsonpath,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -3267,7 +3814,7 @@ class PolicyActionTypeCache(CacheTableBase):
     is_policy_required = True
     is_approval_policy_required = True
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     last_update_time = DateTimeField(default=datetime.datetime.now())
 
     def get_detail_dict(self, *args, **kwargs):
@@ -3277,12 +3824,6 @@ class PolicyActionTypeCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -3366,7 +3907,7 @@ class NDB_DatabaseCache(CacheTableBase):
     feature_min_version = "3.7.0"
     is_policy_required = True
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     account_name = CharField()
     _type = CharField()
     status = CharField()
@@ -3388,12 +3929,6 @@ class NDB_DatabaseCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -3549,7 +4084,7 @@ class NDB_ProfileCache(CacheTableBase):
     feature_min_version = "3.7.0"
     is_policy_required = True
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     account_name = CharField()
     _type = CharField()
     status = CharField()
@@ -3571,12 +4106,6 @@ class NDB_ProfileCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -3755,7 +4284,7 @@ class NDB_SLACache(CacheTableBase):
     feature_min_version = "3.7.0"
     is_policy_required = True
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     account_name = CharField()
     continuous_retention = IntegerField()
     daily_retention = IntegerField()
@@ -3781,12 +4310,6 @@ class NDB_SLACache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -3946,7 +4469,7 @@ class NDB_ClusterCache(CacheTableBase):
     feature_min_version = "3.7.0"
     is_policy_required = True
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     account_name = CharField()
     status = CharField()
     healthy = BooleanField()
@@ -3968,12 +4491,6 @@ class NDB_ClusterCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -4123,7 +4640,7 @@ class NDB_TimeMachineCache(CacheTableBase):
     feature_min_version = "3.7.0"
     is_policy_required = True
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     account_name = CharField()
     status = CharField()
     _type = CharField()
@@ -4145,12 +4662,6 @@ class NDB_TimeMachineCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -4306,8 +4817,9 @@ class NDB_SnapshotCache(CacheTableBase):
     __cache_type__ = CACHE.NDB + CACHE.KEY_SEPARATOR + CACHE.NDB_ENTITY.SNAPSHOT
     feature_min_version = "3.7.0"
     is_policy_required = True
+    sync_dependencies = [NDB_TimeMachineCache.__cache_type__]
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     account_name = CharField()
     status = CharField()
     _type = CharField()
@@ -4331,12 +4843,6 @@ class NDB_SnapshotCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -4504,7 +5010,7 @@ class NDB_TagCache(CacheTableBase):
     feature_min_version = "3.7.0"
     is_policy_required = True
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     account_name = CharField()
     status = CharField()
     entity_type = CharField()
@@ -4524,12 +5030,6 @@ class NDB_TagCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
     @classmethod
     def show_data(cls):
         """display stored data in table"""
@@ -4683,6 +5183,37 @@ class VersionTable(BaseModel):
         return {"name": self.name, "version": self.version}
 
 
+def get_entity_update_usecs(entity):
+    """returns last_update_time of entity in microseconds"""
+
+    last_update_time = entity["metadata"].get("last_update_time")
+    if not last_update_time:
+        return 0
+
+    # Calm apis return microseconds, nutanix apis return iso8601 timestamps
+    if str(last_update_time).isdigit():
+        return int(last_update_time)
+
+    return int(arrow.get(last_update_time).float_timestamp * 1000000)
+
+
+def get_sync_start_usecs():
+    """returns time (usecs) at start of sync, minus allowed clock skew"""
+
+    return int(time.time() * 1000000) - SYNC_MARKER_SKEW_USECS
+
+
+def get_new_sync_marker(max_update_usecs, sync_start_usecs):
+    """returns sync marker to store after listing entities. Entities modified
+    while listing can move to already listed pages, so marker is capped at
+    sync start, and next sync lists them again"""
+
+    if max_update_usecs is None:
+        return None
+
+    return min(max_update_usecs, sync_start_usecs)
+
+
 def highlight_text(text, **kwargs):
     """Highlight text in our standard format"""
     return click.style("{}".format(text), fg="blue", bold=False, **kwargs)
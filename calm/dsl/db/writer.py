@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from calm.dsl.log import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+
+class DatabaseWriter:
+    """Executes the db writes issued by multiple threads on a single writer thread,
+    so that only one sqlite connection writes to the db at a time.
+
+    Usage:
+        with DatabaseWriter(dsl_database):
+            # writes done using execute_write() are funnelled to writer thread
+    """
+
+    _active_writer = None
+
+    def __init__(self, database):
+        self.database = database
+        self._executor = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        if DatabaseWriter._active_writer:
+            raise Exception("Database writer is already active")
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="dsl-db-writer"
+        )
+        self._thread = self._executor.submit(threading.current_thread).result()
+        DatabaseWriter._active_writer = self
+        LOG.debug("Database writer started")
+
+    def stop(self):
+        DatabaseWriter._active_writer = None
+
+        # Close the connection opened by writer thread
+        self._executor.submit(self._close_connection).result()
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        self._thread = None
+        LOG.debug("Database writer stopped")
+
+    def _close_connection(self):
+        if not self.database.is_closed():
+            self.database.close()
+
+    def is_writer_thread(self):
+        return threading.current_thread() is self._thread
+
+    def execute(self, func, *args, **kwargs):
+        """executes func on writer thread and returns its result"""
+
+        if self.is_writer_thread():
+            return func(*args, **kwargs)
+
+        return self._executor.submit(func, *args, **kwargs).result()
+
+    @classmethod
+    def get_active_writer(cls):
+        return cls._active_writer
+
+
+def execute_write(func, *args, **kwargs):
+    """executes db write func, through the active writer if any"""
+
+    writer = DatabaseWriter.get_active_writer()
+    if writer:
+        return writer.execute(func, *args, **kwargs)
+
+    return func(*args, **kwargs)
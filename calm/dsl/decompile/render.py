@@ -1,12 +1,64 @@
-from jinja2 import Environment, PackageLoader
+import os
+
+from jinja2 import Environment, PackageLoader, FileSystemBytecodeCache
+
+from calm.dsl.log import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+TEMPLATE_CACHE_DIR = "decompile_templates"
+
+_ENV = None
+
+
+def get_bytecode_cache():
+    """returns cache of compiled templates in local dir, None if local dir
+    is not configured"""
+
+    from calm.dsl.config import get_context
+
+    try:
+        init_config = get_context().get_init_config()
+        cache_dir = os.path.join(
+            init_config["LOCAL_DIR"]["location"], TEMPLATE_CACHE_DIR
+        )
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    except (Exception, SystemExit):
+        LOG.debug("Local dir not found, compiled templates will not be cached")
+        return None
+
+    # Entries are keyed by template source checksum, so they are never stale
+    return FileSystemBytecodeCache(cache_dir)
+
+
+def get_env():
+    """returns jinja2 environment of decompile templates, created once"""
+
+    global _ENV
+    if _ENV is None:
+        # Templates are shipped with package, so compiled templates are cached
+        # for the process, without checking the template files for changes
+        _ENV = Environment(
+            loader=PackageLoader(__name__, "schemas"),
+            bytecode_cache=get_bytecode_cache(),
+            auto_reload=False,
+            cache_size=-1,
+        )
+
+    return _ENV
 
 
 def get_template(schema_file):
 
-    loader = PackageLoader(__name__, "schemas")
-    env = Environment(loader=loader)
-    template = env.get_template(schema_file)
-    return template
+    return get_env().get_template(schema_file)
+
+
+def precompile_templates():
+    """compiles all the templates, storing them in the local dir cache"""
+
+    env = get_env()
+    for schema_file in env.list_templates(extensions=["jinja2"]):
+        env.get_template(schema_file)
 
 
 def render_template(schema_file, obj):
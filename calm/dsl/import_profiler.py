@@ -0,0 +1,111 @@
+import sys
+import time
+import atexit
+import importlib.abc
+
+# Only stdlib modules are imported at module level, as profiler is started
+# before importing any other module
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wraps module loader to record time taken to execute the module"""
+
+    def __init__(self, loader, fullname):
+        self._loader = loader
+        self._fullname = fullname
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        ImportProfiler.enter(self._fullname)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            ImportProfiler.exit(self._fullname)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _TimedFinder(importlib.abc.MetaPathFinder):
+    """Finds the module spec using other finders, and wraps its loader"""
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, fullname)
+            return spec
+
+        return None
+
+
+class ImportProfiler:
+    """Records import time of each module (similar to `python -X importtime`)
+    and displays the slowest ones at exit"""
+
+    start_time = None
+    # {module: [self time, cumulative time]}
+    timings = {}
+    _stack = []
+    _finder = None
+
+    @classmethod
+    def start(cls):
+        cls.start_time = time.perf_counter()
+        cls._finder = _TimedFinder()
+        sys.meta_path.insert(0, cls._finder)
+        atexit.register(cls.show)
+
+    @classmethod
+    def enter(cls, fullname):
+        cls._stack.append([fullname, time.perf_counter(), 0.0])
+
+    @classmethod
+    def exit(cls, fullname):
+        _, start, nested_time = cls._stack.pop()
+        cumulative_time = time.perf_counter() - start
+        cls.timings[fullname] = [cumulative_time - nested_time, cumulative_time]
+        if cls._stack:
+            cls._stack[-1][2] += cumulative_time
+
+    @classmethod
+    def show(cls, limit=30):
+        """displays the modules taking most time to import"""
+
+        import click
+        from prettytable import PrettyTable
+
+        if cls._finder in sys.meta_path:
+            sys.meta_path.remove(cls._finder)
+
+        table = PrettyTable()
+        table.field_names = ["MODULE", "SELF (ms)", "CUMULATIVE (ms)"]
+        table.align["MODULE"] = "l"
+        for module, (self_time, cumulative_time) in sorted(
+            cls.timings.items(), key=lambda item: item[1][1], reverse=True
+        )[:limit]:
+            table.add_row(
+                [
+                    module,
+                    "{:.1f}".format(self_time * 1000),
+                    "{:.1f}".format(cumulative_time * 1000),
+                ]
+            )
+
+        click.echo(table, err=True)
+        click.echo(
+            "{} modules imported. Total import time: {:.1f} ms, total run time: {:.1f} ms".format(
+                len(cls.timings),
+                sum(_t[0] for _t in cls.timings.values()) * 1000,
+                (time.perf_counter() - cls.start_time) * 1000,
+            ),
+            err=True,
+        )
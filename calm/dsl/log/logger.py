@@ -1,5 +1,4 @@
 import logging
-import inspect
 
 from colorlog import ColoredFormatter
 import time
@@ -68,13 +67,15 @@ class CustomLogging:
 
     @staticmethod
     def __add_caller_info(msg):
-        stack = inspect.stack()
+        # Frame of the caller of log method. sys._getframe is used, as
+        # inspect.stack() builds frame info (reading source files) for all frames
+        frame = sys._getframe(2)
 
-        # filename = stack[2][1]
-        # func = stack[2][3]
-        ln = stack[2][2]
+        ln = frame.f_lineno
         if CustomLogging.IS_RP_ENABLED:
-            ln = "{}-{}:{}".format(stack[2][1], stack[2][3], stack[2][2])
+            ln = "{}-{}:{}".format(
+                frame.f_code.co_filename, frame.f_code.co_name, frame.f_lineno
+            )
 
         return ":{}] {}".format(ln, msg)
 
@@ -87,7 +88,9 @@ class CustomLogging:
         cls._SHOW_TRACE = True
 
     def get_logger(self):
-        self.set_logger_level(self._VERBOSE_LEVEL)
+        # setLevel clears the level cache of all loggers, so avoid redundant calls
+        if self._logger.level != self._VERBOSE_LEVEL:
+            self.set_logger_level(self._VERBOSE_LEVEL)
         self.show_trace = self._SHOW_TRACE
         return self._logger
 
@@ -110,6 +113,8 @@ class CustomLogging:
             None
         """
         logger = self.get_logger()
+        if not logger.isEnabledFor(logging.INFO):
+            return
 
         if not nl:
             for handler in logger.handlers:
@@ -133,6 +138,9 @@ class CustomLogging:
         """
 
         logger = self.get_logger()
+        if not logger.isEnabledFor(logging.WARNING):
+            return None
+
         return logger.warning(self.__add_caller_info(msg), *args, **kwargs)
 
     def error(self, msg, *args, **kwargs):
@@ -147,6 +155,9 @@ class CustomLogging:
         """
 
         logger = self.get_logger()
+        if not logger.isEnabledFor(logging.ERROR):
+            return None
+
         if self.show_trace:
             kwargs["stack_info"] = sys.exc_info()
         return logger.error(self.__add_caller_info(msg), *args, **kwargs)
@@ -163,6 +174,9 @@ class CustomLogging:
         """
 
         logger = self.get_logger()
+        if not logger.isEnabledFor(logging.ERROR):
+            return None
+
         exc_info = False
         if self.show_trace:
             exc_info = True
@@ -182,6 +196,9 @@ class CustomLogging:
         """
 
         logger = self.get_logger()
+        if not logger.isEnabledFor(logging.CRITICAL):
+            return None
+
         if self.show_trace:
             kwargs["stack_info"] = sys.exc_info()
         return logger.critical(self.__add_caller_info(msg), *args, **kwargs)
@@ -198,6 +215,9 @@ class CustomLogging:
         """
 
         logger = self.get_logger()
+        if not logger.isEnabledFor(logging.DEBUG):
+            return None
+
         return logger.debug(self.__add_caller_info(msg), *args, **kwargs)
 
     def __addCustomFormatter(self, ch):
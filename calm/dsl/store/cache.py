@@ -6,9 +6,13 @@ from distutils.version import LooseVersion as LV
 
 from calm.dsl.config import get_context
 from .version import Version
+from .cache_sync import CacheSyncScheduler
+from .lookup_cache import LookupCache
+from . import cache_snapshot
 from calm.dsl.db import get_db_handle, init_db_handle
 from calm.dsl.log import get_logging_handle
 from calm.dsl.api import get_client_handle_obj
+from calm.dsl.tools import DependencyTracker
 
 LOG = get_logging_handle(__name__)
 
@@ -16,6 +20,11 @@ LOG = get_logging_handle(__name__)
 class Cache:
     """Cache class Implementation"""
 
+    # Results of entity lookups, invalidated on writes to cache tables
+    lookup_cache = LookupCache()
+    # Fetch entities missing in cache tables from server, on lookup
+    read_through = True
+
     @classmethod
     def get_cache_tables(cls, sync_version=False):
         """returns tables used for cache purpose"""
@@ -69,10 +78,32 @@ class Cache:
     def get_entity_data(cls, entity_type, name, **kwargs):
         """returns entity data corresponding to supplied entry using entity name"""
 
+        return cls._lookup_entity_data(entity_type, "name", name, **kwargs)
+
+    @classmethod
+    def get_entity_data_using_uuid(cls, entity_type, uuid, *args, **kwargs):
+        """returns entity data corresponding to supplied entry using entity uuid"""
+
+        return cls._lookup_entity_data(entity_type, "uuid", uuid, **kwargs)
+
+    @classmethod
+    def _lookup_entity_data(cls, entity_type, lookup_field, value, **kwargs):
+        """returns entity data from lookup cache, querying the db table on miss"""
+
+        DependencyTracker.record_table(entity_type)
+        key = LookupCache.get_key(entity_type, lookup_field, value, kwargs)
+        found, res = cls.lookup_cache.get(key)
+        if found:
+            return res
+
         db_cls = cls.get_entity_db_table_object(entity_type)
+        if lookup_field == "uuid":
+            db_query = db_cls.get_entity_data_using_uuid
+        else:
+            db_query = db_cls.get_entity_data
 
         try:
-            res = db_cls.get_entity_data(name=name, **kwargs)
+            res = db_query(**{lookup_field: value}, **kwargs)
         except OperationalError:
             formatted_exc = traceback.format_exc()
             LOG.debug("Exception Traceback:\n{}".format(formatted_exc))
@@ -81,8 +112,14 @@ class Cache:
             )
             sys.exit(-1)
 
+        if not res and cls.read_through:
+            res = cls._read_through_entity_data(
+                db_cls, db_query, lookup_field, value, **kwargs
+            )
+
+        cls.lookup_cache.set(key, res)
         if not res:
-            kwargs["name"] = name
+            kwargs[lookup_field] = value
             LOG.debug(
                 "Unsuccessful db query from {} table for following params {}".format(
                     entity_type, kwargs
@@ -92,30 +129,36 @@ class Cache:
         return res
 
     @classmethod
-    def get_entity_data_using_uuid(cls, entity_type, uuid, *args, **kwargs):
-        """returns entity data corresponding to supplied entry using entity uuid"""
-
-        db_cls = cls.get_entity_db_table_object(entity_type)
+    def _read_through_entity_data(cls, db_cls, db_query, lookup_field, value, **kwargs):
+        """fetches the entity missing in cache table from server, and returns
+        its entity data (empty if not found)"""
 
+        LOG.debug(
+            "Fetching {} ({}={}) missing in cache from server".format(
+                db_cls.get_cache_type(), lookup_field, value
+            )
+        )
         try:
-            res = db_cls.get_entity_data_using_uuid(uuid=uuid, **kwargs)
-        except OperationalError:
+            added = db_cls.fetch_missing_entity(**{lookup_field: value}, **kwargs)
+        except Exception:
             formatted_exc = traceback.format_exc()
             LOG.debug("Exception Traceback:\n{}".format(formatted_exc))
-            LOG.error(
-                "Cache error occurred. Please update cache using 'calm update cache' command"
-            )
-            sys.exit(-1)
+            added = False
 
-        if not res:
-            kwargs["uuid"] = uuid
-            LOG.debug(
-                "Unsuccessful db query from {} table for following params {}".format(
-                    entity_type, kwargs
-                )
-            )
+        if not added:
+            return dict()
 
-        return res
+        cls.lookup_cache.invalidate(db_cls.get_cache_type())
+        try:
+            return db_query(**{lookup_field: value}, **kwargs)
+        except OperationalError:
+            return dict()
+
+    @classmethod
+    def get_lookup_stats(cls):
+        """returns hit/miss counters of entity lookups"""
+
+        return cls.lookup_cache.get_stats()
 
     @classmethod
     def get_entity_db_table_object(cls, entity_type):
@@ -139,6 +182,7 @@ class Cache:
 
         db_obj = cls.get_entity_db_table_object(entity_type)
         db_obj.add_one(uuid, **kwargs)
+        cls.lookup_cache.invalidate(entity_type)
 
     @classmethod
     def delete_one(cls, entity_type, uuid, **kwargs):
@@ -146,6 +190,7 @@ class Cache:
 
         db_obj = cls.get_entity_db_table_object(entity_type)
         db_obj.delete_one(uuid, **kwargs)
+        cls.lookup_cache.invalidate(entity_type)
 
     @classmethod
     def update_one(cls, entity_type, uuid, **kwargs):
@@ -153,25 +198,31 @@ class Cache:
 
         db_obj = cls.get_entity_db_table_object(entity_type)
         db_obj.update_one(uuid, **kwargs)
+        cls.lookup_cache.invalidate(entity_type)
 
     @classmethod
-    def sync(cls):
-        """Sync cache by latest data"""
+    def sync(cls, incremental=False):
+        """Sync cache by latest data
 
-        def sync_tables(tables):
-            for table in tables:
-                table.sync()
-                click.echo(".", nl=False, err=True)
+        Args:
+            incremental (bool): sync only entities modified since last sync
+                (for tables supporting it)
+        """
 
-        cache_table_map = cls.get_cache_tables(sync_version=True)
-        tables = list(cache_table_map.values())
+        def sync_tables(cache_table_map):
+            # Version table is synced first, as other tables depend on calm version
+            Version.sync()
+            click.echo(".", nl=False, err=True)
+
+            scheduler = CacheSyncScheduler(cache_table_map, incremental=incremental)
+            scheduler.run()
+            return scheduler
 
-        # Inserting version table at start
-        tables.insert(0, Version)
+        cache_table_map = cls.get_cache_tables(sync_version=True)
 
         try:
             LOG.info("Updating cache", nl=False)
-            sync_tables(tables)
+            scheduler = sync_tables(cache_table_map)
 
         except (OperationalError, IntegrityError):
             click.echo(" [Fail]")
@@ -179,11 +230,14 @@ class Cache:
             LOG.info("Removing existing db and updating cache again")
             init_db_handle()
             LOG.info("Updating cache", nl=False)
-            sync_tables(tables)
+            scheduler = sync_tables(cache_table_map)
+        finally:
+            cls.lookup_cache.invalidate()
         click.echo(" [Done]", err=True)
+        scheduler.show_timings()
 
     @classmethod
-    def sync_table(cls, cache_type):
+    def sync_table(cls, cache_type, incremental=False):
         """sync the cache table provided in cache_type list"""
 
         if not cache_type:
@@ -198,7 +252,10 @@ class Cache:
                 continue
 
             cache_table = cache_table_map[_ct]
-            cache_table.sync()
+            try:
+                cache_table.sync_table(incremental=incremental)
+            finally:
+                cls.lookup_cache.invalidate(_ct)
             click.echo(".", nl=False, err=True)
         click.echo("[Done]", err=True)
 
@@ -208,6 +265,39 @@ class Cache:
 
         # For now clearing means erasing all data. So reinitialising whole database
         init_db_handle()
+        cls.lookup_cache.invalidate()
+
+    @classmethod
+    def get_server_identity(cls):
+        """returns identity of the server, cache is synced from"""
+
+        server_config = get_context().get_server_config()
+        return {
+            "pc_ip": server_config["pc_ip"],
+            "pc_port": str(server_config["pc_port"]),
+        }
+
+    @classmethod
+    def export_snapshot(cls, snapshot_file):
+        """Export cache tables to snapshot file"""
+
+        return cache_snapshot.export_snapshot(
+            snapshot_file, cls.get_cache_tables(), cls.get_server_identity()
+        )
+
+    @classmethod
+    def import_snapshot(cls, snapshot_file, force=False):
+        """Replace data of cache tables by the one in snapshot file"""
+
+        try:
+            return cache_snapshot.import_snapshot(
+                snapshot_file,
+                cls.get_cache_tables(),
+                cls.get_server_identity(),
+                force=force,
+            )
+        finally:
+            cls.lookup_cache.invalidate()
 
     @classmethod
     def show_data(cls):
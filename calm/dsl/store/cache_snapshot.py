@@ -0,0 +1,183 @@
+import sys
+import gzip
+import json
+import datetime
+
+from calm.dsl.db.table_config import VersionTable, SYNC_MARKER_PREFIX
+from calm.dsl.db.writer import execute_write
+from calm.dsl.log import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+# Incremented on incompatible changes of the snapshot format
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def get_table_columns(table):
+    """returns column names of table, in schema order"""
+
+    return [field.column_name for field in table._meta.sorted_fields]
+
+
+def read_table_rows(table):
+    """returns rows of table as stored in db, without conversion to python values"""
+
+    query = 'SELECT {} FROM "{}"'.format(
+        ", ".join('"{}"'.format(column) for column in get_table_columns(table)),
+        table._meta.table_name,
+    )
+    cursor = table._meta.database.execute_sql(query)
+    return [list(row) for row in cursor.fetchall()]
+
+
+def write_table_rows(table, columns, rows):
+    """inserts rows (as stored in db) in table, without committing them"""
+
+    query = 'INSERT INTO "{}" ({}) VALUES ({})'.format(
+        table._meta.table_name,
+        ", ".join('"{}"'.format(column) for column in columns),
+        ", ".join("?" for _ in columns),
+    )
+    table._meta.database.connection().executemany(query, rows)
+
+
+def insert_table_rows(table, columns, rows):
+    """inserts rows (as stored in db) in table, in a single transaction"""
+
+    db = table._meta.database
+
+    def insert_rows():
+        with db.atomic():
+            write_table_rows(table, columns, rows)
+
+    execute_write(insert_rows)
+
+
+def export_snapshot(snapshot_file, cache_tables, server):
+    """writes the rows of cache tables and version table (calm/pc versions and
+    sync markers) to gzipped json file. Secrets are never exported.
+
+    Args:
+        snapshot_file (str): path of snapshot file
+        cache_tables (dict): cache tables to export, keyed by cache type
+        server (dict): identity of server the cache is synced from
+    Returns:
+        (dict): number of rows exported, keyed by cache type
+    """
+
+    tables = {}
+    for cache_type, table in cache_tables.items():
+        tables[cache_type] = {
+            "columns": get_table_columns(table),
+            "rows": read_table_rows(table),
+        }
+
+    snapshot = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "created_at": datetime.datetime.now().isoformat(),
+        "server": server,
+        "versions": {
+            "columns": get_table_columns(VersionTable),
+            "rows": read_table_rows(VersionTable),
+        },
+        "tables": tables,
+    }
+
+    with gzip.open(snapshot_file, "wt", encoding="utf-8") as fd:
+        json.dump(snapshot, fd, separators=(",", ":"))
+
+    return {cache_type: len(data["rows"]) for cache_type, data in tables.items()}
+
+
+def read_snapshot(snapshot_file):
+    """returns the data of snapshot file"""
+
+    try:
+        with gzip.open(snapshot_file, "rt", encoding="utf-8") as fd:
+            snapshot = json.load(fd)
+    except (OSError, ValueError) as exc:
+        LOG.error("Invalid cache snapshot {}: {}".format(snapshot_file, exc))
+        sys.exit(-1)
+
+    format_version = snapshot.get("format_version")
+    if format_version != SNAPSHOT_FORMAT_VERSION:
+        LOG.error(
+            "Cache snapshot format version {} is not supported (expected {})".format(
+                format_version, SNAPSHOT_FORMAT_VERSION
+            )
+        )
+        sys.exit(-1)
+
+    return snapshot
+
+
+def import_snapshot(snapshot_file, cache_tables, server, force=False):
+    """replaces the rows of cache tables and version table by the ones in
+    snapshot file. Rows are bulk inserted in a shadow table, that replaces
+    the table once loaded. Tables whose schema differs from snapshot are
+    skipped, and have to be synced again.
+
+    Args:
+        snapshot_file (str): path of snapshot file
+        cache_tables (dict): cache tables to import, keyed by cache type
+        server (dict): identity of server the cache is used with
+        force (bool): import snapshot of a different server also
+    Returns:
+        (dict): number of rows imported, keyed by cache type
+    """
+
+    snapshot = read_snapshot(snapshot_file)
+
+    if snapshot["server"] != server:
+        msg = "Cache snapshot is of server {}, configured server is {}".format(
+            snapshot["server"], server
+        )
+        if not force:
+            LOG.error(msg + ". Use --force to import it anyway")
+            sys.exit(-1)
+        LOG.warning(msg)
+
+    row_counts = {}
+    for cache_type, table_data in snapshot["tables"].items():
+        table = cache_tables.get(cache_type)
+        if not table:
+            LOG.warning("Skipping unknown cache table '{}'".format(cache_type))
+            continue
+
+        if set(table_data["columns"]) != set(get_table_columns(table)):
+            LOG.warning(
+                "Skipping '{}' table, as its schema differs from snapshot".format(
+                    cache_type
+                )
+            )
+            continue
+
+        with table.shadow_table() as shadow_model:
+            insert_table_rows(shadow_model, table_data["columns"], table_data["rows"])
+        row_counts[cache_type] = len(table_data["rows"])
+
+    # Markers of skipped tables are dropped, so that next sync is complete one
+    imported_markers = []
+    for cache_type in row_counts:
+        table = cache_tables[cache_type]
+        imported_markers.extend(
+            [table.get_sync_marker_name(), table.get_skipped_uuids_name()]
+        )
+    versions = snapshot["versions"]
+    name_index = versions["columns"].index("name")
+    version_rows = [
+        row
+        for row in versions["rows"]
+        if not row[name_index].startswith(SYNC_MARKER_PREFIX)
+        or row[name_index] in imported_markers
+    ]
+
+    # Versions and markers are never left deleted, if import is interrupted
+    def replace_version_rows():
+        with VersionTable._meta.database.atomic():
+            VersionTable.delete().execute()
+            write_table_rows(VersionTable, versions["columns"], version_rows)
+
+    execute_write(replace_version_rows)
+
+    return row_counts
@@ -0,0 +1,121 @@
+import time
+import click
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from prettytable import PrettyTable
+
+from calm.dsl.config import get_context
+from calm.dsl.db.table_config import dsl_database
+from calm.dsl.db.writer import DatabaseWriter
+from calm.dsl.log import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+
+class CacheSyncScheduler:
+    """Syncs cache tables concurrently, respecting their sync_dependencies.
+
+    Tables are synced on a bounded pool of worker threads. All the db writes
+    done by tables are funnelled through a single writer thread.
+    """
+
+    def __init__(self, cache_table_map, max_workers=None, incremental=False):
+        """
+        Args:
+            cache_table_map (dict): {cache_type: table} of tables to be synced
+            max_workers (int): max tables synced in parallel, defaults to
+                'concurrency' in connection config
+            incremental (bool): sync only entities modified since last sync
+        """
+
+        if max_workers is None:
+            context = get_context()
+            max_workers = context.get_connection_config()["concurrency"]
+
+        self.cache_table_map = cache_table_map
+        self.max_workers = max(1, int(max_workers))
+        self.incremental = incremental
+        self.timings = {}
+
+    def get_dependencies(self, cache_type):
+        """returns dependencies of table, that are part of this sync"""
+
+        table = self.cache_table_map[cache_type]
+        return [
+            _ct
+            for _ct in getattr(table, "sync_dependencies", [])
+            if _ct in self.cache_table_map and _ct != cache_type
+        ]
+
+    def _sync_table(self, cache_type):
+        """syncs the table and returns time taken(seconds)"""
+
+        start_time = time.time()
+        try:
+            table = self.cache_table_map[cache_type]
+            table.sync_table(incremental=self.incremental)
+        finally:
+            # Close the db connection opened by this worker thread
+            if not dsl_database.is_closed():
+                dsl_database.close()
+
+        return time.time() - start_time
+
+    def run(self):
+        """syncs all the tables. Raises the first exception hit by any table"""
+
+        pending = {
+            cache_type: set(self.get_dependencies(cache_type))
+            for cache_type in self.cache_table_map
+        }
+        running = {}
+        completed = set()
+        error = None
+
+        with DatabaseWriter(dsl_database), ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="dsl-cache-sync"
+        ) as executor:
+            while pending or running:
+                if not error:
+                    ready = [_ct for _ct, deps in pending.items() if deps <= completed]
+                    for cache_type in ready:
+                        LOG.debug("Syncing {} table".format(cache_type))
+                        pending.pop(cache_type)
+                        running[
+                            executor.submit(self._sync_table, cache_type)
+                        ] = cache_type
+
+                if not running:
+                    if pending and not error:
+                        error = Exception(
+                            "Cyclic sync dependencies found in tables: {}".format(
+                                ", ".join(pending.keys())
+                            )
+                        )
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    cache_type = running.pop(future)
+                    try:
+                        self.timings[cache_type] = future.result()
+                    except BaseException as exc:
+                        LOG.debug("Failed to sync {} table".format(cache_type))
+                        error = error or exc
+                        continue
+
+                    completed.add(cache_type)
+                    click.echo(".", nl=False, err=True)
+
+        if error:
+            raise error
+
+    def show_timings(self):
+        """displays time taken by each table sync"""
+
+        table = PrettyTable()
+        table.field_names = ["CACHE TYPE", "SYNC TIME (s)"]
+        for cache_type, duration in sorted(
+            self.timings.items(), key=lambda item: item[1], reverse=True
+        ):
+            table.add_row([cache_type, "{:.2f}".format(duration)])
+        click.echo(table, err=True)
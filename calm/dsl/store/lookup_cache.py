@@ -0,0 +1,94 @@
+import copy
+import time
+import threading
+from collections import OrderedDict
+
+from calm.dsl.log import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+LOOKUP_CACHE_MAX_SIZE = 2048
+LOOKUP_CACHE_TTL = 300  # seconds
+
+
+class LookupCache:
+    """Size bounded LRU store (with ttl) for results of cache table lookups.
+
+    Entries are keyed by (entity_type, lookup_field, value, kwargs). Copies of
+    stored results are returned, so callers mutating the result don't alter
+    the cached one.
+    """
+
+    def __init__(self, max_size=LOOKUP_CACHE_MAX_SIZE, ttl=LOOKUP_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(entity_type, lookup_field, value, kwargs):
+        """returns hashable key for the lookup"""
+
+        # kwargs values can be unhashable (list, dict), so repr is used
+        return (
+            entity_type,
+            lookup_field,
+            value,
+            tuple(sorted((k, repr(v)) for k, v in kwargs.items())),
+        )
+
+    def get(self, key):
+        """returns (found, result) for the key"""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (time.monotonic() - entry[0]) > self.ttl:
+                self._entries.pop(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return True, copy.deepcopy(entry[1])
+
+    def set(self, key, result):
+        """stores result of the lookup, evicting least recently used entries"""
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, entity_type=None):
+        """drops entries of entity_type, all the entries if entity_type not given"""
+
+        with self._lock:
+            if entity_type is None:
+                self._entries.clear()
+            else:
+                for key in [_k for _k in self._entries if _k[0] == entity_type]:
+                    self._entries.pop(key)
+
+        LOG.debug("Invalidated lookup cache for {}".format(entity_type or "all"))
+
+    def get_stats(self):
+        """returns hit/miss counters of the store"""
+
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
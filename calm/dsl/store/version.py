@@ -29,12 +29,12 @@ class Version:
     @classmethod
     def sync(cls):
 
+        # Only version entries are replaced, sync markers of cache tables are kept
         db = get_db_handle()
-        for entity in db.version_table.select():
-            query = db.version_table.delete().where(
-                db.version_table.name == entity.name
-            )
-            query.execute()
+        query = db.version_table.delete().where(
+            db.version_table.name.in_(["Calm", "PC"])
+        )
+        query.execute()
 
         client = get_api_client()
 
@@ -1,6 +1,7 @@
 from .ping import ping
 from .validator import StrictDraft7Validator
 from .utils import get_module_from_file, make_file_dir
+from .compile_cache import CompileCache, DependencyTracker, is_user_file
 
 
 __all__ = [
@@ -9,4 +10,7 @@ __all__ = [
     "StrictDraft7Validator",
     "get_module_from_file",
     "make_file_dir",
+    "CompileCache",
+    "DependencyTracker",
+    "is_user_file",
 ]
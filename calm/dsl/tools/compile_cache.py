@@ -0,0 +1,548 @@
+import os
+import sys
+import json
+import glob
+import types
+import hashlib
+import builtins
+import sysconfig
+import tempfile
+import threading
+import importlib.abc
+import importlib.util
+from collections.abc import MutableMapping
+
+from calm.dsl.log import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+COMPILE_CACHE_DIR = "compile_cache"
+CALM_PACKAGE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+_DSL_DIGEST = None
+_LIBRARY_DIRS = None
+
+# Active DependencyTracker of each thread
+_tracking = threading.local()
+
+# Import and env hooks are installed while any thread is tracking
+_hooks_lock = threading.Lock()
+_hooks_count = 0
+
+
+def get_dsl_digest():
+    """returns digest of calm-dsl sources, so that upgrading dsl invalidates
+    the compiled payloads"""
+
+    global _DSL_DIGEST
+    if _DSL_DIGEST is None:
+        digest = hashlib.sha256()
+        for pattern in ["**/*.py", "**/*.jinja2"]:
+            for src_file in sorted(
+                glob.glob(os.path.join(CALM_PACKAGE_DIR, pattern), recursive=True)
+            ):
+                stat = os.stat(src_file)
+                digest.update(
+                    "{}:{}:{}".format(
+                        os.path.relpath(src_file, CALM_PACKAGE_DIR),
+                        stat.st_mtime_ns,
+                        stat.st_size,
+                    ).encode()
+                )
+        _DSL_DIGEST = digest.hexdigest()
+
+    return _DSL_DIGEST
+
+
+def is_user_file(file_path):
+    """returns False for files of dsl, python and installed packages"""
+
+    global _LIBRARY_DIRS
+    if _LIBRARY_DIRS is None:
+        _LIBRARY_DIRS = [CALM_PACKAGE_DIR] + [
+            os.path.abspath(path)
+            for path in {
+                sysconfig.get_paths()[name]
+                for name in ["stdlib", "platstdlib", "purelib", "platlib"]
+            }
+        ]
+
+    file_path = os.path.abspath(os.path.expanduser(file_path))
+    return not any(
+        file_path.startswith(library_dir + os.sep) for library_dir in _LIBRARY_DIRS
+    )
+
+
+def get_file_digest(file_path):
+    """returns sha256 of file contents, None if file does not exist"""
+
+    try:
+        with open(file_path, "rb") as fd:
+            return hashlib.sha256(fd.read()).hexdigest()
+    except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+        return None
+
+
+def get_table_fingerprint(entity_type):
+    """returns fingerprint of cache table, changing whenever its rows change"""
+
+    from peewee import fn
+    from calm.dsl.store import Cache
+
+    db_cls = Cache.get_entity_db_table_object(entity_type)
+    columns = [fn.COUNT(db_cls.uuid)]
+    if hasattr(db_cls, "last_update_time"):
+        columns.append(fn.MAX(db_cls.last_update_time))
+
+    row = db_cls.select(*columns).tuples().get()
+    return json.dumps([str(col) for col in row] + [db_cls.get_sync_marker()])
+
+
+def get_value_digest(value):
+    """returns digest of env value, so that secrets are not stored in cache"""
+
+    if value is None:
+        return None
+    return hashlib.sha256(value.encode("utf-8", "surrogateescape")).hexdigest()
+
+
+def has_secret_values(payload):
+    """returns True if payload contains secret values (credential secrets,
+    passwords, secret variables)"""
+
+    if isinstance(payload, list):
+        return any(has_secret_values(item) for item in payload)
+
+    if not isinstance(payload, dict):
+        return False
+
+    if payload.get("value"):
+        attrs = payload.get("attrs")
+        if payload.get("type") == "SECRET" or (
+            isinstance(attrs, dict) and attrs.get("is_secret_modified")
+        ):
+            return True
+
+    return any(has_secret_values(value) for value in payload.values())
+
+
+def tracked_open(file, mode="r", *args, **kwargs):
+    """open used by user modules, recording the files read in the active
+    tracker of thread"""
+
+    tracker = DependencyTracker.get_active()
+    if (
+        tracker is not None
+        and isinstance(file, (str, bytes, os.PathLike))
+        and not any(c in mode for c in "wax+")
+    ):
+        tracker._add_file(os.fsdecode(file))
+    return open(file, mode, *args, **kwargs)
+
+
+def tracked_import(name, globals=None, locals=None, fromlist=(), level=0):
+    """__import__ used by user modules, recording the modules imported (even
+    if already loaded) in the active tracker of thread"""
+
+    module = builtins.__import__(name, globals, locals, fromlist, level)
+    tracker = DependencyTracker.get_active()
+    if tracker is None:
+        return module
+
+    if level:
+        package = (globals or {}).get("__package__") or ""
+        name = importlib.util.resolve_name("." * level + name, package)
+    tracker.modules.append(sys.modules.get(name, module))
+    for item in fromlist or ():
+        value = getattr(module, item, None)
+        if isinstance(value, types.ModuleType):
+            tracker.modules.append(value)
+
+    return module
+
+
+# Builtins of user modules, scoping the open/import hooks to them
+_TRACKED_BUILTINS = dict(vars(builtins), open=tracked_open, __import__=tracked_import)
+
+
+class _TrackedEnviron(MutableMapping):
+    """Proxy of os.environ recording the variables read in the active tracker
+    of thread. Reads of other threads are not recorded"""
+
+    def __init__(self, environ):
+        self._environ = environ
+
+    def _record(self, *keys):
+        tracker = DependencyTracker.get_active()
+        if tracker is not None:
+            tracker.env_vars.update(keys)
+
+    def __getitem__(self, key):
+        self._record(key)
+        return self._environ[key]
+
+    def __setitem__(self, key, value):
+        self._environ[key] = value
+
+    def __delitem__(self, key):
+        del self._environ[key]
+
+    def __iter__(self):
+        # Reading all the variables, makes all of them dependencies
+        self._record(*self._environ)
+        return iter(self._environ)
+
+    def __len__(self):
+        return len(self._environ)
+
+    def __contains__(self, key):
+        self._record(key)
+        return key in self._environ
+
+    def copy(self):
+        return dict(self)
+
+
+class _TrackedLoader(importlib.abc.Loader):
+    """Loader of user module, making the module open files and import modules
+    via tracked_open and tracked_import"""
+
+    def __init__(self, loader):
+        self._loader = loader
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        module.__builtins__ = _TRACKED_BUILTINS
+        self._loader.exec_module(module)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _UserModuleFinder(importlib.abc.MetaPathFinder):
+    """Finds user modules imported while tracking, using the other finders,
+    and wraps their loaders by _TrackedLoader"""
+
+    def find_spec(self, fullname, path, target=None):
+        tracker = DependencyTracker.get_active()
+        if tracker is None:
+            return None
+
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+
+            if (
+                spec.origin
+                and hasattr(spec.loader, "exec_module")
+                and is_user_file(spec.origin)
+            ):
+                spec.loader = _TrackedLoader(spec.loader)
+            return spec
+
+        return None
+
+
+_USER_MODULE_FINDER = _UserModuleFinder()
+
+
+def _install_hooks():
+    global _hooks_count
+
+    with _hooks_lock:
+        if _hooks_count == 0:
+            os.environ = _TrackedEnviron(os.environ)
+            sys.meta_path.insert(0, _USER_MODULE_FINDER)
+        _hooks_count += 1
+
+
+def _uninstall_hooks():
+    global _hooks_count
+
+    with _hooks_lock:
+        _hooks_count -= 1
+        if _hooks_count == 0:
+            os.environ = os.environ._environ
+            sys.meta_path.remove(_USER_MODULE_FINDER)
+
+
+class _TrackedEnv(dict):
+    """Env dict returned by read_env, recording the os variables read"""
+
+    def __init__(self, env, local_keys, tracker):
+        super().__init__(env)
+        self._local_keys = local_keys
+        self._tracker = tracker
+
+    def _record(self, key):
+        # Variables not in env file are read from os, even if not set now
+        if key not in self._local_keys:
+            self._tracker.env_vars.add(key)
+
+    def __getitem__(self, key):
+        self._record(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self._record(key)
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        self._record(key)
+        return super().__contains__(key)
+
+
+class DependencyTracker:
+    """Records the local files, modules and cache tables read while compiling
+    an entity in current thread, so that compiled payload can be reused till
+    any of them changes.
+
+    Files read by dsl helpers (read_file, read_spec, read_env etc.) or using
+    `open` in user modules, user modules resolved by the entity, cache tables
+    looked up (`Cache.get_entity_data*`) and environment variables read are
+    recorded. Values fetched from server are not tracked, so compiles making
+    api calls are not cacheable.
+    """
+
+    def __init__(self):
+        self.files = set()
+        self.tables = set()
+        self.env_vars = set()
+        self.modules = []
+        self.cacheable = True
+        self._previous = None
+        self._sys_modules = None
+
+    @staticmethod
+    def get_active():
+        """returns the tracker active in current thread"""
+
+        return getattr(_tracking, "tracker", None)
+
+    @classmethod
+    def record_file(cls, file_path):
+        """records the file (even if it does not exist) as a dependency"""
+
+        tracker = cls.get_active()
+        if tracker is not None:
+            tracker._add_file(file_path)
+
+    @classmethod
+    def record_table(cls, entity_type):
+        tracker = cls.get_active()
+        if tracker is not None:
+            tracker.tables.add(entity_type)
+
+    @classmethod
+    def record_api_call(cls):
+        tracker = cls.get_active()
+        if tracker is not None:
+            tracker.cacheable = False
+
+    @classmethod
+    def track_module(cls, module):
+        """makes the user module (loaded from file, outside sys.modules) open
+        files and import modules via tracked_open and tracked_import, and
+        records the modules it resolves"""
+
+        module.__builtins__ = _TRACKED_BUILTINS
+        tracker = cls.get_active()
+        if tracker is not None:
+            tracker.modules.append(module)
+
+    @classmethod
+    def get_environ(cls):
+        """returns os.environ, without recording the variables read"""
+
+        if isinstance(os.environ, _TrackedEnviron):
+            return os.environ._environ
+        return os.environ
+
+    @classmethod
+    def track_env(cls, env, local_keys):
+        """returns env dict recording the os variables read, i.e. the ones
+        not in local_keys (read from env file)"""
+
+        tracker = cls.get_active()
+        if tracker is None:
+            return env
+        return _TrackedEnv(env, local_keys, tracker)
+
+    def _add_file(self, file_path):
+        if is_user_file(file_path):
+            self.files.add(os.path.abspath(os.path.expanduser(file_path)))
+
+    def _add_modules(self, modules):
+        """records files of user modules, and of the user modules referenced
+        by their globals (imported even before tracking started)"""
+
+        pending = list(modules)
+        seen = set()
+        while pending:
+            module = pending.pop()
+            if id(module) in seen:
+                continue
+            seen.add(id(module))
+
+            module_file = getattr(module, "__file__", None)
+            if not module_file or not is_user_file(module_file):
+                continue
+            self._add_file(module_file)
+
+            for value in list(vars(module).values()):
+                if isinstance(value, types.ModuleType):
+                    pending.append(value)
+                    continue
+
+                try:
+                    module_name = getattr(value, "__module__", None)
+                except Exception:
+                    continue
+                if isinstance(module_name, str) and module_name in sys.modules:
+                    pending.append(sys.modules[module_name])
+
+    def __enter__(self):
+        self._sys_modules = set(sys.modules)
+        self._previous = DependencyTracker.get_active()
+        _tracking.tracker = self
+        _install_hooks()
+        return self
+
+    def __exit__(self, *args):
+        _uninstall_hooks()
+        _tracking.tracker = self._previous
+
+        new_modules = [
+            sys.modules[name]
+            for name in set(sys.modules) - self._sys_modules
+            if name in sys.modules
+        ]
+        self._add_modules(new_modules + self.modules)
+
+    def get_dependencies(self):
+        return {
+            "files": {
+                file_path: get_file_digest(file_path)
+                for file_path in sorted(self.files)
+            },
+            "tables": {
+                entity_type: get_table_fingerprint(entity_type)
+                for entity_type in sorted(self.tables)
+            },
+            "env": {
+                name: get_value_digest(os.environ.get(name))
+                for name in sorted(self.env_vars)
+            },
+        }
+
+
+class CompileCache:
+    """Stores compiled payloads of entity files in local dir.
+
+    Entries are keyed by the entity file path, dsl version, config context and
+    calm version, and are valid till the files, cache tables and environment
+    variables recorded by DependencyTracker while compiling are unchanged.
+    """
+
+    def __init__(self, cache_dir=None):
+        if cache_dir is None:
+            from calm.dsl.config import get_context
+
+            init_config = get_context().get_init_config()
+            cache_dir = os.path.join(
+                init_config["LOCAL_DIR"]["location"], COMPILE_CACHE_DIR
+            )
+        self.cache_dir = cache_dir
+
+    def get_key(self, entity_file, *args):
+        """returns key of the compiled payload of entity file. args are other
+        inputs of compilation (like brownfield deployment file)"""
+
+        from calm.dsl.config import get_context
+        from calm.dsl.store import Version
+
+        context = get_context()
+        server_config = context.server_config
+        key_data = [
+            os.path.abspath(entity_file),
+            [os.path.abspath(arg) if arg else arg for arg in args],
+            get_dsl_digest(),
+            context.project_config,
+            [server_config.get("pc_ip"), server_config.get("pc_port")],
+            Version.get_version("Calm"),
+        ]
+        return hashlib.sha256(
+            json.dumps(key_data, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    def get_entry_file(self, key):
+        return os.path.join(self.cache_dir, "{}.json".format(key))
+
+    def get(self, key):
+        """returns the stored payload, None if not found or outdated"""
+
+        try:
+            with open(self.get_entry_file(key)) as fd:
+                entry = json.load(fd)
+        except (OSError, ValueError):
+            return None
+
+        dependencies = entry["dependencies"]
+        for file_path, digest in dependencies["files"].items():
+            if get_file_digest(file_path) != digest:
+                LOG.debug("Compile cache outdated, {} changed".format(file_path))
+                return None
+
+        for name, digest in dependencies["env"].items():
+            if get_value_digest(os.environ.get(name)) != digest:
+                LOG.debug("Compile cache outdated, env {} changed".format(name))
+                return None
+
+        for entity_type, fingerprint in dependencies["tables"].items():
+            if get_table_fingerprint(entity_type) != fingerprint:
+                LOG.debug(
+                    "Compile cache outdated, {} table changed".format(entity_type)
+                )
+                return None
+
+        return entry["payload"]
+
+    def set(self, key, payload, tracker):
+        """stores the payload with dependencies recorded by tracker. Payloads
+        depending on api calls or having secrets are not stored"""
+
+        if not tracker.cacheable:
+            LOG.debug("Compiled payload not stored in cache, as it used api calls")
+            return
+
+        if has_secret_values(payload):
+            LOG.debug("Compiled payload not stored in cache, as it has secrets")
+            return
+
+        try:
+            entry = json.dumps(
+                {"payload": payload, "dependencies": tracker.get_dependencies()}
+            )
+        except TypeError as exc:
+            LOG.debug("Compiled payload not stored in cache: {}".format(exc))
+            return
+
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir, mode=0o700)
+
+            # Write to temp file first, so parallel runs never read a partial file
+            fd, temp_file = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(fd, "w") as temp_fd:
+                temp_fd.write(entry)
+            os.replace(temp_file, self.get_entry_file(key))
+        except OSError:
+            LOG.debug("Failed to store compiled payload in {}".format(self.cache_dir))
@@ -4,6 +4,7 @@ import sys
 import errno
 
 from calm.dsl.log import get_logging_handle
+from .compile_cache import DependencyTracker
 
 LOG = get_logging_handle(__name__)
 
@@ -26,8 +27,11 @@ def make_file_dir(path, is_dir=False):
 
 def get_module_from_file(module_name, file):
     """Returns a module given a user python file (.py)"""
+
+    DependencyTracker.record_file(file)
     spec = importlib.util.spec_from_file_location(module_name, file)
     user_module = importlib.util.module_from_spec(spec)
+    DependencyTracker.track_module(user_module)
 
     try:
         spec.loader.exec_module(user_module)
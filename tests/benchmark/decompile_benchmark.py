@@ -0,0 +1,134 @@
+"""Benchmark for template rendering during decompile.
+
+Decompiles services of a generated blueprint, having variables and action
+tasks, with a new jinja2 environment per template (as done before templates
+were cached) and with the cached environment.
+
+Usage:
+    python -m tests.benchmark.decompile_benchmark [--entities 1000]
+"""
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+from jinja2 import Environment, PackageLoader, FileSystemBytecodeCache
+
+from calm.dsl.builtins import ServiceType
+from calm.dsl.tools import get_module_from_file
+from calm.dsl.decompile import render
+from calm.dsl.decompile.service import render_service_template
+from calm.dsl.decompile.file_handler import init_bp_dir
+from calm.dsl.decompile.main import init_decompile_context
+
+VARIABLES_PER_SERVICE = 10
+TASKS_PER_SERVICE = 10
+
+
+def get_template_uncached(schema_file):
+    loader = PackageLoader(render.__name__, "schemas")
+    env = Environment(loader=loader)
+    return env.get_template(schema_file)
+
+
+def create_services(entities, dsl_file):
+    """returns services with given number of variables and tasks in total"""
+
+    lines = ["from calm.dsl.builtins import Service, CalmVariable, CalmTask, action"]
+    per_service = VARIABLES_PER_SERVICE + TASKS_PER_SERVICE
+    for i in range(max(entities // per_service, 1)):
+        lines.extend(["", "", "class Service{}(Service):".format(i)])
+        for j in range(VARIABLES_PER_SERVICE):
+            lines.append('    var_{0} = CalmVariable.Simple("value {0}")'.format(j))
+
+        lines.extend(["", "    @action", "    def __create__():"])
+        for j in range(TASKS_PER_SERVICE):
+            lines.append(
+                '        CalmTask.Exec.ssh(name="Task{0}", script="echo {0}")'.format(j)
+            )
+
+    with open(dsl_file, "w") as fd:
+        fd.write("\n".join(lines) + "\n")
+
+    module = get_module_from_file("calm.dsl.benchmark_services", dsl_file)
+    return [
+        obj
+        for obj in vars(module).values()
+        if isinstance(obj, ServiceType) and obj.__name__.startswith("Service")
+    ]
+
+
+def decompile(services):
+
+    init_decompile_context()
+    start_time = time.perf_counter()
+    for service in services:
+        render_service_template(service)
+    return time.perf_counter() - start_time
+
+
+def load_all_templates():
+    """returns time taken to load all templates in a new environment"""
+
+    render._ENV = None
+    start_time = time.perf_counter()
+    render.precompile_templates()
+    return time.perf_counter() - start_time
+
+
+def run(entities):
+
+    bp_dir = tempfile.mkdtemp()
+    init_bp_dir(bp_dir)
+    services = create_services(entities, os.path.join(bp_dir, "services.py"))
+
+    cases = []
+    get_template = render.get_template
+    try:
+        render.get_template = get_template_uncached
+        cases.append(("new environment per template", decompile(services)))
+    finally:
+        render.get_template = get_template
+
+    bytecode_cache = render.get_bytecode_cache
+    try:
+        # Cached environment, without compiled templates stored in local dir
+        render._ENV = None
+        render.get_bytecode_cache = lambda: None
+        cases.append(("cached environment (cold)", decompile(services)))
+        cases.append(("load all templates (no bytecode cache)", load_all_templates()))
+
+        # Compiled templates are stored in local dir, and loaded by next process
+        cache_dir = os.path.join(bp_dir, "templates")
+        os.makedirs(cache_dir)
+        render.get_bytecode_cache = lambda: FileSystemBytecodeCache(cache_dir)
+        load_all_templates()
+        cases.append(("load all templates (bytecode cache)", load_all_templates()))
+        render._ENV = None
+        cases.append(("cached environment (precompiled)", decompile(services)))
+        cases.append(("cached environment (warm)", decompile(services)))
+    finally:
+        render.get_bytecode_cache = bytecode_cache
+        render._ENV = None
+
+    shutil.rmtree(bp_dir)
+
+    print("Decompiled {} services, {} entities".format(len(services), entities))
+    print("{:<40} {:>10}".format("CASE", "TIME (s)"))
+    for name, duration in cases:
+        print("{:<40} {:>10.3f}".format(name, duration))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="decompile rendering benchmark")
+    parser.add_argument(
+        "--entities", type=int, default=1000, help="variables and tasks to decompile"
+    )
+    args = parser.parse_args()
+    run(args.entities)
+
+
+if __name__ == "__main__":
+    main()
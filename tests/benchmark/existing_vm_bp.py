@@ -0,0 +1,71 @@
+"""
+Existing VM blueprint created by cli benchmarks
+"""
+
+from calm.dsl.builtins import ref, basic_cred
+from calm.dsl.builtins import action
+from calm.dsl.builtins import CalmTask as Task
+from calm.dsl.builtins import CalmVariable as Var
+from calm.dsl.builtins import Service, Package, Substrate
+from calm.dsl.builtins import Deployment, Profile, Blueprint
+from calm.dsl.builtins import provider_spec
+
+
+DefaultCred = basic_cred("centos", "passw0rd", name="default cred", default=True)
+
+
+class AppService(Service):
+    """App service"""
+
+    ENV = Var("DEV")
+
+    @action
+    def __start__():
+        Task.Exec.ssh(name="StartTask", script="echo 'Service start in @@{ENV}@@'")
+
+
+class AppPackage(Package):
+    """App package"""
+
+    services = [ref(AppService)]
+
+    @action
+    def __install__():
+        Task.Exec.ssh(name="InstallTask", script="echo 'Installing app'")
+
+
+class ExistingVM(Substrate):
+    """Existing VM substrate"""
+
+    provider_type = "EXISTING_VM"
+    provider_spec = provider_spec({"address": "10.0.0.10"})
+    readiness_probe = {
+        "disabled": False,
+        "delay_secs": "0",
+        "connection_type": "SSH",
+        "connection_port": 22,
+        "credential": ref(DefaultCred),
+    }
+
+
+class AppDeployment(Deployment):
+    """App deployment"""
+
+    packages = [ref(AppPackage)]
+    substrate = ref(ExistingVM)
+
+
+class Default(Profile):
+    """Default profile"""
+
+    deployments = [AppDeployment]
+
+
+class ExistingVMBlueprint(Blueprint):
+    """Existing VM blueprint"""
+
+    credentials = [DefaultCred]
+    services = [AppService]
+    packages = [AppPackage]
+    substrates = [ExistingVM]
+    profiles = [Default]
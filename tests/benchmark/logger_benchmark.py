@@ -0,0 +1,57 @@
+"""Benchmark for per call overhead of CustomLogging.
+
+Usage:
+    python -m tests.benchmark.logger_benchmark [--number 20000]
+"""
+
+import os
+import sys
+import timeit
+import inspect
+import logging
+import argparse
+
+from calm.dsl.log import get_logging_handle, CustomLogging
+
+
+def caller_info_using_inspect():
+    return inspect.stack()[1][2]
+
+
+def caller_info_using_getframe():
+    return sys._getframe(1).f_lineno
+
+
+def run(number):
+
+    LOG = get_logging_handle("benchmark")
+    CustomLogging.set_verbose_level(logging.INFO)
+
+    # Enabled messages are written to devnull, to measure logging overhead only
+    devnull = open(os.devnull, "w")
+    LOG._ch1.setStream(devnull)
+
+    cases = [
+        ("LOG.debug (disabled level)", lambda: LOG.debug("benchmark message")),
+        ("LOG.info (enabled level)", lambda: LOG.info("benchmark message")),
+        ("caller info: inspect.stack()", caller_info_using_inspect),
+        ("caller info: sys._getframe()", caller_info_using_getframe),
+    ]
+
+    print("{:<32} {:>14}".format("CASE", "PER CALL (us)"))
+    for name, func in cases:
+        duration = min(timeit.repeat(func, number=number, repeat=3))
+        print("{:<32} {:>14.2f}".format(name, duration / number * 1e6))
+
+    devnull.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CustomLogging benchmark")
+    parser.add_argument("--number", type=int, default=20000, help="calls per case")
+    args = parser.parse_args()
+    run(args.number)
+
+
+if __name__ == "__main__":
+    main()
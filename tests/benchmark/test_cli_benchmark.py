@@ -0,0 +1,117 @@
+"""End to end benchmarks of cli commands, run against the mock Prism Central
+server. Every command runs in a new process, as invoked by users.
+
+Usage:
+    py.test tests/benchmark/test_cli_benchmark.py --benchmark-only
+
+Size of the inventory and latency of the server can be changed using
+CALM_BENCHMARK_PROJECTS, CALM_BENCHMARK_APPS and CALM_BENCHMARK_LATENCY
+environment variables.
+"""
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+from tests.mock_server import MockPCServer, Inventory
+
+pytest.importorskip("pytest_benchmark")
+
+BP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "existing_vm_bp.py")
+CALM_CMD = "import sys; sys.argv[0] = 'calm'; from calm.dsl.console import main; main()"
+
+ROUNDS = 3
+
+
+@pytest.fixture(scope="module")
+def mock_server():
+
+    inventory = Inventory(
+        projects=int(os.environ.get("CALM_BENCHMARK_PROJECTS", 50)),
+        apps=int(os.environ.get("CALM_BENCHMARK_APPS", 200)),
+    )
+    latency = float(os.environ.get("CALM_BENCHMARK_LATENCY", 0.01))
+    with MockPCServer(inventory, latency=latency) as server:
+        yield server
+
+
+@pytest.fixture(scope="module")
+def calm_env(mock_server, tmp_path_factory):
+    """returns environment of cli processes, using a new home dir so that the
+    config and cache of user are not touched"""
+
+    home_dir = str(tmp_path_factory.mktemp("home"))
+    env = dict(
+        os.environ,
+        HOME=home_dir,
+        CALM_DSL_PC_IP=mock_server.host,
+        CALM_DSL_PC_PORT=str(mock_server.port),
+        CALM_DSL_PC_USERNAME="admin",
+        CALM_DSL_PC_PASSWORD="admin",
+        CALM_DSL_DEFAULT_PROJECT="default",
+        # Every run starts a new process, without warm state of daemon
+        CALM_DSL_NO_DAEMON="1",
+    )
+    for key in [
+        "CALM_DSL_CONFIG_FILE_LOCATION",
+        "CALM_DSL_LOCAL_DIR_LOCATION",
+        "CALM_DSL_DB_LOCATION",
+    ]:
+        env.pop(key, None)
+
+    run_calm(env, "update", "cache")
+    return env
+
+
+def run_calm(env, *args):
+    result = subprocess.run(
+        [sys.executable, "-c", CALM_CMD] + list(args),
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+    )
+    assert result.returncode == 0, result.stdout
+    return result.stdout
+
+
+def test_update_cache(benchmark, calm_env):
+
+    benchmark.pedantic(run_calm, args=(calm_env, "update", "cache"), rounds=ROUNDS)
+
+
+def test_get_apps(benchmark, calm_env):
+
+    output = benchmark.pedantic(
+        run_calm, args=(calm_env, "get", "apps", "--all-items"), rounds=ROUNDS
+    )
+    assert "app_0" in output
+
+
+def test_create_bp(benchmark, calm_env):
+
+    names = iter("bench_bp_{}".format(i) for i in range(ROUNDS))
+
+    def setup():
+        return (calm_env, "create", "bp", "-f", BP_FILE, "-n", next(names)), {}
+
+    output = benchmark.pedantic(run_calm, setup=setup, rounds=ROUNDS)
+    assert "created successfully" in output
+
+
+def test_watch_action_runlog(benchmark, calm_env, mock_server):
+
+    inventory = mock_server.inventory
+    app = inventory.get_records("apps")[0]
+    action_runlog = inventory.app_runlogs[app.uuid][0]
+
+    def setup():
+        # Action runs again, for every round
+        inventory.reset_runlogs()
+        args = ("watch", "action_runlog", action_runlog.uuid, "--app")
+        return (calm_env,) + args + (app.entity["metadata"]["name"], "-p", "1"), {}
+
+    output = benchmark.pedantic(run_calm, setup=setup, rounds=ROUNDS)
+    assert "Action ran successfully" in output
@@ -0,0 +1,4 @@
+from .inventory import Inventory
+from .server import MockPCServer
+
+__all__ = ["Inventory", "MockPCServer"]
@@ -0,0 +1,49 @@
+"""Runs the mock Prism Central server, until interrupted.
+
+Usage:
+    python -m tests.mock_server [--port 9440] [--projects 100] [--latency 0.05]
+"""
+
+import time
+import argparse
+
+from .inventory import Inventory
+from .server import MockPCServer
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9440)
+    parser.add_argument("--latency", type=float, default=0.0, help="in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    for kind in ["accounts", "projects", "subnets", "images", "users", "apps"]:
+        parser.add_argument("--{}".format(kind), type=int)
+    args = parser.parse_args()
+
+    counts = {
+        kind: getattr(args, kind)
+        for kind in ["accounts", "projects", "subnets", "images", "users", "apps"]
+        if getattr(args, kind) is not None
+    }
+    server = MockPCServer(
+        Inventory(seed=args.seed, **counts),
+        latency=args.latency,
+        error_rate=args.error_rate,
+        host=args.host,
+        port=args.port,
+    )
+
+    with server:
+        print("Serving mock Prism Central at {}:{}".format(server.host, server.port))
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
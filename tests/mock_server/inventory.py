@@ -0,0 +1,428 @@
+import time
+import uuid
+import random
+
+
+# Calm version reported by the server. Cache tables and commands requiring a
+# later version are skipped by the client.
+CALM_VERSION = "3.7.0"
+PC_VERSION = "pc.2023.1"
+
+
+class Record:
+    """Entity served by the mock server, along with the attributes used to
+    filter it in list calls"""
+
+    def __init__(self, entity, **attrs):
+        self.entity = entity
+        self.attrs = attrs
+
+    @property
+    def uuid(self):
+        return self.entity["metadata"]["uuid"]
+
+
+class Inventory:
+    """Synthetic inventory of a Prism Central, with configurable size.
+
+    Entities are kept per kind, the resource type used in api urls (`accounts`,
+    `projects`, `nutanix/v1/subnets` etc.). Kinds not generated here are
+    served as empty lists.
+    """
+
+    def __init__(
+        self,
+        accounts=1,
+        clusters=2,
+        projects=10,
+        subnets=20,
+        images=20,
+        users=20,
+        apps=50,
+        runlogs=5,
+        runlog_polls=2,
+        seed=0,
+    ):
+        self.counts = {
+            "accounts": accounts,
+            "clusters": clusters,
+            "projects": projects,
+            "subnets": subnets,
+            "images": images,
+            "users": users,
+            "apps": apps,
+            "runlogs": runlogs,
+        }
+        # Polls of app runlogs, after which running runlogs succeed
+        self.runlog_polls = runlog_polls
+        self.random = random.Random(seed)
+        self.start_usecs = int(time.time() * 1000000)
+        self._usecs = self.start_usecs
+        self.kinds = {}
+        self.app_runlogs = {}
+        self.generate()
+
+    def new_uuid(self):
+        return str(uuid.UUID(int=self.random.getrandbits(128), version=4))
+
+    def next_usecs(self):
+        """returns increasing timestamps, so that every entity has a distinct
+        last_update_time"""
+
+        self._usecs += 1000
+        return self._usecs
+
+    def make_entity(self, kind, name, resources, state="COMPLETE", **metadata):
+        update_usecs = self.next_usecs()
+        entity = {
+            "api_version": "3.1",
+            "metadata": {
+                "kind": kind,
+                "name": name,
+                "uuid": self.new_uuid(),
+                "spec_version": 0,
+                "creation_time": str(update_usecs),
+                "last_update_time": str(update_usecs),
+                "owner_reference": {"kind": "user", "name": "admin", "uuid": ""},
+                "categories": {},
+            },
+            "spec": {"name": name, "resources": dict(resources)},
+            "status": {"name": name, "state": state, "resources": resources},
+        }
+        entity["metadata"].update(metadata)
+        return entity
+
+    def add(self, kind, entity, **attrs):
+        attrs.setdefault("name", entity["status"]["name"])
+        attrs.setdefault("state", entity["status"].get("state"))
+        record = Record(entity, **attrs)
+        self.kinds.setdefault(kind, []).append(record)
+        return record
+
+    def get_records(self, kind):
+        return self.kinds.get(kind, [])
+
+    def get_record(self, kind, entity_uuid):
+        for record in self.get_records(kind):
+            if record.uuid == entity_uuid:
+                return record
+        return None
+
+    def remove(self, kind, entity_uuid):
+        record = self.get_record(kind, entity_uuid)
+        if record:
+            self.kinds[kind].remove(record)
+        return record
+
+    def reset_runlogs(self):
+        """marks all app runlogs as running, so that actions can be watched again"""
+
+        for records in self.app_runlogs.values():
+            for record in records:
+                record.entity["status"]["state"] = "RUNNING"
+                record.attrs.pop("polls", None)
+
+    @staticmethod
+    def ref(record, kind):
+        return {
+            "kind": kind,
+            "name": record.entity["status"]["name"],
+            "uuid": record.uuid,
+        }
+
+    def generate(self):
+        counts = self.counts
+
+        directory = self.add_directory_service()
+        self.add_role()
+
+        pc_accounts = [
+            self.add_pc_account(i, host_pc=(i == 0)) for i in range(counts["accounts"])
+        ]
+
+        account_subnets = {}
+        for account in pc_accounts:
+            account_uuid = account.uuid
+            clusters = account.entity["status"]["resources"]["data"][
+                "cluster_account_reference_list"
+            ]
+            subnets = []
+            for i in range(counts["subnets"]):
+                cluster = clusters[i % len(clusters)]
+                subnets.append(self.add_subnet(account_uuid, cluster, i))
+            account_subnets[account_uuid] = subnets
+
+            for i in range(counts["images"]):
+                self.add_image(account_uuid, i)
+
+        # Owner of the entities created by cli, logged in as admin
+        self.add_user(directory, "admin", "Admin")
+        users = [
+            self.add_user(directory, "user{}@demo.local".format(i), "User {}".format(i))
+            for i in range(counts["users"])
+        ]
+        self.add_user_group(directory)
+
+        projects = []
+        for i in range(counts["projects"]):
+            account = pc_accounts[i % len(pc_accounts)]
+            projects.append(
+                self.add_project(i, account, account_subnets[account.uuid], users)
+            )
+
+        blueprint = self.add_blueprint("SampleBlueprint", projects[0])
+        for i in range(counts["apps"]):
+            self.add_app(i, projects[i % len(projects)], blueprint)
+
+    def add_directory_service(self):
+        entity = self.make_entity(
+            "directory_service",
+            "demo_directory",
+            {
+                "domain_name": "demo.local",
+                "url": "ldap://10.0.0.2:389",
+                "directory_type": "ACTIVE_DIRECTORY",
+            },
+        )
+        return self.add("directory_services", entity)
+
+    def add_role(self):
+        entity = self.make_entity(
+            "role", "Project Admin", {"permission_reference_list": []}
+        )
+        return self.add("roles", entity)
+
+    def add_pc_account(self, index, host_pc=False):
+        name = "NTNX_LOCAL_AZ" if host_pc else "pc_account_{}".format(index)
+        cluster_accounts = []
+        for i in range(self.counts["clusters"]):
+            cluster_accounts.append(
+                {
+                    "kind": "account",
+                    "uuid": self.new_uuid(),
+                    "name": "{}_cluster_{}".format(name, i),
+                    "resources": {
+                        "data": {
+                            "cluster_uuid": self.new_uuid(),
+                            "cluster_name": "{}_cluster_{}".format(name, i),
+                        }
+                    },
+                }
+            )
+
+        entity = self.make_entity(
+            "account",
+            name,
+            {
+                "type": "nutanix_pc",
+                "state": "VERIFIED",
+                "data": {
+                    "host_pc": host_pc,
+                    "server": "10.0.0.1",
+                    "port": 9440,
+                    "cluster_account_reference_list": cluster_accounts,
+                },
+            },
+            state="VERIFIED",
+        )
+        account = self.add("accounts", entity, type="nutanix_pc")
+
+        for cluster_account in cluster_accounts:
+            cluster_data = cluster_account["resources"]["data"]
+
+            # PE account of cluster
+            pe_entity = self.make_entity(
+                "account",
+                cluster_account["name"],
+                {
+                    "type": "nutanix",
+                    "state": "VERIFIED",
+                    "data": {"pc_account_uuid": account.uuid},
+                },
+                state="VERIFIED",
+            )
+            pe_entity["metadata"]["uuid"] = cluster_account["uuid"]
+            self.add("accounts", pe_entity, type="nutanix")
+
+            cluster_entity = self.make_entity(
+                "cluster", cluster_data["cluster_name"], {"config": {}}
+            )
+            cluster_entity["metadata"]["uuid"] = cluster_data["cluster_uuid"]
+            self.add("nutanix/v1/clusters", cluster_entity, account_uuid=account.uuid)
+
+        return account
+
+    def add_subnet(self, account_uuid, cluster_account, index):
+        cluster_data = cluster_account["resources"]["data"]
+        entity = self.make_entity(
+            "subnet",
+            "vlan.{}".format(index),
+            {"subnet_type": "VLAN", "vlan_id": index},
+        )
+        entity["status"]["cluster_reference"] = {
+            "kind": "cluster",
+            "name": cluster_data["cluster_name"],
+            "uuid": cluster_data["cluster_uuid"],
+        }
+        return self.add(
+            "nutanix/v1/subnets",
+            entity,
+            account_uuid=account_uuid,
+            cluster_name=cluster_data["cluster_name"],
+        )
+
+    def add_image(self, account_uuid, index):
+        entity = self.make_entity(
+            "image",
+            "image_{}.qcow2".format(index),
+            {"image_type": "DISK_IMAGE"},
+        )
+        return self.add("nutanix/v1/images", entity, account_uuid=account_uuid)
+
+    def add_user(self, directory, name, display_name):
+        entity = self.make_entity(
+            "user",
+            name,
+            {
+                "display_name": display_name,
+                "directory_service_user": {
+                    "user_principal_name": name,
+                    "directory_service_reference": self.ref(
+                        directory, "directory_service"
+                    ),
+                },
+            },
+        )
+        return self.add("users", entity)
+
+    def add_user_group(self, directory):
+        name = "cn=demo_group,dc=demo,dc=local"
+        entity = self.make_entity(
+            "user_group",
+            name,
+            {
+                "display_name": "demo_group",
+                "directory_service_user_group": {
+                    "distinguished_name": name,
+                    "directory_service_reference": self.ref(
+                        directory, "directory_service"
+                    ),
+                },
+            },
+        )
+        return self.add("user_groups", entity)
+
+    def add_project(self, index, account, subnets, users):
+        name = "default" if index == 0 else "project_{}".format(index)
+        project_users = users[: min(len(users), 5)]
+        account_ref = self.ref(account, "account")
+        resources = {
+            "account_reference_list": [account_ref],
+            "default_subnet_reference": self.ref(subnets[0], "subnet"),
+            "subnet_reference_list": [self.ref(subnet, "subnet") for subnet in subnets],
+            "external_network_list": [],
+            "cluster_reference_list": [],
+            "vpc_reference_list": [],
+            "user_reference_list": [self.ref(user, "user") for user in project_users],
+            "external_user_group_reference_list": [],
+            "environment_reference_list": [],
+            "tunnel_reference_list": [],
+        }
+        entity = self.make_entity("project", name, resources)
+        project = self.add("projects", entity)
+
+        # Environments share the subnets, a few per environment
+        env_subnets = [subnets[(index + i) % len(subnets)] for i in range(3)]
+        environment = self.make_entity(
+            "environment",
+            "{}_environment".format(name),
+            {
+                "infra_inclusion_list": [
+                    {
+                        "type": "nutanix_pc",
+                        "account_reference": account_ref,
+                        "subnet_references": [
+                            {"uuid": subnet.uuid} for subnet in env_subnets
+                        ],
+                        "cluster_references": [],
+                        "vpc_references": [],
+                        "default_subnet_reference": {"uuid": env_subnets[0].uuid},
+                    }
+                ],
+                "substrate_definition_list": [],
+                "credential_definition_list": [],
+            },
+            project_reference=self.ref(project, "project"),
+        )
+        environment = self.add("environments", environment)
+
+        env_ref = self.ref(environment, "environment")
+        for project_resources in [entity["spec"]["resources"], resources]:
+            project_resources["environment_reference_list"] = [env_ref]
+            project_resources["default_environment_reference"] = env_ref
+        return project
+
+    def add_blueprint(self, name, project, resources=None, state="ACTIVE"):
+        entity = self.make_entity(
+            "blueprint",
+            name,
+            resources or {"app_profile_list": [], "service_definition_list": []},
+            state=state,
+            project_reference=self.ref(project, "project"),
+        )
+        return self.add("blueprints", entity)
+
+    def add_app(self, index, project, blueprint):
+        entity = self.make_entity(
+            "app",
+            "app_{}".format(index),
+            {
+                "app_blueprint_reference": self.ref(blueprint, "blueprint"),
+                "app_profile_config_reference": {"name": "Default"},
+                "action_list": [],
+                "deployment_list": [],
+            },
+            state="running",
+            project_reference=self.ref(project, "project"),
+        )
+        entity["status"]["uuid"] = entity["metadata"]["uuid"]
+        app = self.add("apps", entity, _state="running")
+
+        # Action runlog, with task runlogs of the action
+        action_runlog = self.add_runlog(app, "action_runlog", "create")
+        for i in range(self.counts["runlogs"]):
+            self.add_runlog(
+                app, "task_runlog", "Task{}".format(i), parent=action_runlog
+            )
+        return app
+
+    def add_runlog(self, app, runlog_type, name, parent=None):
+        update_usecs = self.next_usecs()
+        runlog_uuid = self.new_uuid()
+        root_uuid = parent.uuid if parent else runlog_uuid
+        entity = {
+            "metadata": {
+                "kind": "app_runlog",
+                "uuid": runlog_uuid,
+                "creation_time": str(update_usecs),
+                "last_update_time": str(update_usecs),
+            },
+            "status": {
+                "type": runlog_type,
+                "state": "RUNNING",
+                "action_reference": {"name": name},
+                "task_reference": {"name": name},
+                "application_reference": {"uuid": app.uuid},
+                "parent_reference": {"uuid": parent.uuid if parent else app.uuid},
+                "root_reference": {"uuid": root_uuid},
+            },
+        }
+        # Runlogs of action are listed by root_reference, excluding action runlog
+        record = Record(
+            entity,
+            type=runlog_type,
+            application_reference=app.uuid,
+            root_reference=parent.uuid if parent else None,
+        )
+        self.app_runlogs.setdefault(app.uuid, []).append(record)
+        return record
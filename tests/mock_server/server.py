@@ -0,0 +1,367 @@
+import os
+import re
+import ssl
+import copy
+import json
+import time
+import random
+import shutil
+import tempfile
+import threading
+import subprocess
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from .inventory import Inventory, CALM_VERSION, PC_VERSION
+
+API_PREFIX = r"^/api/(?:nutanix/v3|calm/v3\.0)/"
+UUID = r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+
+# Default page size of list apis, when length is not given
+DEFAULT_LENGTH = 20
+
+
+def get_ssl_context(host):
+    """returns server ssl context, using a self-signed certificate generated
+    by openssl for the host"""
+
+    cert_dir = tempfile.mkdtemp(prefix="calm_mock_server_")
+    cert_file = os.path.join(cert_dir, "cert.pem")
+    key_file = os.path.join(cert_dir, "key.pem")
+    try:
+        subprocess.run(
+            [
+                "openssl",
+                "req",
+                "-x509",
+                "-newkey",
+                "rsa:2048",
+                "-nodes",
+                "-days",
+                "1",
+                "-subj",
+                "/CN={}".format(host),
+                "-keyout",
+                key_file,
+                "-out",
+                cert_file,
+            ],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        ssl_context.load_cert_chain(cert_file, key_file)
+    finally:
+        shutil.rmtree(cert_dir, ignore_errors=True)
+
+    return ssl_context
+
+
+def parse_filter(filter_query):
+    """returns filter string (`a==1;(b==2,b==3);c!=4`) as list of AND clauses,
+    each being a list of OR conditions (key, operator, value)"""
+
+    clauses = []
+    for clause in (filter_query or "").split(";"):
+        clause = clause.strip().strip("()")
+        if not clause:
+            continue
+
+        conditions = []
+        for condition in clause.split(","):
+            match = re.match(r"^\(?([\w.]+)(==|!=|=~)(.*?)\)?$", condition.strip())
+            if match:
+                conditions.append(match.groups())
+        if conditions:
+            clauses.append(conditions)
+
+    return clauses
+
+
+def match_value(operator, expected, actual):
+    actual = "" if actual is None else str(actual)
+    if operator == "=~" or ".*" in expected:
+        matched = re.search(expected, actual, re.IGNORECASE) is not None
+    else:
+        # `type==A|B` matches any of the values
+        matched = actual.lower() in [value.lower() for value in expected.split("|")]
+
+    return not matched if operator == "!=" else matched
+
+
+def match_filter(record, clauses):
+    """returns True if record matches all clauses. Conditions on attributes
+    not known for the record are ignored"""
+
+    attrs = dict(record.attrs, _entity_id_=record.uuid)
+    for conditions in clauses:
+        known = [cond for cond in conditions if cond[0] in attrs]
+        if known and not any(
+            match_value(operator, value, attrs[key]) for key, operator, value in known
+        ):
+            return False
+    return True
+
+
+class MockPCApp:
+    """Handles the api calls made by calm.dsl.api clients, using inventory"""
+
+    def __init__(self, inventory, latency=0.0, error_rate=0.0, seed=0):
+        self.inventory = inventory
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.routes = [
+            ("GET", r"^/apps/version$", self.get_calm_version),
+            (
+                "GET",
+                r"^/PrismGateway/services/rest/v1/cluster/version$",
+                self.get_pc_version,
+            ),
+            (
+                "POST",
+                API_PREFIX + r"apps/(?P<uuid>{})/app_runlogs/list$".format(UUID),
+                self.list_app_runlogs,
+            ),
+            ("POST", API_PREFIX + r"blueprints/import_json$", self.create_blueprint),
+            ("POST", API_PREFIX + r"(?P<kind>[\w/]+)/list$", self.list_entities),
+            (
+                "GET",
+                API_PREFIX + r"(?P<kind>[\w/]+)/(?P<uuid>{})$".format(UUID),
+                self.read_entity,
+            ),
+            (
+                "PUT",
+                API_PREFIX + r"(?P<kind>[\w/]+)/(?P<uuid>{})$".format(UUID),
+                self.update_entity,
+            ),
+            (
+                "DELETE",
+                API_PREFIX + r"(?P<kind>[\w/]+)/(?P<uuid>{})$".format(UUID),
+                self.delete_entity,
+            ),
+        ]
+
+    def dispatch(self, method, path, body):
+        """returns (status, response body) of the api call"""
+
+        with self.lock:
+            self.request_count += 1
+            inject_error = self.random.random() < self.error_rate
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if inject_error:
+            return 500, {"code": 500, "message_list": [{"message": "Injected error"}]}
+
+        path = path.split("?", 1)[0]
+        for route_method, pattern, handler in self.routes:
+            if route_method != method:
+                continue
+            match = re.match(pattern, path)
+            if match:
+                with self.lock:
+                    return handler(body, **match.groupdict())
+
+        return 404, {"code": 404, "message_list": [{"message": "Not found"}]}
+
+    def get_calm_version(self, body):
+        return 200, CALM_VERSION
+
+    def get_pc_version(self, body):
+        return 200, {"version": PC_VERSION}
+
+    @staticmethod
+    def get_page(records, body):
+        clauses = parse_filter(body.get("filter"))
+        records = [record for record in records if match_filter(record, clauses)]
+
+        if body.get("sort_attribute") == "_last_update_timestamp_usecs_":
+            records = sorted(
+                records,
+                key=lambda record: int(record.entity["metadata"]["last_update_time"]),
+                reverse=body.get("sort_order") == "DESCENDING",
+            )
+
+        offset = int(body.get("offset") or 0)
+        length = int(body.get("length") or DEFAULT_LENGTH)
+        entities = [
+            copy.deepcopy(record.entity) for record in records[offset : offset + length]
+        ]
+        return {
+            "api_version": "3.1",
+            "metadata": {
+                "kind": body.get("kind", ""),
+                "total_matches": len(records),
+                "length": len(entities),
+                "offset": offset,
+            },
+            "entities": entities,
+        }
+
+    def list_entities(self, body, kind):
+        return 200, self.get_page(self.inventory.get_records(kind), body)
+
+    def read_entity(self, body, kind, uuid):
+        record = self.inventory.get_record(kind, uuid)
+        if record is None:
+            return 404, {"code": 404, "message_list": [{"message": "Not found"}]}
+        return 200, copy.deepcopy(record.entity)
+
+    def update_entity(self, body, kind, uuid):
+        record = self.inventory.get_record(kind, uuid)
+        if record is None:
+            return 404, {"code": 404, "message_list": [{"message": "Not found"}]}
+
+        entity = record.entity
+        entity["spec"] = body.get("spec", entity["spec"])
+        entity["metadata"].update(body.get("metadata", {}))
+        entity["metadata"]["spec_version"] += 1
+        entity["metadata"]["last_update_time"] = str(self.inventory.next_usecs())
+        entity["status"]["resources"] = copy.deepcopy(entity["spec"]["resources"])
+        if entity["status"]["state"] == "DRAFT":
+            entity["status"]["state"] = "ACTIVE"
+        return 200, copy.deepcopy(entity)
+
+    def delete_entity(self, body, kind, uuid):
+        record = self.inventory.remove(kind, uuid)
+        if record is None:
+            return 404, {"code": 404, "message_list": [{"message": "Not found"}]}
+        return 202, {"status": {"state": "DELETE_PENDING"}}
+
+    def create_blueprint(self, body):
+        spec = body["spec"]
+        project = self.inventory.get_records("projects")[0]
+        project_reference = body["metadata"].get(
+            "project_reference", self.inventory.ref(project, "project")
+        )
+        record = self.inventory.add_blueprint(
+            spec["name"],
+            project,
+            resources=copy.deepcopy(spec["resources"]),
+            state="DRAFT",
+        )
+        record.entity["metadata"]["project_reference"] = project_reference
+        record.entity["spec"]["description"] = spec.get("description", "")
+        return 200, copy.deepcopy(record.entity)
+
+    def list_app_runlogs(self, body, uuid):
+        records = self.inventory.app_runlogs.get(uuid, [])
+        page = self.get_page(records, dict(body, length=body.get("length", 250)))
+
+        # Runlogs run on every poll, and succeed after runlog_polls polls
+        for record in records:
+            status = record.entity["status"]
+            if status["state"] != "RUNNING":
+                continue
+            record.attrs["polls"] = record.attrs.get("polls", 0) + 1
+            if record.attrs["polls"] >= self.inventory.runlog_polls:
+                status["state"] = "SUCCESS"
+                record.entity["metadata"]["last_update_time"] = str(
+                    self.inventory.next_usecs()
+                )
+        return 200, page
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    def handle_request(self, method):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = {}
+        if length:
+            data = self.rfile.read(length)
+            try:
+                body = json.loads(data)
+            except ValueError:
+                # Multipart uploads are not parsed
+                body = {}
+
+        status, response = self.server.app.dispatch(method, self.path, body)
+        if isinstance(response, str):
+            data = response.encode("utf-8")
+            content_type = "text/plain"
+        else:
+            data = json.dumps(response).encode("utf-8")
+            content_type = "application/json"
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def do_PUT(self):
+        self.handle_request("PUT")
+
+    def do_DELETE(self):
+        self.handle_request("DELETE")
+
+    def log_message(self, format, *args):
+        # Requests are not logged, to keep benchmark output clean
+        pass
+
+
+class MockPCServer:
+    """Local https server standing in for Prism Central, serving the
+    `api/nutanix/v3` and `api/calm/v3.0` apis from a synthetic inventory.
+
+    latency (seconds) is added to every request, and error_rate is the
+    fraction of requests failing with status 500.
+
+    Usage:
+        with MockPCServer(Inventory(projects=100), latency=0.05) as server:
+            # point CALM_DSL_PC_IP/CALM_DSL_PC_PORT to server.host/server.port
+    """
+
+    def __init__(
+        self, inventory=None, latency=0.0, error_rate=0.0, host="127.0.0.1", port=0
+    ):
+        self.app = MockPCApp(inventory or Inventory(), latency, error_rate)
+        self._httpd = ThreadingHTTPServer((host, port), _RequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.app = self.app
+
+        ssl_context = get_ssl_context(host)
+        self._httpd.socket = ssl_context.wrap_socket(
+            self._httpd.socket, server_side=True
+        )
+        self._thread = None
+
+    @property
+    def inventory(self):
+        return self.app.inventory
+
+    @property
+    def host(self):
+        return self._httpd.server_address[0]
+
+    @property
+    def port(self):
+        return self._httpd.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
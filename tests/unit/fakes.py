@@ -0,0 +1,34 @@
+"""
+Fakes shared by unit tests
+"""
+
+
+class Response:
+    """response of api calls, with the given json body"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class FakeClient:
+    """api client having the given resource apis as attributes"""
+
+    def __init__(self, **apis):
+        for name, api in apis.items():
+            setattr(self, name, api)
+
+
+class FakeTime:
+    """time module whose sleep advances the monotonic clock instantly"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
@@ -0,0 +1,135 @@
+import json
+import time
+import asyncio
+import email.utils
+
+import pytest
+
+from calm.dsl.api.resource import ResourceAPI
+from calm.dsl.api.async_connection import (
+    AsyncConnection,
+    AsyncResponse,
+    get_retry_delay,
+    RETRY_BACKOFF_MAX,
+)
+
+
+class FakeAsyncConnection:
+    """serves list api of total_matches entities, counting parallel requests"""
+
+    is_async = True
+
+    def __init__(self, total_matches):
+        self.total_matches = total_matches
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _call(self, endpoint, method="post", request_json=None, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        if not endpoint.endswith("/list"):
+            body = {"metadata": {"uuid": endpoint.split("/")[-1]}}
+        else:
+            offset = request_json.get("offset", 0)
+            end = min(offset + request_json["length"], self.total_matches)
+            body = {
+                "metadata": {"total_matches": self.total_matches},
+                "entities": [{"id": i} for i in range(offset, end)],
+            }
+
+        return AsyncResponse(endpoint, 200, {}, json.dumps(body).encode()), None
+
+
+def test_resource_api_is_awaitable_for_async_connection():
+
+    connection = FakeAsyncConnection(total_matches=95)
+    api = ResourceAPI(connection, "apps")
+
+    async def run():
+        res, err = await api.read("app-uuid")
+        assert err is None
+        assert res.json()["metadata"]["uuid"] == "app-uuid"
+
+        return await api.list_all(api_limit=10, concurrency=3)
+
+    entities = asyncio.run(run())
+    assert [entity["id"] for entity in entities] == list(range(95))
+    assert connection.max_in_flight == 3
+
+
+def test_composite_methods_raise_for_async_connection():
+
+    api = ResourceAPI(FakeAsyncConnection(total_matches=5), "apps")
+
+    for method in [api.get_name_uuid_map, api.get_uuid_name_map, api.iter_all]:
+        with pytest.raises(TypeError, match="not supported over async connection"):
+            method()
+
+
+class FakeSessionResponse:
+    def __init__(self, status, headers):
+        self.status = status
+        self.headers = headers
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def read(self):
+        return b"{}"
+
+
+class FakeSession:
+    """returns the given (status, headers) responses in order"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def request(self, method, url, **kwargs):
+        return FakeSessionResponse(*self.responses.pop(0))
+
+
+def test_retry_delay():
+
+    for retry_count in range(1, 5):
+        backoff = 0.5 * 2 ** (retry_count - 1)
+        assert backoff / 2 <= get_retry_delay(retry_count) <= backoff
+    assert get_retry_delay(20) <= RETRY_BACKOFF_MAX
+
+    assert get_retry_delay(1, {"Retry-After": "7"}) == 7
+    assert get_retry_delay(1, {"Retry-After": "100000"}) == RETRY_BACKOFF_MAX
+    retry_date = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 25 < get_retry_delay(1, {"Retry-After": retry_date}) <= 30
+
+
+def test_request_backs_off_between_retries(monkeypatch):
+
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+
+    # aiohttp is optional, so connection is built without a real session
+    connection = AsyncConnection.__new__(AsyncConnection)
+    connection.retries_enabled = True
+    connection.session = FakeSession(
+        [(503, {"Retry-After": "3"}), (500, {}), (429, {"Retry-After": "1"}), (200, {})]
+    )
+
+    res = asyncio.run(connection._request("GET", "https://pc/api"))
+    assert res.status_code == 200
+    assert delays[0] == 3 and 0.5 <= delays[1] <= 1 and delays[2] == 1
+
+    # Retries are exhausted after MAX_RETRIES
+    delays.clear()
+    connection.session = FakeSession([(503, {})] * 4)
+    res = asyncio.run(connection._request("GET", "https://pc/api"))
+    assert res.status_code == 503
+    assert len(delays) == 3
@@ -0,0 +1,75 @@
+import logging
+
+from calm.dsl.cli import batch_compile
+from calm.dsl.cli.batch_compile import get_dsl_files, init_worker, compile_worker
+
+RUNBOOK = """
+from calm.dsl.runbooks import runbook
+from calm.dsl.runbooks import RunbookTask as Task
+from calm.dsl.runbooks import CalmEndpoint as Endpoint
+
+Target = Endpoint.Linux.ip(["10.0.0.1"])
+
+
+@runbook
+def Runbook1(endpoints=[Target]):
+    Task.Exec.escript(name="Task1", script="print 1")
+"""
+
+ENDPOINT = """
+from calm.dsl.runbooks import CalmEndpoint as Endpoint
+
+Endpoint1 = Endpoint.Linux.ip(["10.0.0.1"])
+"""
+
+BLUEPRINT = """
+from calm.dsl.builtins import Blueprint
+
+
+class Bp1(Blueprint):
+    pass
+"""
+
+
+def test_get_dsl_files(tmp_path):
+
+    (tmp_path / "rbs").mkdir()
+    (tmp_path / "rbs" / "rb.py").write_text(RUNBOOK)
+    (tmp_path / "rbs" / "helper.py").write_text("X = 1\n")
+    (tmp_path / "ep.py").write_text(ENDPOINT)
+    (tmp_path / "bp.py").write_text(BLUEPRINT)
+    (tmp_path / "bad.py").write_text("def bad(:\n")
+
+    dsl_files = get_dsl_files([str(tmp_path)])
+    assert [(path[len(str(tmp_path)) + 1 :], type) for path, type in dsl_files] == [
+        ("bad.py", "unknown"),
+        ("bp.py", "blueprint"),
+        ("ep.py", "endpoint"),
+        ("rbs/rb.py", "runbook"),
+    ]
+
+    # Glob patterns, and files matched more than once
+    dsl_files = get_dsl_files(
+        [str(tmp_path / "rbs" / "*.py"), str(tmp_path / "**" / "rb.py")]
+    )
+    assert dsl_files == [(str(tmp_path / "rbs" / "rb.py"), "runbook")]
+
+
+def test_compile_worker_reports_errors(tmp_path):
+
+    bad_file = tmp_path / "bad.py"
+    bad_file.write_text("def bad(:\n")
+    out_file = tmp_path / "out" / "bad.json"
+
+    root_handlers = list(logging.getLogger().handlers)
+    try:
+        init_worker(None, logging.INFO, use_cache=False)
+        result = compile_worker(str(bad_file), "unknown", str(out_file), "json")
+    finally:
+        logging.getLogger().handlers = root_handlers
+        batch_compile._WORKER_STATE.clear()
+
+    assert result["status"] == "FAILED"
+    assert "bad.py, line 1" in result["error"]
+    assert result["output"] is None
+    assert not out_file.exists()
@@ -0,0 +1,115 @@
+import sys
+
+import pytest
+
+from calm.dsl.cli import apps, poller
+from tests.unit.fakes import Response, FakeClient, FakeTime
+
+
+class ApplicationApi:
+    ITEM = "api/nutanix/v3/apps/{}"
+
+    def __init__(self, apps_data):
+        self.apps_data = apps_data
+        self.runlog_polls = {}
+
+    def list_all(self, base_params=None):
+        return [
+            {"metadata": {"name": app["metadata"]["name"], "uuid": uuid}}
+            for uuid, app in self.apps_data.items()
+        ]
+
+    def read(self, uuid):
+        return Response(self.apps_data[uuid]), None
+
+    def run_action(self, app_id, action_id, payload):
+        return Response({"status": {"runlog_uuid": "runlog-" + app_id}}), None
+
+    def poll_action_run(self, url, payload):
+        runlog_uuid = payload["filter"].split("==")[1]
+        polls = self.runlog_polls.get(runlog_uuid, 0) + 1
+        self.runlog_polls[runlog_uuid] = polls
+        state = "SUCCESS" if polls > 2 else "RUNNING"
+        entities = [{"metadata": {"uuid": runlog_uuid}, "status": {"state": state}}]
+        return Response({"entities": entities}), None
+
+
+def get_app(name, action_names, config_type=None):
+    app = {
+        "metadata": {"name": name, "uuid": name + "-uuid"},
+        "spec": {
+            "resources": {
+                "action_list": [
+                    {
+                        "name": action_name,
+                        "uuid": action_name + "-uuid",
+                        "runbook": {"task_definition_list": []},
+                    }
+                    for action_name in action_names
+                ]
+            }
+        },
+        "status": {
+            "resources": {"snapshot_config_list": [], "restore_config_list": []}
+        },
+    }
+
+    # Actions call the config of given type
+    if config_type:
+        config = {"uuid": "config-uuid", "type": config_type}
+        app["status"]["resources"]["snapshot_config_list"].append(config)
+        for action in app["spec"]["resources"]["action_list"]:
+            action["runbook"]["task_definition_list"].append(
+                {
+                    "type": "CALL_CONFIG",
+                    "uuid": "task-uuid",
+                    "attrs": {"config_spec_reference": {"uuid": "config-uuid"}},
+                }
+            )
+
+    return app
+
+
+def test_bulk_action_runs_on_apps_in_file(tmp_path, monkeypatch, capsys):
+
+    apps_data = {
+        "app1-uuid": get_app("app1", ["action_restart"]),
+        "app2-uuid": get_app("app2", ["action_restart"]),
+        "app3-uuid": get_app("app3", ["action_start"]),
+        "app5-uuid": get_app("app5", ["action_restart"], "AHV_SNAPSHOT"),
+        "app6-uuid": get_app("app6", ["action_restart"]),
+    }
+    client = FakeClient(application=ApplicationApi(apps_data))
+    monkeypatch.setattr(apps, "get_api_client", lambda: client)
+
+    def get_action_runtime_args(app_uuid, **kwargs):
+        if app_uuid == "app6-uuid":
+            sys.exit(-1)
+        return []
+
+    monkeypatch.setattr(apps, "get_action_runtime_args", get_action_runtime_args)
+    monkeypatch.setattr(poller, "time", FakeTime())
+
+    apps_file = tmp_path / "apps.txt"
+    apps_file.write_text("app1\n# comment\napp2\n\napp3\napp4\napp5\napp6\n")
+
+    with pytest.raises(SystemExit):
+        apps.run_bulk_actions("restart", apps_file=str(apps_file), concurrency=2)
+
+    # All runlogs are polled till completion
+    assert client.application.runlog_polls == {
+        "runlog-app1-uuid": 3,
+        "runlog-app2-uuid": 3,
+    }
+
+    rows = {
+        line.split("|")[1].strip(): line.split("|")[3].strip()
+        for line in capsys.readouterr().out.splitlines()
+        if line.startswith("|") and "APP NAME" not in line
+    }
+    assert rows["app1"].endswith("SUCCESS")
+    assert rows["app2"].endswith("SUCCESS")
+    assert "No action found matching name restart" in rows["app3"]
+    assert rows["app4"].endswith("NOT FOUND")
+    assert "prompts for AHV_SNAPSHOT config values" in rows["app5"]
+    assert "SUBMIT FAILED" in rows["app6"]
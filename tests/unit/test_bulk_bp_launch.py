@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from calm.dsl.cli import bps, poller
+from tests.unit.fakes import Response, FakeClient, FakeTime
+
+
+class BlueprintApi:
+    def __init__(self):
+        self.polls = {}
+
+    def poll_launch(self, blueprint_uuid, request_id):
+        polls = self.polls.get(request_id, 0) + 1
+        self.polls[request_id] = polls
+        status = {"state": "pending"}
+        if polls > 2:
+            status = {"state": "success", "application_uuid": "app-" + request_id}
+        return Response({"status": status}), None
+
+
+def test_bulk_launch_from_manifest(tmp_path, monkeypatch):
+
+    client = FakeClient(blueprint=BlueprintApi())
+    fetched_blueprints = []
+
+    def get_blueprint(name):
+        fetched_blueprints.append(name)
+        if name == "missing_bp":
+            raise Exception("No blueprint found with name missing_bp")
+        return {"metadata": {"name": name, "uuid": name + "-uuid"}}
+
+    def launch_blueprint_simple(bp_name, app_name, **kwargs):
+        assert kwargs["wait_for_launch"] is False
+        assert kwargs["patch_editables"] == bool(kwargs["launch_params"])
+        return kwargs["blueprint"]["metadata"]["uuid"], "req-" + app_name
+
+    monkeypatch.setattr(bps, "get_api_client", lambda: client)
+    monkeypatch.setattr(bps, "get_blueprint", get_blueprint)
+    monkeypatch.setattr(bps, "launch_blueprint_simple", launch_blueprint_simple)
+    monkeypatch.setattr(poller, "time", FakeTime())
+
+    manifest_file = tmp_path / "manifest.csv"
+    manifest_file.write_text(
+        "blueprint,app_name,launch_params\n"
+        "bp1,env-1,params.py\n"
+        "bp1,,\n"
+        "missing_bp,env-3,\n"
+    )
+    output_file = tmp_path / "results.jsonl"
+
+    with pytest.raises(SystemExit):
+        bps.launch_blueprints_bulk(
+            manifest_file=str(manifest_file),
+            concurrency=2,
+            output_file=str(output_file),
+        )
+
+    # Blueprint is fetched once for all its launches
+    assert sorted(fetched_blueprints) == ["bp1", "missing_bp"]
+
+    results = {}
+    for line in output_file.read_text().splitlines():
+        result = json.loads(line)
+        results[result["app_name"]] = result
+
+    assert len(results) == 3
+    assert results["env-1"]["state"] == "success"
+    assert results["env-1"]["app_uuid"] == "app-req-env-1"
+    assert results["env-3"]["state"] == "failure"
+    assert results["env-3"]["error"] == "Blueprint missing_bp not found"
+
+    generated_name = [name for name in results if name.startswith("App-bp1-")]
+    assert len(generated_name) == 1
+    assert results[generated_name[0]]["state"] == "success"
+    assert set(client.blueprint.polls.values()) == {3}
@@ -0,0 +1,87 @@
+import gzip
+import json
+
+import pytest
+from peewee import SqliteDatabase
+
+from calm.dsl.db.handler import DB_PRAGMAS, DB_BUSY_TIMEOUT
+from calm.dsl.db.table_config import AhvSubnetsCache, VersionTable
+from calm.dsl.store import cache_snapshot
+from calm.dsl.store.cache_snapshot import export_snapshot, import_snapshot
+
+SERVER = {"pc_ip": "10.0.0.1", "pc_port": "9440"}
+
+
+def get_db(location):
+    return SqliteDatabase(location, pragmas=DB_PRAGMAS, timeout=DB_BUSY_TIMEOUT)
+
+
+def test_snapshot_round_trip(tmp_path):
+
+    cache_tables = {AhvSubnetsCache.get_cache_type(): AhvSubnetsCache}
+    snapshot_file = str(tmp_path / "cache.gz")
+
+    src_db = get_db(str(tmp_path / "src.db"))
+    with AhvSubnetsCache.bind_ctx(src_db), VersionTable.bind_ctx(src_db):
+        src_db.create_tables([AhvSubnetsCache, VersionTable])
+        for i in range(3):
+            AhvSubnetsCache.create(
+                name="subnet_{}".format(i), uuid=str(i), subnet_type="VLAN"
+            )
+        VersionTable.create(name="Calm", version="3.7.0")
+        AhvSubnetsCache.set_sync_marker(100)
+
+        row_counts = export_snapshot(snapshot_file, cache_tables, SERVER)
+        assert row_counts == {AhvSubnetsCache.get_cache_type(): 3}
+
+    with gzip.open(snapshot_file, "rt") as fd:
+        assert json.load(fd)["server"] == SERVER
+
+    dst_db = get_db(str(tmp_path / "dst.db"))
+    with AhvSubnetsCache.bind_ctx(dst_db), VersionTable.bind_ctx(dst_db):
+        dst_db.create_tables([AhvSubnetsCache, VersionTable])
+        AhvSubnetsCache.create(name="stale", uuid="stale", subnet_type="VLAN")
+
+        # Snapshot of other server is imported only if forced
+        with pytest.raises(SystemExit):
+            import_snapshot(snapshot_file, cache_tables, dict(SERVER, pc_port="1"))
+        assert AhvSubnetsCache.get(uuid="stale")
+
+        import_snapshot(snapshot_file, cache_tables, SERVER)
+        assert sorted(row.name for row in AhvSubnetsCache.select()) == [
+            "subnet_0",
+            "subnet_1",
+            "subnet_2",
+        ]
+        assert AhvSubnetsCache.get(uuid="1").subnet_type == "VLAN"
+        assert VersionTable.get(VersionTable.name == "Calm").version == "3.7.0"
+        assert AhvSubnetsCache.get_sync_marker() == 100
+
+
+def test_snapshot_version_rows_are_replaced_atomically(tmp_path, monkeypatch):
+
+    snapshot_file = str(tmp_path / "cache.gz")
+    db = get_db(str(tmp_path / "cache.db"))
+    with VersionTable.bind_ctx(db):
+        db.create_tables([VersionTable])
+        VersionTable.create(name="Calm", version="3.7.0")
+        export_snapshot(snapshot_file, {}, SERVER)
+
+        def interrupted_write(table, columns, rows):
+            raise KeyboardInterrupt
+
+        # Version rows are kept, if import is interrupted after their delete
+        monkeypatch.setattr(cache_snapshot, "write_table_rows", interrupted_write)
+        with pytest.raises(KeyboardInterrupt):
+            import_snapshot(snapshot_file, {}, SERVER)
+        assert VersionTable.get(VersionTable.name == "Calm").version == "3.7.0"
+
+
+def test_snapshot_format_version(tmp_path):
+
+    snapshot_file = str(tmp_path / "cache.gz")
+    with gzip.open(snapshot_file, "wt") as fd:
+        json.dump({"format_version": 0, "server": SERVER, "tables": {}}, fd)
+
+    with pytest.raises(SystemExit):
+        import_snapshot(snapshot_file, {}, SERVER)
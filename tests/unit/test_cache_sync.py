@@ -0,0 +1,221 @@
+import os
+import time
+import sqlite3
+import threading
+
+import pytest
+from peewee import SqliteDatabase, OperationalError
+
+from calm.dsl.db import handler
+from calm.dsl.db.handler import DB_PRAGMAS, DB_BUSY_TIMEOUT
+from calm.dsl.db.table_config import AhvSubnetsCache, VersionTable
+from calm.dsl.db.table_config import SHADOW_TABLE_SUFFIX
+from calm.dsl.store.cache_sync import CacheSyncScheduler
+
+
+def get_mock_table(cache_type, dependencies, events, fail=False):
+    class MockTable:
+        __cache_type__ = cache_type
+        sync_dependencies = dependencies
+
+        @classmethod
+        def sync(cls):
+            events.append(("start", cache_type, threading.current_thread().name))
+            time.sleep(0.05)
+            if fail:
+                raise Exception("{} sync failed".format(cache_type))
+            events.append(("end", cache_type))
+
+        @classmethod
+        def sync_table(cls, incremental=False):
+            cls.sync()
+
+    return MockTable
+
+
+def test_scheduler_respects_dependencies():
+
+    events = []
+    table_map = {
+        "account": get_mock_table("account", [], events),
+        "project": get_mock_table("project", ["account"], events),
+        "user": get_mock_table("user", [], events),
+        "environment": get_mock_table("environment", ["account", "missing"], events),
+    }
+
+    scheduler = CacheSyncScheduler(table_map, max_workers=4)
+    scheduler.run()
+
+    assert set(scheduler.timings.keys()) == set(table_map.keys())
+
+    end_index = {e[1]: i for i, e in enumerate(events) if e[0] == "end"}
+    start_index = {e[1]: i for i, e in enumerate(events) if e[0] == "start"}
+    assert start_index["project"] > end_index["account"]
+    assert start_index["environment"] > end_index["account"]
+
+    # Independent tables are synced concurrently
+    assert start_index["user"] < end_index["account"]
+
+
+def test_scheduler_stops_on_failure():
+
+    events = []
+    table_map = {
+        "account": get_mock_table("account", [], events, fail=True),
+        "project": get_mock_table("project", ["account"], events),
+    }
+
+    scheduler = CacheSyncScheduler(table_map, max_workers=2)
+    with pytest.raises(Exception):
+        scheduler.run()
+
+    assert "project" not in [e[1] for e in events]
+
+
+def test_scheduler_detects_cycles():
+
+    events = []
+    table_map = {
+        "a": get_mock_table("a", ["b"], events),
+        "b": get_mock_table("b", ["a"], events),
+    }
+
+    with pytest.raises(Exception):
+        CacheSyncScheduler(table_map, max_workers=2).run()
+
+
+def test_batch_writes_inserts_buffered_rows():
+
+    db = SqliteDatabase(":memory:")
+    with AhvSubnetsCache.bind_ctx(db):
+        db.create_tables([AhvSubnetsCache])
+
+        with AhvSubnetsCache.batch_writes():
+            for i in range(1200):
+                # Rows having different fields are inserted together
+                row = {"name": "subnet-{}".format(i), "uuid": str(i)}
+                if i % 2:
+                    row.update({"subnet_type": "VLAN", "cluster": "cluster"})
+                else:
+                    row.update({"subnet_type": "OVERLAY", "vpc": "vpc"})
+                AhvSubnetsCache.create(**row)
+
+            # Flushed in chunks, while block is active
+            assert AhvSubnetsCache.select().count() == 1000
+
+        assert AhvSubnetsCache.select().count() == 1200
+        subnet = AhvSubnetsCache.get(uuid="2")
+        assert subnet.cluster_id is None
+        assert subnet.vpc_id == "vpc"
+
+        # Buffered rows are discarded on failure
+        with pytest.raises(Exception):
+            with AhvSubnetsCache.batch_writes():
+                AhvSubnetsCache.create(name="subnet-x", uuid="x", subnet_type="VLAN")
+                raise Exception("sync failed")
+
+        assert AhvSubnetsCache.select().count() == 1200
+
+
+def test_shadow_table_sync(tmp_path):
+
+    db_location = str(tmp_path / "dsl.db")
+    db = SqliteDatabase(db_location, pragmas=DB_PRAGMAS, timeout=DB_BUSY_TIMEOUT)
+    with AhvSubnetsCache.bind_ctx(db), VersionTable.bind_ctx(db):
+        db.create_tables([AhvSubnetsCache, VersionTable])
+        AhvSubnetsCache.create(name="old", uuid="1", subnet_type="VLAN")
+
+        # Connection of another process
+        reader = sqlite3.connect(db_location)
+
+        def read_names():
+            rows = reader.execute("SELECT name FROM ahvsubnetscache").fetchall()
+            return [row[0] for row in rows]
+
+        with AhvSubnetsCache.shadow_table() as shadow_model:
+            shadow_model.create(name="new", uuid="2", subnet_type="VLAN")
+            assert read_names() == ["old"]
+
+            # Table model (used by other threads) reads the live table
+            assert [row.name for row in AhvSubnetsCache.select()] == ["old"]
+            assert [row.name for row in shadow_model.select()] == ["new"]
+
+        assert read_names() == ["new"]
+        assert AhvSubnetsCache.get(uuid="2").name == "new"
+        assert AhvSubnetsCache.get_shadow_table_names() == []
+        assert AhvSubnetsCache.get_cache_tables()["ahv_subnet"] is AhvSubnetsCache
+        assert "ahvsubnetscache_uuid" in [
+            index.name for index in db.get_indexes("ahvsubnetscache")
+        ]
+
+        # Table is not modified by failed sync
+        with pytest.raises(Exception):
+            with AhvSubnetsCache.shadow_table() as shadow_model:
+                shadow_model.create(name="failed", uuid="3", subnet_type="VLAN")
+                raise Exception("sync failed")
+
+        assert read_names() == ["new"]
+        assert AhvSubnetsCache.get_shadow_table_names() == []
+        assert db.execute_sql("PRAGMA journal_mode").fetchone()[0] == "wal"
+        reader.close()
+
+
+def test_concurrent_shadow_tables(tmp_path):
+
+    db = SqliteDatabase(str(tmp_path / "dsl.db"), pragmas=DB_PRAGMAS)
+    with AhvSubnetsCache.bind_ctx(db), VersionTable.bind_ctx(db):
+        db.create_tables([AhvSubnetsCache, VersionTable])
+        AhvSubnetsCache.create(name="old", uuid="1", subnet_type="VLAN")
+
+        # Shadow table of a killed process is dropped by next sync
+        stale_name = "ahvsubnetscache{}999999999_0".format(SHADOW_TABLE_SUFFIX)
+        db.execute_sql('CREATE TABLE "{}" (id INTEGER)'.format(stale_name))
+
+        # Syncs of other processes fill their own shadow tables
+        with AhvSubnetsCache.shadow_table() as first_model:
+            with AhvSubnetsCache.shadow_table() as second_model:
+                assert first_model._meta.table_name != second_model._meta.table_name
+                first_model.create(name="first", uuid="2", subnet_type="VLAN")
+                second_model.create(name="second", uuid="3", subnet_type="VLAN")
+                assert len(AhvSubnetsCache.get_shadow_table_names()) == 2
+
+            assert [row.name for row in AhvSubnetsCache.select()] == ["second"]
+            assert [row.name for row in first_model.select()] == ["first"]
+
+        assert [row.name for row in AhvSubnetsCache.select()] == ["first"]
+        assert AhvSubnetsCache.get_shadow_table_names() == []
+
+        # Table is not replaced, if shadow table is dropped by other process
+        with pytest.raises(Exception, match="dropped during sync"):
+            with AhvSubnetsCache.shadow_table() as shadow_model:
+                shadow_model.create(name="dropped", uuid="4", subnet_type="VLAN")
+                db.execute_sql('DROP TABLE "{}"'.format(shadow_model._meta.table_name))
+
+        assert [row.name for row in AhvSubnetsCache.select()] == ["first"]
+
+
+def test_clear_db(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(handler, "DB_BUSY_TIMEOUT", 0.1)
+    # Db of test process is not re-initialized
+    monkeypatch.setattr(handler, "dsl_database", SqliteDatabase(None))
+    db_location = str(tmp_path / "dsl.db")
+
+    # Locked db is not removed, as other process is using it
+    conn = sqlite3.connect(db_location)
+    conn.execute("CREATE TABLE data (id INTEGER)")
+    conn.execute("BEGIN IMMEDIATE")
+    with pytest.raises(OperationalError):
+        handler.clear_db(db_location)
+    assert os.path.exists(db_location)
+
+    conn.rollback()
+    handler.clear_db(db_location)
+    assert conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+    conn.close()
+
+    # Unreadable db is removed
+    with open(db_location, "wb") as fd:
+        fd.write(b"not a database" * 100)
+    handler.clear_db(db_location)
+    assert not os.path.exists(db_location)
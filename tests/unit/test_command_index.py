@@ -0,0 +1,101 @@
+import sys
+import importlib
+
+import click
+from click.testing import CliRunner
+
+from calm.dsl.cli.command_index import CommandIndex
+from calm.dsl.store import Version
+
+ROOT_MODULE = """
+import click
+from calm.dsl.cli.utils import FeatureFlagGroup
+
+@click.group(cls=FeatureFlagGroup)
+def root():
+    pass
+
+@root.group(cls=FeatureFlagGroup)
+def get():
+    pass
+"""
+
+APP_MODULE = """
+import click
+from .root import get
+
+@get.command("apps", feature_min_version="2.7.0")
+def get_apps():
+    click.echo("apps listed")
+"""
+
+LIBRARY_MODULE = """
+import click
+from .root import get
+
+@get.group("library")
+def library():
+    pass
+
+@library.command("tasks")
+def get_tasks():
+    click.echo("tasks listed")
+"""
+
+
+def load_root(package):
+    for module in [m for m in sys.modules if m.startswith(package)]:
+        sys.modules.pop(module)
+
+    return importlib.import_module("{}.root".format(package)).root
+
+
+def test_commands_are_loaded_lazily(tmp_path, monkeypatch):
+
+    package = "lazy_cli_pkg"
+    package_dir = tmp_path / package
+    package_dir.mkdir()
+    (package_dir / "__init__.py").write_text("")
+    (package_dir / "root.py").write_text(ROOT_MODULE)
+    (package_dir / "app_commands.py").write_text(APP_MODULE)
+    (package_dir / "library_commands.py").write_text(LIBRARY_MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    index_file = str(tmp_path / "index.json")
+    monkeypatch.setattr(
+        CommandIndex, "get_index_file", classmethod(lambda cls: index_file)
+    )
+    # Index of calm cli is restored after test
+    for attr in ["_index", "package", "root_group", "command_modules"]:
+        monkeypatch.setattr(CommandIndex, attr, getattr(CommandIndex, attr))
+    CommandIndex._index = None
+    command_modules = ["app_commands", "library_commands"]
+
+    # First run imports all the modules and persists the index
+    CommandIndex.init(load_root(package), package, command_modules)
+    assert CommandIndex._index is None
+    assert "{}.app_commands".format(package) in sys.modules
+
+    root = load_root(package)
+    CommandIndex.init(root, package, command_modules)
+    assert CommandIndex._index == {
+        "get": {"apps": "app_commands", "library": "library_commands"},
+        "get library": {"tasks": "library_commands"},
+    }
+    assert "{}.app_commands".format(package) not in sys.modules
+
+    ctx = click.Context(root)
+    get_group = root.get_command(ctx, "get")
+    assert get_group.list_commands(ctx) == ["apps", "library"]
+    assert "{}.library_commands".format(package) not in sys.modules
+
+    runner = CliRunner()
+    result = runner.invoke(root, ["get", "library", "tasks"])
+    assert result.output == "tasks listed\n"
+    assert "{}.app_commands".format(package) not in sys.modules
+
+    # Feature flag of command is checked after loading it
+    monkeypatch.setattr(Version, "get_version", lambda name: "2.9.0")
+    result = runner.invoke(root, ["get", "apps"])
+    assert result.output == "apps listed\n"
+    assert get_group.feature_version_map["apps"] == "2.7.0"
@@ -0,0 +1,151 @@
+import os
+import sys
+import threading
+
+from calm.dsl.tools import CompileCache, DependencyTracker, get_module_from_file
+
+
+ENTITY_FILE = """
+import os
+
+from calm.dsl.builtins.models.utils import read_env
+
+env = read_env(os.path.join(os.path.dirname(__file__), ".env"))
+with open(os.path.join(os.path.dirname(__file__), "script.sh")) as fd:
+    script = fd.read()
+
+PAYLOAD = {
+    "script": script,
+    "ip": os.environ.get("TEST_COMPILE_IP", ""),
+    "user": env.get("TEST_COMPILE_USER"),
+    "password": env.get("TEST_COMPILE_PASSWORD"),
+}
+"""
+
+
+def compile_entity(entity_dir):
+    """loads dsl like entity file, reading files and env, and returns the payload"""
+
+    return get_module_from_file(
+        "test_entity", os.path.join(entity_dir, "entity.py")
+    ).PAYLOAD
+
+
+def test_compile_cache_invalidated_by_dependencies(tmp_path, monkeypatch):
+
+    monkeypatch.delenv("TEST_COMPILE_IP", raising=False)
+    monkeypatch.delenv("TEST_COMPILE_PASSWORD", raising=False)
+    (tmp_path / "entity.py").write_text(ENTITY_FILE)
+    (tmp_path / "script.sh").write_text("echo 1")
+    (tmp_path / ".env").write_text("TEST_COMPILE_USER=root\n")
+
+    compile_cache = CompileCache(cache_dir=str(tmp_path / "cache"))
+
+    def get_payload():
+        payload = compile_cache.get("key")
+        if payload is None:
+            with DependencyTracker() as tracker:
+                payload = compile_entity(str(tmp_path))
+            compile_cache.set("key", payload, tracker)
+
+            # Tracking is stopped on exit
+            assert DependencyTracker.get_active() is None
+            assert os.environ is DependencyTracker.get_environ()
+        return payload
+
+    assert get_payload()["script"] == "echo 1"
+    assert compile_cache.get("key") == {
+        "script": "echo 1",
+        "ip": "",
+        "user": "root",
+        "password": None,
+    }
+
+    (tmp_path / "script.sh").write_text("echo 2")
+    assert compile_cache.get("key") is None
+    assert get_payload()["script"] == "echo 2"
+
+    # Variables read from os env, including unset ones, are dependencies
+    monkeypatch.setenv("TEST_COMPILE_IP", "10.0.0.1")
+    assert compile_cache.get("key") is None
+    assert get_payload()["ip"] == "10.0.0.1"
+
+    monkeypatch.setenv("TEST_COMPILE_PASSWORD", "secret")
+    assert compile_cache.get("key") is None
+    assert get_payload()["password"] == "secret"
+    assert compile_cache.get("key")["password"] == "secret"
+
+    # Values of env variables are not stored in cache
+    cache_files = os.listdir(str(tmp_path / "cache"))
+    assert cache_files == ["key.json"]
+    entry = (tmp_path / "cache" / "key.json").read_text()
+    assert "10.0.0.1" not in entry.split('"dependencies"')[1]
+
+    # Variables set in env file are not read from os env
+    monkeypatch.setenv("TEST_COMPILE_USER", "admin")
+    assert compile_cache.get("key")["user"] == "root"
+
+    (tmp_path / ".env").unlink()
+    assert compile_cache.get("key") is None
+
+
+def test_compile_cache_skips_uncacheable_payloads(tmp_path):
+
+    compile_cache = CompileCache(cache_dir=str(tmp_path / "cache"))
+
+    # Values fetched from server can change without any recorded dependency
+    with DependencyTracker() as tracker:
+        DependencyTracker.record_api_call()
+    compile_cache.set("api", {"vm_uuid": "1"}, tracker)
+    assert compile_cache.get("api") is None
+
+    credential = {
+        "name": "cred",
+        "secret": {"attrs": {"is_secret_modified": True}, "value": "password"},
+    }
+    variable = {"name": "var", "type": "SECRET", "value": "password"}
+    for payload in [{"credential_definition_list": [credential]}, {"vars": [variable]}]:
+        with DependencyTracker() as tracker:
+            pass
+        compile_cache.set("secret", payload, tracker)
+        assert compile_cache.get("secret") is None
+
+    # Secrets not given are stored
+    credential["secret"]["value"] = ""
+    compile_cache.set("secret", {"credential_definition_list": [credential]}, tracker)
+    assert compile_cache.get("secret") is not None
+
+
+def test_dependency_tracker_records_user_modules(tmp_path, monkeypatch):
+
+    (tmp_path / "data.txt").write_text("data")
+    (tmp_path / "old_helper.py").write_text("VALUE = 1\n")
+    (tmp_path / "new_helper.py").write_text(
+        "with open(__file__.replace('new_helper.py', 'data.txt')) as fd:\n"
+        "    DATA = fd.read()\n"
+    )
+    (tmp_path / "bp.py").write_text("from old_helper import VALUE\nimport new_helper\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "new_helper", raising=False)
+    monkeypatch.delitem(sys.modules, "old_helper", raising=False)
+
+    # Helper imported before tracking, is recorded as resolved by bp module
+    import old_helper  # noqa: F401
+
+    def read_env_in_thread():
+        os.environ.get("TEST_COMPILE_THREAD")
+
+    with DependencyTracker() as tracker:
+        get_module_from_file("test_bp", str(tmp_path / "bp.py"))
+
+        # Reads of other threads are not recorded
+        thread = threading.Thread(target=read_env_in_thread)
+        thread.start()
+        thread.join()
+
+    assert tracker.files == {
+        str(tmp_path / name)
+        for name in ["bp.py", "old_helper.py", "new_helper.py", "data.txt"]
+    }
+    assert "TEST_COMPILE_THREAD" not in tracker.env_vars
+    monkeypatch.delitem(sys.modules, "new_helper")
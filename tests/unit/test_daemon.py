@@ -0,0 +1,227 @@
+import os
+import json
+import sys
+import time
+import threading
+import subprocess
+
+import click
+import pytest
+
+import calm.dsl.cli
+from calm.dsl.db import handler
+from calm.dsl.cli.daemon import DaemonServer
+from calm.dsl.daemon_client import request_daemon, get_command_name, DAEMON_SOCKET_ENV
+from tests.mock_server import MockPCServer, Inventory
+
+CLIENT_SCRIPT = """
+import sys
+from calm.dsl.daemon_client import forward_to_daemon
+
+forward_to_daemon(sys.argv[2:], socket_path=sys.argv[1])
+sys.exit("daemon not running")
+"""
+
+# Runs like calm console script, falls back to running locally
+CONSOLE_SCRIPT = """
+import sys
+sys.argv[0] = "calm"
+import calm.dsl.cli
+from calm.dsl.console import main
+
+print("imported cli")
+calm.dsl.cli.main = lambda: sys.exit("ran locally")
+main()
+"""
+
+BLUEPRINT = """
+from calm.dsl.builtins import Service, Blueprint
+
+
+class {service}(Service):
+    pass
+
+
+class {name}(Blueprint):
+    services = [{service}]
+"""
+
+HELPER_BLUEPRINT = """
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+from bp_helper import DESCRIPTION
+
+from calm.dsl.builtins import Service, Blueprint
+
+
+class Service3(Service):
+    __doc__ = DESCRIPTION
+
+
+class Bp3(Blueprint):
+    services = [Service3]
+"""
+
+
+@click.command()
+@click.argument("name")
+def greet(name):
+    """prompts for a greeting and echoes it"""
+
+    greeting = click.prompt("Greeting")
+    click.echo("{}, {} from {}".format(greeting, name, os.getcwd()))
+    click.echo("warning", err=True)
+    sys.exit(3)
+
+
+def run_client(socket_path, args, env={}, **kwargs):
+    return subprocess.run(
+        [sys.executable, "-c", CLIENT_SCRIPT, socket_path] + args,
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path), **env),
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def new_db_handle(monkeypatch):
+    """lets the daemon create db handle, using the db location of command.
+    Db handle of test process is restored after test"""
+
+    db_location = handler.dsl_database.database
+    monkeypatch.setattr(handler, "_Database", None)
+    yield
+    handler.dsl_database.init(
+        db_location, pragmas=handler.DB_PRAGMAS, timeout=handler.DB_BUSY_TIMEOUT
+    )
+
+
+def start_daemon(socket_path, monkeypatch):
+
+    server = DaemonServer(socket_path)
+    monkeypatch.setattr(server, "warm_up", lambda: None)
+    # Daemon redirects the std streams to proxies, restored after test
+    monkeypatch.setattr(sys, "stdout", sys.stdout)
+    monkeypatch.setattr(sys, "stderr", sys.stderr)
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    for _ in range(50):
+        if request_daemon("ping", socket_path):
+            break
+        time.sleep(0.1)
+
+    return thread
+
+
+def test_daemon_runs_forwarded_commands(tmp_path, monkeypatch):
+
+    socket_path = str(tmp_path / "daemon.sock")
+    monkeypatch.setattr(calm.dsl.cli, "main", greet)
+    thread = start_daemon(socket_path, monkeypatch)
+
+    try:
+        res = run_client(socket_path, ["World"], input="Hello\n", cwd=str(tmp_path))
+        assert res.returncode == 3
+        assert "Hello, World from {}".format(tmp_path) in res.stdout
+        assert res.stderr.splitlines()[-1] == "warning"
+
+        # Daemon process state is restored after the command
+        assert os.getcwd() != str(tmp_path)
+        assert request_daemon("ping", socket_path)["commands_run"] == 1
+
+        # Commands are forwarded by console entry point, not by importing cli
+        res = subprocess.run(
+            [sys.executable, "-c", CONSOLE_SCRIPT, "World"],
+            capture_output=True,
+            text=True,
+            input="Hi\n",
+            env=dict(
+                os.environ,
+                PYTHONPATH=os.pathsep.join(sys.path),
+                **{DAEMON_SOCKET_ENV: socket_path},
+            ),
+        )
+        assert res.returncode == 3
+        assert res.stdout.startswith("imported cli")
+        assert "Hi, World" in res.stdout
+        assert request_daemon("ping", socket_path)["commands_run"] == 2
+    finally:
+        assert request_daemon("stop", socket_path)["type"] == "stopped"
+        thread.join(timeout=5)
+
+    assert not os.path.exists(socket_path)
+    res = run_client(socket_path, ["World"])
+    assert res.stderr.splitlines()[-1] == "daemon not running"
+
+
+def test_daemon_resets_dsl_state(tmp_path, monkeypatch, new_db_handle):
+
+    socket_path = str(tmp_path / "daemon.sock")
+    env = {
+        "HOME": str(tmp_path),
+        "CALM_DSL_DB_LOCATION": str(tmp_path / "dsl.db"),
+        "CALM_DSL_LOCAL_DIR_LOCATION": str(tmp_path / ".local"),
+        "CALM_DSL_PC_USERNAME": "admin",
+        "CALM_DSL_PC_PASSWORD": "admin",
+        "CALM_DSL_DEFAULT_PROJECT": "default",
+    }
+    for name, service in [("Bp1", "Service1"), ("Bp2", "Service2")]:
+        bp_file = tmp_path / "{}.py".format(name)
+        bp_file.write_text(BLUEPRINT.format(name=name, service=service))
+
+    with MockPCServer(
+        Inventory(projects=1, subnets=1, images=1, users=1, apps=0)
+    ) as mock_server:
+        env.update(
+            CALM_DSL_PC_IP=mock_server.host, CALM_DSL_PC_PORT=str(mock_server.port)
+        )
+        thread = start_daemon(socket_path, monkeypatch)
+
+        payloads = []
+        try:
+            res = run_client(socket_path, ["update", "cache"], env=env)
+            assert res.returncode == 0, res.stdout + res.stderr
+
+            for name in ["Bp1", "Bp2"]:
+                args = ["compile", "bp", "-f", str(tmp_path / "{}.py".format(name))]
+                res = run_client(socket_path, args + ["--no-cache"], env=env)
+                assert res.returncode == 0, res.stdout + res.stderr
+                payloads.append(json.loads(res.stdout))
+
+            # Helper modules imported by blueprint are not reused
+            (tmp_path / "Bp3.py").write_text(HELPER_BLUEPRINT)
+            args = ["compile", "bp", "-f", str(tmp_path / "Bp3.py"), "--no-cache"]
+            for description in ["v1", "v2"]:
+                (tmp_path / "bp_helper.py").write_text(
+                    "DESCRIPTION = '{}'\n".format(description)
+                )
+                res = run_client(socket_path, args, env=env)
+                assert res.returncode == 0, res.stdout + res.stderr
+                services = json.loads(res.stdout)["spec"]["resources"][
+                    "service_definition_list"
+                ]
+                assert services[0]["description"] == description
+            assert "bp_helper" not in sys.modules
+            assert str(tmp_path) not in sys.path
+        finally:
+            request_daemon("stop", socket_path)
+            thread.join(timeout=5)
+
+    # Second blueprint does not get the entities of first one
+    for payload, service in zip(payloads, ["Service1", "Service2"]):
+        client_attrs = payload["spec"]["resources"]["client_attrs"]["None"]
+        assert list(client_attrs["Service"].keys()) == [service]
+
+
+def test_get_command_name():
+
+    assert get_command_name(["daemon", "stop"]) == "daemon"
+    assert get_command_name(["-c", "cfg.ini", "daemon", "stop"]) == "daemon"
+    assert get_command_name(["--timings", "-vv", "daemon", "status"]) == "daemon"
+    assert get_command_name(["--trace-file", "daemon", "get", "apps"]) == "get"
+    assert get_command_name(["--config=cfg.ini", "get", "apps"]) == "get"
+    assert get_command_name(["--timings"]) is None
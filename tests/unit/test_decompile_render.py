@@ -0,0 +1,24 @@
+from jinja2 import FileSystemBytecodeCache
+
+from calm.dsl.decompile import render
+
+
+def test_templates_are_compiled_once(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(render, "_ENV", None)
+    monkeypatch.setattr(
+        render, "get_bytecode_cache", lambda: FileSystemBytecodeCache(str(tmp_path))
+    )
+
+    template = render.get_template("ref.py.jinja2")
+    assert render.get_template("ref.py.jinja2") is template
+    assert render.render_template("ref.py.jinja2", {"name": "Db"}) == "ref(Db)"
+
+    # Compiled templates are stored, and loaded by new environments
+    render.precompile_templates()
+    cached_files = list(tmp_path.iterdir())
+    assert len(cached_files) == len(render.get_env().list_templates())
+
+    monkeypatch.setattr(render, "_ENV", None)
+    assert render.get_template("ref.py.jinja2") is not template
+    assert list(tmp_path.iterdir()) == cached_files
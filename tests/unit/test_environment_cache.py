@@ -0,0 +1,226 @@
+import json
+import time
+
+from peewee import SqliteDatabase
+
+from calm.dsl.db.table_config import EnvironmentCache, VersionTable
+from tests.unit.fakes import Response
+
+
+def get_environment(uuid, infra_inclusion_list):
+    return {
+        "metadata": {"uuid": uuid, "project_reference": {"uuid": "project1"}},
+        "status": {
+            "name": uuid,
+            "resources": {"infra_inclusion_list": infra_inclusion_list},
+        },
+    }
+
+
+def get_pc_infra(account_uuid, subnet_uuids):
+    return {
+        "type": "nutanix_pc",
+        "account_reference": {"uuid": account_uuid, "name": account_uuid},
+        "subnet_references": [{"uuid": uuid} for uuid in subnet_uuids],
+    }
+
+
+def get_subnet(uuid):
+    # Subnets with even index are VLANs
+    if int(uuid[1:]) % 2 == 0:
+        return {
+            "metadata": {"uuid": uuid},
+            "status": {
+                "resources": {"subnet_type": "VLAN"},
+                "cluster_reference": {"uuid": "c" + uuid},
+            },
+        }
+    return {
+        "metadata": {"uuid": uuid},
+        "status": {
+            "resources": {
+                "subnet_type": "OVERLAY",
+                "vpc_reference": {"uuid": "v" + uuid},
+            }
+        },
+    }
+
+
+class MockAhvObj:
+    def __init__(self):
+        self.calls = []
+
+    def subnets(self, account_uuid, filter_query):
+        subnet_uuids = filter_query[len("_entity_id_==") :].split("|")
+        self.calls.append((account_uuid, subnet_uuids))
+        if account_uuid == "pc_down" or "s5" in subnet_uuids:
+            raise Exception("account not reachable")
+        return {"entities": [get_subnet(uuid) for uuid in subnet_uuids]}
+
+
+def test_sync_entries_use_batched_subnets(monkeypatch):
+
+    AhvObj = MockAhvObj()
+
+    class MockProvider:
+        @staticmethod
+        def get_api_obj():
+            return AhvObj
+
+    monkeypatch.setattr(
+        EnvironmentCache,
+        "get_provider_plugin",
+        classmethod(lambda cls, _: MockProvider),
+    )
+    monkeypatch.setattr(EnvironmentCache, "subnet_batch_size", 4)
+
+    environments = [
+        get_environment(
+            "env{}".format(i),
+            [
+                get_pc_infra("pc1", ["s{}".format(i), "s{}".format(i + 1)]),
+                get_pc_infra("pc_down", ["s0"]),
+                {
+                    "type": "aws",
+                    "account_reference": {"uuid": "aws1", "name": "aws1"},
+                },
+            ],
+        )
+        for i in range(5)
+    ]
+
+    account_subnet_uuids = EnvironmentCache.get_infra_subnet_uuids(environments)
+    assert account_subnet_uuids == {
+        "pc1": ["s0", "s1", "s2", "s3", "s4", "s5"],
+        "pc_down": ["s0"],
+    }
+
+    subnet_index = EnvironmentCache.fetch_subnet_index(account_subnet_uuids)
+
+    # Subnets are fetched once, in batches
+    assert sorted(AhvObj.calls) == [
+        ("pc1", ["s0", "s1", "s2", "s3"]),
+        ("pc1", ["s4", "s5"]),
+        ("pc_down", ["s0"]),
+    ]
+    assert subnet_index["pc_down"] == {"s0": None}
+    assert subnet_index["pc1"]["s5"] is None
+    assert subnet_index["pc1"]["s2"] == {"cluster_uuid": "cs2"}
+    assert subnet_index["pc1"]["s3"] == {"vpc_uuid": "vs3"}
+
+    entries = EnvironmentCache.get_sync_entries(
+        environments[1], subnet_index=subnet_index
+    )
+    assert len(AhvObj.calls) == 3
+    assert entries[0]["project_uuid"] == "project1"
+
+    # Accounts whose subnets could not be fetched are skipped
+    assert json.loads(entries[0]["accounts_data"]) == {
+        "nutanix_pc": [
+            {
+                "uuid": "pc1",
+                "name": "pc1",
+                "subnet_uuids": ["s1", "s2"],
+                "cluster_uuids": ["cs2"],
+                "vpc_uuids": ["vs1"],
+            }
+        ],
+        "aws": [{"uuid": "aws1", "name": "aws1"}],
+    }
+
+    # Only environments using subnets of failed batch skip the account
+    entries = EnvironmentCache.get_sync_entries(
+        environments[4], subnet_index=subnet_index
+    )
+    assert "nutanix_pc" not in json.loads(entries[0]["accounts_data"])
+
+    # Subnets are fetched for the environment, if index is not given
+    entries = EnvironmentCache.get_sync_entries(environments[1])
+    assert json.loads(entries[0]["accounts_data"])["nutanix_pc"][0]["uuid"] == "pc1"
+    assert len(AhvObj.calls) == 5
+
+
+class MockEnvironmentObj:
+    """Environment list api, counting the listings"""
+
+    def __init__(self, entities):
+        self.entities = entities
+        self.listings = 0
+
+    def list(self, params, ignore_error=False):
+        metadata = {"total_matches": len(self.entities)}
+        return Response({"metadata": metadata, "entities": []}), None
+
+    def iter_all(self, base_params=None, prefetch=True):
+        self.listings += 1
+        return iter(
+            sorted(
+                self.entities,
+                key=lambda entity: entity["metadata"]["last_update_time"],
+                reverse=True,
+            )
+        )
+
+
+def test_incremental_sync_of_environments_without_project(tmp_path, monkeypatch):
+
+    env1 = get_environment("env1", [])
+    env2 = get_environment("env2", [])
+    # Environments without project have no rows in table
+    env2["metadata"].pop("project_reference")
+    for i, env in enumerate([env1, env2]):
+        env["metadata"]["last_update_time"] = str(i + 1)
+
+    Obj = MockEnvironmentObj([env1, env2])
+    monkeypatch.setattr(
+        EnvironmentCache, "get_sync_list_api", classmethod(lambda cls: (Obj, {}))
+    )
+
+    db = SqliteDatabase(str(tmp_path / "dsl.db"))
+    with EnvironmentCache.bind_ctx(db), VersionTable.bind_ctx(db):
+        db.create_tables([EnvironmentCache, VersionTable])
+        EnvironmentCache.sync()
+        assert [row.uuid for row in EnvironmentCache.select()] == ["env1"]
+        assert EnvironmentCache.get_skipped_uuids() == {"env2"}
+
+        # Nothing deleted, so only modified environments are listed
+        EnvironmentCache.sync_incremental()
+        assert Obj.listings == 2
+
+        # Deleted environments are found by listing all of them
+        Obj.entities = [env2]
+        EnvironmentCache.sync_incremental()
+        assert Obj.listings == 4
+        assert EnvironmentCache.select().count() == 0
+
+        Obj.entities = []
+        EnvironmentCache.sync_incremental()
+        assert Obj.listings == 6
+        assert EnvironmentCache.get_skipped_uuids() == set()
+
+
+def test_sync_marker_is_capped_at_sync_start(tmp_path, monkeypatch):
+
+    now_usecs = int(time.time() * 1000000)
+    env1 = get_environment("env1", [])
+    env1["metadata"]["last_update_time"] = str(now_usecs - 3600 * 1000000)
+    # env2 is modified while environments are listed
+    env2 = get_environment("env2", [])
+    env2["metadata"]["last_update_time"] = str(now_usecs)
+
+    Obj = MockEnvironmentObj([env1, env2])
+    monkeypatch.setattr(
+        EnvironmentCache, "get_sync_list_api", classmethod(lambda cls: (Obj, {}))
+    )
+
+    db = SqliteDatabase(str(tmp_path / "dsl.db"))
+    with EnvironmentCache.bind_ctx(db), VersionTable.bind_ctx(db):
+        db.create_tables([EnvironmentCache, VersionTable])
+        EnvironmentCache.sync()
+        assert EnvironmentCache.get_sync_marker() < now_usecs
+
+        # env1 got modified before env2, after it was listed
+        env1["status"]["name"] = "env1-renamed"
+        env1["metadata"]["last_update_time"] = str(now_usecs - 1000000)
+        EnvironmentCache.sync_incremental()
+        assert EnvironmentCache.get(uuid="env1").name == "env1-renamed"
@@ -0,0 +1,24 @@
+import io
+import sys
+import logging
+
+from calm.dsl.log import get_logging_handle, CustomLogging
+
+
+def test_log_has_caller_line_and_skips_disabled_levels(monkeypatch):
+
+    monkeypatch.setattr(CustomLogging, "_VERBOSE_LEVEL", logging.INFO)
+    LOG = get_logging_handle("test_logger")
+    stream = io.StringIO()
+    LOG._ch1.setStream(stream)
+
+    LOG.info("info message")
+    line_no = sys._getframe().f_lineno - 1
+    assert "test_logger:{}] info message".format(line_no) in stream.getvalue()
+
+    # Caller info is not computed for disabled levels
+    monkeypatch.setattr(
+        sys, "_getframe", lambda depth=0: (_ for _ in ()).throw(AssertionError)
+    )
+    LOG.debug("debug message")
+    assert "debug message" not in stream.getvalue()
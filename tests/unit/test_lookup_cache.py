@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+from calm.dsl.store import Cache
+from calm.dsl.store.lookup_cache import LookupCache
+
+
+class MockTable:
+    def __init__(self):
+        self.rows = {"vm1": {"name": "vm1", "uuid": "uuid-1"}}
+        self.queries = 0
+        self.fetches = 0
+
+    def get_entity_data(self, name, **kwargs):
+        self.queries += 1
+        return self.rows.get(name, {})
+
+    def get_entity_data_using_uuid(self, uuid, **kwargs):
+        self.queries += 1
+        return {}
+
+    def add_one(self, uuid, **kwargs):
+        self.rows[kwargs["name"]] = {"name": kwargs["name"], "uuid": uuid}
+
+    def get_cache_type(self):
+        return "ahv_vm"
+
+    def fetch_missing_entity(self, name=None, uuid=None, **kwargs):
+        self.fetches += 1
+        if name != "vm3":
+            return False
+
+        self.add_one("uuid-3", name=name)
+        return True
+
+
+@pytest.fixture
+def mock_table(monkeypatch):
+    table = MockTable()
+    monkeypatch.setattr(Cache, "lookup_cache", LookupCache())
+    monkeypatch.setattr(Cache, "read_through", False)
+    monkeypatch.setattr(
+        Cache, "get_entity_db_table_object", classmethod(lambda cls, _et: table)
+    )
+    return table
+
+
+def test_lookup_cache_lru_eviction_and_ttl():
+
+    cache = LookupCache(max_size=2, ttl=0.1)
+    for name in ["a", "b"]:
+        cache.set(LookupCache.get_key("subnet", "name", name, {}), name)
+
+    # "a" is most recently used, so "b" is evicted
+    assert cache.get(LookupCache.get_key("subnet", "name", "a", {})) == (True, "a")
+    cache.set(LookupCache.get_key("subnet", "name", "c", {}), "c")
+    assert cache.get(LookupCache.get_key("subnet", "name", "b", {})) == (False, None)
+
+    time.sleep(0.15)
+    assert cache.get(LookupCache.get_key("subnet", "name", "a", {})) == (False, None)
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["misses"] == 2
+
+
+def test_cache_lookups_are_memoized(mock_table):
+
+    for _ in range(3):
+        res = Cache.get_entity_data("ahv_vm", "vm1", account_uuid="acc")
+        res["name"] = "modified"
+
+    assert mock_table.queries == 1
+    assert Cache.get_entity_data("ahv_vm", "vm1", account_uuid="acc")["name"] == "vm1"
+
+    # Different kwargs are different lookups
+    Cache.get_entity_data("ahv_vm", "vm1", account_uuid="acc2")
+    assert mock_table.queries == 2
+    assert Cache.get_lookup_stats()["hits"] == 3
+
+
+def test_cache_writes_invalidate_lookups(mock_table):
+
+    assert Cache.get_entity_data("ahv_vm", "vm2") == {}
+    Cache.add_one("ahv_vm", "uuid-2", name="vm2")
+
+    assert Cache.get_entity_data("ahv_vm", "vm2") == {"name": "vm2", "uuid": "uuid-2"}
+    assert mock_table.queries == 2
+
+
+def test_cache_miss_is_read_through(mock_table, monkeypatch):
+
+    monkeypatch.setattr(Cache, "read_through", True)
+    assert Cache.get_entity_data("ahv_vm", "vm3") == {"name": "vm3", "uuid": "uuid-3"}
+    assert Cache.get_entity_data("ahv_vm", "vm4") == {}
+
+    # Unsuccessful fetch is memoized too
+    assert Cache.get_entity_data("ahv_vm", "vm4") == {}
+    assert mock_table.fetches == 2
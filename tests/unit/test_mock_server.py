@@ -0,0 +1,67 @@
+import requests
+import urllib3
+
+from tests.mock_server import MockPCServer, Inventory
+from tests.mock_server.server import parse_filter
+
+urllib3.disable_warnings()
+
+
+def test_parse_filter():
+
+    assert parse_filter("name==a;(_state==running,_state==error);type!=x|y") == [
+        [("name", "==", "a")],
+        [("_state", "==", "running"), ("_state", "==", "error")],
+        [("type", "!=", "x|y")],
+    ]
+    assert parse_filter("") == []
+
+
+def test_list_entities():
+
+    inventory = Inventory(projects=5, apps=30, runlogs=1)
+    with MockPCServer(inventory) as server:
+        url = "https://{}:{}/api/nutanix/v3/".format(server.host, server.port)
+
+        res = requests.get(
+            "https://{}:{}/apps/version".format(server.host, server.port),
+            verify=False,
+        )
+        assert res.text == "3.7.0"
+
+        # Pagination
+        res = requests.post(
+            url + "apps/list", json={"length": 20, "offset": 20}, verify=False
+        ).json()
+        assert res["metadata"]["total_matches"] == 30
+        assert [app["metadata"]["name"] for app in res["entities"]] == [
+            "app_{}".format(i) for i in range(20, 30)
+        ]
+
+        # Regex and OR filters
+        res = requests.post(
+            url + "apps/list",
+            json={"filter": "name==app_1.*;(_state==running,_state==error)"},
+            verify=False,
+        ).json()
+        assert res["metadata"]["total_matches"] == 11
+
+        project = inventory.get_records("projects")[1]
+        res = requests.get(url + "projects/{}".format(project.uuid), verify=False)
+        assert res.json()["metadata"]["name"] == "project_1"
+
+        res = requests.post(url + "unknown_kind/list", json={}, verify=False)
+        assert res.json()["entities"] == []
+
+
+def test_injected_errors():
+
+    with MockPCServer(Inventory(projects=1, apps=0), error_rate=1.0) as server:
+        res = requests.post(
+            "https://{}:{}/api/nutanix/v3/projects/list".format(
+                server.host, server.port
+            ),
+            json={},
+            verify=False,
+        )
+        assert res.status_code == 500
@@ -0,0 +1,80 @@
+from calm.dsl.cli import poller
+from calm.dsl.cli.poller import Backoff, Poller, poll_until
+from tests.unit.fakes import FakeTime
+
+
+def get_poll_func(fake_time, states, polls):
+    """returns poll func returning the state at current time from states list
+    [(till_time, state)], completed once states are exhausted"""
+
+    def poll_func():
+        polls.append(fake_time.now)
+        for till_time, state in states:
+            if fake_time.now < till_time:
+                return False, state, state
+        return True, "DONE", "DONE"
+
+    return poll_func
+
+
+def test_backoff_is_exponential_and_reset():
+
+    backoff = Backoff(min_interval=0.5, max_interval=4, jitter=0)
+    assert [backoff.next_interval() for _ in range(6)] == [0.5, 1, 2, 4, 4, 4]
+
+    backoff.reset()
+    assert backoff.next_interval() == 0.5
+
+    backoff = Backoff(min_interval=1, max_interval=10, jitter=0.2)
+    intervals = [backoff.next_interval() for _ in range(5)]
+    assert all(0.8 * 2**i <= t <= 1.2 * 2**i for i, t in enumerate(intervals[:4]))
+    assert 8 <= intervals[4] <= 10
+
+
+def test_poller_resets_backoff_on_state_change(monkeypatch):
+
+    fake_time = FakeTime()
+    monkeypatch.setattr(poller, "time", fake_time)
+
+    polls = []
+    poll_func = get_poll_func(fake_time, [(7, "RUNNING"), (20, "WAITING")], polls)
+    completed, result = poll_until(poll_func, max_interval=8, jitter=0)
+
+    assert (completed, result) == (True, "DONE")
+    assert polls == [0, 0.5, 1.5, 3.5, 7.5, 8, 9, 11, 15, 23]
+
+
+def test_poller_multiplexes_objects_till_deadline(monkeypatch):
+
+    fake_time = FakeTime()
+    monkeypatch.setattr(poller, "time", fake_time)
+
+    polls1, polls2 = [], []
+    obj_poller = Poller(timeout=30, max_interval=10, jitter=0)
+    obj_poller.add("short", get_poll_func(fake_time, [(1, "RUNNING")], polls1))
+    obj_poller.add("long", get_poll_func(fake_time, [(100, "RUNNING")], polls2))
+    results = obj_poller.run()
+
+    assert results == {"short": (True, "DONE"), "long": (False, "RUNNING")}
+    assert polls1 == [0, 0.5, 1.5]
+    assert polls2 == [0, 0.5, 1.5, 3.5, 7.5, 15.5, 25.5]
+    assert fake_time.now == 25.5
+
+
+def test_get_poll_state():
+
+    runlog = {
+        "metadata": {"uuid": "1"},
+        "status": {"state": "RUNNING", "progress": 10},
+    }
+    state = poller.get_poll_state(runlog)
+    assert state == "RUNNING"
+
+    # Progress of runlog does not change the state
+    runlog["status"]["progress"] = 20
+    assert poller.get_poll_state(runlog) == state
+
+    runlogs = {"entities": [runlog], "metadata": {"total_matches": 1}}
+    assert poller.get_poll_state(runlogs) == (("1", "RUNNING"),)
+    runlog["status"]["state"] = "SUCCESS"
+    assert poller.get_poll_state(runlogs) == (("1", "SUCCESS"),)
@@ -0,0 +1,92 @@
+import json
+
+from calm.dsl.db.table_config import ProjectCache
+
+
+def get_subnet(uuid, cluster_uuid=None, vpc_uuid=None):
+    resources = {"subnet_type": "VLAN" if cluster_uuid else "OVERLAY"}
+    status = {"resources": resources}
+    if cluster_uuid:
+        status["cluster_reference"] = {"uuid": cluster_uuid}
+    else:
+        resources["vpc_reference"] = {"uuid": vpc_uuid}
+    return {"metadata": {"uuid": uuid}, "status": status}
+
+
+def get_entity(uuid):
+    return {"metadata": {"uuid": uuid}}
+
+
+def test_get_project_entry():
+
+    infra_index = ProjectCache.get_pc_infra_index(
+        {
+            ("pc1", "subnets"): [
+                get_subnet("s1", cluster_uuid="c1"),
+                get_subnet("s2", vpc_uuid="v1"),
+            ],
+            ("pc1", "clusters"): [get_entity("c1"), get_entity("c2")],
+            ("pc1", "vpcs"): [get_entity("v1")],
+            ("pc2", "subnets"): [get_subnet("s3", cluster_uuid="c3")],
+            ("pc2", "clusters"): [get_entity("c3")],
+            ("pc2", "vpcs"): [],
+        }
+    )
+    assert infra_index["subnet_cluster"] == {"s1": "c1", "s3": "c3"}
+    assert infra_index["subnet_vpc"] == {"s2": "v1"}
+
+    project = {
+        "metadata": {"uuid": "p1"},
+        "spec": {
+            "resources": {
+                "subnet_reference_list": [{"uuid": "s1"}, {"uuid": "s3"}],
+                "external_network_list": [{"uuid": "s2"}],
+            }
+        },
+        "status": {
+            "name": "project1",
+            "resources": {
+                "account_reference_list": [
+                    {"uuid": "pc1"},
+                    {"uuid": "pc2"},
+                    {"uuid": "aws1"},
+                    {"uuid": "deleted"},
+                ],
+                "cluster_reference_list": [{"uuid": "c2"}],
+            },
+        },
+    }
+    account_uuid_type_map = {"pc1": "nutanix_pc", "pc2": "nutanix_pc", "aws1": "aws"}
+
+    entry = ProjectCache.get_project_entry(
+        ProjectCache.get_project_refs(project), account_uuid_type_map, infra_index
+    )
+    assert entry["name"] == "project1"
+    assert entry["uuid"] == "p1"
+    assert json.loads(entry["accounts_data"]) == {
+        "nutanix_pc": ["pc1", "pc2"],
+        "aws": ["aws1"],
+    }
+    assert json.loads(entry["whitelisted_subnets"]) == {
+        "pc1": ["s2", "s1"],
+        "pc2": ["s3"],
+    }
+    assert json.loads(entry["whitelisted_clusters"]) == {
+        "pc1": ["c2", "c1"],
+        "pc2": ["c3"],
+    }
+    assert json.loads(entry["whitelisted_vpcs"]) == {"pc1": ["v1"], "pc2": []}
+
+
+def test_fetch_pc_account_entities_failure():
+    class AhvObj:
+        def subnets(self, account_uuid):
+            raise Exception("account not reachable")
+
+        def clusters(self, account_uuid):
+            return {"entities": [get_entity("c1")]}
+
+    assert ProjectCache.fetch_pc_account_entities(AhvObj(), "subnets", "pc1") == []
+    assert ProjectCache.fetch_pc_account_entities(AhvObj(), "clusters", "pc1") == [
+        get_entity("c1")
+    ]
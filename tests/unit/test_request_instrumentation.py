@@ -0,0 +1,109 @@
+import json
+
+from calm.dsl.api.connection import Connection
+from calm.dsl.api.instrumentation import (
+    RequestHooks,
+    RequestTimings,
+    RequestTrace,
+    get_endpoint_template,
+)
+
+APP_UUID = "2c5b9b2e-1f4a-4c3e-9a7e-0d2b6a1f3c11"
+
+
+class Retries:
+    def __init__(self, count):
+        self.history = [None] * count
+
+
+class Raw:
+    def __init__(self, retries):
+        self.retries = Retries(retries)
+
+
+class PreparedRequest:
+    def __init__(self, body):
+        self.body = body
+
+
+class Response:
+    def __init__(self, status_code, body, content, retries=0):
+        self.status_code = status_code
+        self.request = PreparedRequest(body)
+        self.content = content
+        self.raw = Raw(retries)
+        self.ok = status_code < 400
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise Exception("{} Error".format(self.status_code))
+
+
+class Session:
+    def __init__(self):
+        self.headers = {}
+
+    def post(self, url, data=None, **kwargs):
+        status_code = 404 if "missing" in url else 200
+        return Response(status_code, data, b'{"entities": []}', retries=1)
+
+    def get(self, url, **kwargs):
+        return Response(200, None, b'{"metadata": {}}')
+
+
+def test_endpoint_template():
+
+    assert (
+        get_endpoint_template("api/nutanix/v3/apps/{}/actions/run".format(APP_UUID))
+        == "api/nutanix/v3/apps/{uuid}/actions/run"
+    )
+    assert get_endpoint_template("api/nutanix/v3/tasks/12?x=1") == (
+        "api/nutanix/v3/tasks/{id}"
+    )
+
+
+def test_connection_calls_request_hooks(tmp_path):
+
+    connection = Connection("10.0.0.1", 9440)
+    connection.session = Session()
+    records = []
+    timings = RequestTimings()
+    trace = RequestTrace()
+    for hook in [records.append, timings, trace]:
+        RequestHooks.add(hook)
+
+    try:
+        timeout = (5, 30)
+        connection._call("api/nutanix/v3/apps/list", request_json={}, timeout=timeout)
+        for _ in range(3):
+            connection._call(
+                "api/nutanix/v3/apps/{}".format(APP_UUID), method="get", timeout=timeout
+            )
+        connection._call(
+            "api/nutanix/v3/missing/list", ignore_error=True, timeout=timeout
+        )
+    finally:
+        for hook in [records.append, timings, trace]:
+            RequestHooks.remove(hook)
+
+    assert not RequestHooks.enabled()
+    assert len(records) == 5
+    assert records[0]["template"] == "api/nutanix/v3/apps/list"
+    assert records[0]["request_bytes"] == 2
+    assert records[0]["response_bytes"] == len(b'{"entities": []}')
+    assert records[0]["retries"] == 1
+    assert records[-1]["status"] == 404
+
+    rows = {(row[0], row[1]): row for row in timings.summary()}
+    assert rows[("GET", "api/nutanix/v3/apps/{uuid}")][2] == 3
+    assert rows[("POST", "api/nutanix/v3/apps/list")][6] == 1
+
+    trace_file = tmp_path / "trace.json"
+    trace.write(str(trace_file))
+    events = json.loads(trace_file.read_text())["traceEvents"]
+    assert len(events) == 5
+    assert events[1]["name"] == "GET api/nutanix/v3/apps/{uuid}"
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
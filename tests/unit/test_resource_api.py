@@ -0,0 +1,96 @@
+import time
+import random
+
+import pytest
+
+from calm.dsl.api.resource import ResourceAPI
+from tests.unit.fakes import Response
+
+
+class MockConnection:
+    """Serves list calls from in-memory entities, optionally failing offsets"""
+
+    def __init__(self, total, failing_offsets=None):
+        self.entities = [{"metadata": {"uuid": str(i)}} for i in range(total)]
+        self.failing_offsets = failing_offsets or []
+        self.requested_offsets = []
+
+    def _call(self, endpoint, request_json=None, ignore_error=False, **kwargs):
+        offset = request_json["offset"]
+        length = request_json["length"]
+        self.requested_offsets.append(offset)
+
+        # Shuffle completion order of pages
+        time.sleep(random.random() / 100)
+        if offset in self.failing_offsets:
+            return None, {"code": 500, "error": "page {} failed".format(offset)}
+
+        return (
+            Response(
+                {
+                    "entities": self.entities[offset : offset + length],
+                    "metadata": {"total_matches": len(self.entities)},
+                }
+            ),
+            None,
+        )
+
+
+@pytest.mark.parametrize("total", [0, 10, 250, 251, 1234])
+def test_list_all_concurrent_pages_in_order(total):
+
+    connection = MockConnection(total)
+    Obj = ResourceAPI(connection, "apps", calm_api=True)
+    entities = Obj.list_all(api_limit=50, concurrency=4)
+
+    assert [e["metadata"]["uuid"] for e in entities] == [str(i) for i in range(total)]
+    assert sorted(connection.requested_offsets) == list(range(0, max(total, 1), 50))
+
+
+def test_list_all_page_error():
+
+    connection = MockConnection(500, failing_offsets=[300])
+    Obj = ResourceAPI(connection, "apps", calm_api=True)
+
+    entities, err = Obj.list_all(api_limit=100, concurrency=3, ignore_error=True)
+    assert entities == []
+    assert err["code"] == 500
+
+    with pytest.raises(Exception):
+        Obj.list_all(api_limit=100, concurrency=3)
+
+
+def test_list_all_page_errors_are_aggregated(caplog):
+
+    connection = MockConnection(500, failing_offsets=[100, 300, 400])
+    Obj = ResourceAPI(connection, "apps", calm_api=True)
+
+    entities, err = Obj.list_all(api_limit=100, concurrency=3, ignore_error=True)
+    assert entities == []
+    assert err["error"] == "3 pages failed, first error: page 100 failed"
+    assert "Failed to fetch 3 out of 5 pages" in caplog.text
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+@pytest.mark.parametrize("total", [0, 10, 250, 251, 1234])
+def test_iter_all_yields_pages_in_order(total, prefetch):
+
+    connection = MockConnection(total)
+    Obj = ResourceAPI(connection, "apps", calm_api=True)
+    entities = Obj.iter_all(api_limit=50, prefetch=prefetch)
+
+    assert [e["metadata"]["uuid"] for e in entities] == [str(i) for i in range(total)]
+
+
+def test_iter_all_page_error():
+
+    connection = MockConnection(500, failing_offsets=[300])
+    Obj = ResourceAPI(connection, "apps", calm_api=True)
+
+    uuids = []
+    with pytest.raises(Exception):
+        for entity in Obj.iter_all(api_limit=100):
+            uuids.append(entity["metadata"]["uuid"])
+
+    # Entities of pages before the failed one are already yielded
+    assert uuids == [str(i) for i in range(300)]
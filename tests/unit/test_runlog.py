@@ -0,0 +1,116 @@
+from calm.dsl.cli import runlog
+from calm.dsl.cli.constants import RUNLOG
+
+RUNLOG_UUID = "runlog-uuid"
+
+
+class OutputResponse:
+    def __init__(self, output):
+        self.output = output
+
+    def json(self):
+        return {"status": {"output_list": [{"output": self.output}]}}
+
+
+class RunbookApi:
+    def __init__(self):
+        self.output_calls = []
+
+    def runlog_output(self, runlog_uuid, uuid):
+        self.output_calls.append(uuid)
+        return OutputResponse("{} output\n".format(uuid)), None
+
+
+class Client:
+    def __init__(self):
+        self.runbook = RunbookApi()
+
+
+class Screen:
+    def __init__(self):
+        self.lines = []
+
+    def clear(self):
+        self.lines = []
+
+    def refresh(self):
+        pass
+
+    def print_at(self, text, x, *args, **kwargs):
+        self.lines.append(text)
+
+
+def get_runlog(uuid, runlog_type, state, parent_uuid, creation_time, update_time=0):
+    status = {
+        "type": runlog_type,
+        "state": state,
+        "root_reference": {"uuid": "root-uuid"},
+        "parent_reference": {"uuid": parent_uuid},
+    }
+    if runlog_type == "task_runlog":
+        status["task_reference"] = {"uuid": "task-{}".format(uuid), "name": uuid}
+    else:
+        status["runbook_reference"] = {"name": "runbook"}
+
+    return {
+        "metadata": {
+            "uuid": uuid,
+            "creation_time": str(creation_time * 1000000),
+            "last_update_time": str((creation_time + update_time) * 1000000),
+        },
+        "status": status,
+    }
+
+
+def test_task_outputs_are_fetched_on_state_change(monkeypatch):
+
+    client = Client()
+    monkeypatch.setattr(runlog, "get_api_client", lambda: client)
+    monkeypatch.setattr(runlog.os, "isatty", lambda fd: False)
+    monkeypatch.setattr(
+        runlog,
+        "get_context",
+        lambda: type(
+            "Context", (), {"get_connection_config": lambda self: {"concurrency": 4}}
+        )(),
+    )
+
+    screen = Screen()
+    is_action_complete = runlog.get_completion_func(screen)
+
+    def poll(entities):
+        return is_action_complete(
+            {"entities": entities},
+            task_type_map={},
+            top_level_tasks=[],
+            runlog_uuid=RUNLOG_UUID,
+        )
+
+    runbook_runlog = get_runlog(
+        "rb", "runbook_runlog", RUNLOG.STATUS.RUNNING, "root-uuid", 1
+    )
+    task1 = get_runlog("t1", "task_runlog", RUNLOG.STATUS.SUCCESS, "rb", 2)
+    task2 = get_runlog("t2", "task_runlog", RUNLOG.STATUS.RUNNING, "rb", 3)
+
+    assert poll([task2, runbook_runlog, task1]) == (False, "")
+    assert sorted(client.runbook.output_calls) == ["t1", "t2"]
+
+    # Unchanged runlogs do not fetch the outputs again
+    client.runbook.output_calls = []
+    assert poll([runbook_runlog, task1, task2]) == (False, "")
+    assert client.runbook.output_calls == []
+
+    # Only the changed and new task runlogs are fetched
+    task2 = get_runlog("t2", "task_runlog", RUNLOG.STATUS.SUCCESS, "rb", 3, 5)
+    task3 = get_runlog("t3", "task_runlog", RUNLOG.STATUS.SUCCESS, "rb", 4)
+    runbook_runlog = get_runlog(
+        "rb", "runbook_runlog", RUNLOG.STATUS.SUCCESS, "root-uuid", 1, 10
+    )
+    completed, _ = poll([runbook_runlog, task1, task2, task3])
+    assert completed
+    assert sorted(client.runbook.output_calls) == ["t2", "t3"]
+
+    assert any("'t2 output'" in line for line in screen.lines)
+    task_lines = [line for line in screen.lines if "(Status:" in line]
+    task_names = [line.split(" (Status:")[0].split()[-1] for line in task_lines]
+    assert task_names == ["runbook", "t1", "t2", "t3"]
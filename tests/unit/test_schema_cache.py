@@ -0,0 +1,20 @@
+from calm.dsl.builtins.models import schema
+
+
+def test_resolved_schemas_are_persisted(tmp_path, monkeypatch):
+
+    cache_file = str(tmp_path / "schemas-test.pickle")
+    stale_file = tmp_path / "schemas-stale.pickle"
+    stale_file.write_bytes(b"")
+    monkeypatch.setattr(schema, "_get_schema_cache_file", lambda: cache_file)
+
+    schemas = schema._load_cached_schemas()
+    assert (tmp_path / "schemas-test.pickle").exists()
+    assert not stale_file.exists()
+
+    # Later runs load the persisted schemas, without rendering templates
+    monkeypatch.setattr(schema, "_load_all_schemas", lambda: {})
+    cached_schemas = schema._load_cached_schemas()
+
+    assert cached_schemas == schemas
+    assert cached_schemas["Blueprint"]["properties"]